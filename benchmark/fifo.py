@@ -0,0 +1,121 @@
+"""Compares the buffering cost per frame of ``av.AudioFifo`` with the preallocated ring of :py:class:`discodo.natives.AudioFifo`.
+
+The decoded frames are written and a frame of pcm is read and handed to the mixer in the player side,
+the time, the peak of the python heap allocated while buffering and the count of the frames copied out of the buffer are reported.
+
+Usage: ``python -m benchmark.fifo [frames]``"""
+
+import sys
+import time
+import tracemalloc
+
+import av
+import numpy
+
+from discodo.config import Config
+from discodo.natives.AudioFifo import AudioFifo
+from discodo.natives.AudioMixer import AudioMixer
+from discodo.utils.threadLock import CallbackEvent
+
+FRAMES = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+FRAME_SIZE = Config.SAMPLES_PER_FRAME * Config.SAMPLE_SIZE
+
+# the decoder does not align the frames to the frames of the player
+Decoded = av.AudioFrame.from_ndarray(
+    numpy.random.randint(-32768, 32767, (1, 1152 * Config.CHANNELS), dtype=numpy.int16),
+    format="s16",
+    layout="stereo",
+)
+Decoded.sample_rate = Config.SAMPLING_RATE
+
+Mixer = AudioMixer()
+
+
+class LegacyFifo(av.AudioFifo):
+    """The fifo before the ring, which copies the read frame to bytes."""
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.AUDIOBUFFERLIMITMS = (
+            Config.BUFFERLIMIT * (1000 / Config.FRAME_LENGTH) * Config.SAMPLES_PER_FRAME
+        )
+        self.haveToFillBuffer = CallbackEvent()
+        self.haveToFillBuffer.set()
+
+    def check_buffer(self) -> None:
+        if self.samples < self.AUDIOBUFFERLIMITMS:
+            if not self.haveToFillBuffer.is_set():
+                self.haveToFillBuffer.set()
+        else:
+            self.haveToFillBuffer.clear()
+
+    def read(self, samples: int) -> bytes:
+        Frame = super().read(samples)
+        self.check_buffer()
+
+        Plane = Frame.planes[0]
+        return Plane.to_bytes() if hasattr(Plane, "to_bytes") else bytes(Plane)
+
+    def write(self, Frame) -> None:
+        super().write(Frame)
+        self.check_buffer()
+
+
+def legacy(Fifo):
+    copies = 0
+
+    for _ in range(FRAMES):
+        while Fifo.samples < Config.SAMPLES_PER_FRAME:
+            Decoded.pts = None
+            Fifo.write(Decoded)
+
+        Data = Fifo.read(Config.SAMPLES_PER_FRAME)
+
+        # the mixer copied the frame on passthrough too
+        bytes(Mixer.mix([(Data, 1.0, 1.0)]))
+        copies += 2
+
+    return copies
+
+
+def ring(Fifo):
+    copies = 0
+
+    for _ in range(FRAMES):
+        while Fifo.samples < Config.SAMPLES_PER_FRAME:
+            Fifo.write(Decoded)
+
+        Data = Fifo.read(Config.SAMPLES_PER_FRAME)
+        if Data.obj is not Fifo._data.obj:
+            copies += 1
+
+        Mixer.mix([(Data, 1.0, 1.0)])
+
+    return copies
+
+
+def report(name, func, Fifo):
+    start = time.perf_counter()
+    copies = func(Fifo())
+    elapsed = time.perf_counter() - start
+
+    # traced apart from the timing, since tracing slows down every allocation
+    Fifo = Fifo()
+
+    tracemalloc.start()
+    func(Fifo)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{name:<16} {elapsed / FRAMES * 1e6:>10.2f} us/frame"
+        f" {peak / 1024:>10.1f} KiB peak {copies:>8} copies"
+    )
+
+
+if __name__ == "__main__":
+    print(f"{FRAMES} frames of {Config.FRAME_LENGTH}ms, {FRAME_SIZE} bytes each")
+
+    report("av.AudioFifo", legacy, LegacyFifo)
+    report("AudioFifo ring", ring, AudioFifo)
@@ -0,0 +1,73 @@
+"""Compares the mixing cost per frame of the audioop path with :py:class:`discodo.natives.AudioMixer`.
+
+Usage: ``python -m benchmark.mixer [frames]``"""
+
+import os
+import sys
+import timeit
+
+from discodo.config import Config
+from discodo.natives.AudioMixer import AudioMixer, equalPower
+
+try:
+    import audioop
+except ImportError:  # removed in python 3.13
+    audioop = None
+
+FRAMES = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+FRAME_SIZE = Config.SAMPLES_PER_FRAME * Config.CHANNELS * 2
+
+Current = os.urandom(FRAME_SIZE)
+Next = os.urandom(FRAME_SIZE)
+
+
+def legacyCrossfade():
+    currentVolume, nextVolume = 0.7, 0.3
+
+    Data = audioop.mul(Current, 2, currentVolume)
+    NextData = audioop.mul(Next, 2, nextVolume)
+    Data = audioop.add(Data, NextData, 2)
+
+    return audioop.mul(Data, 2, 0.8)
+
+
+def legacyVolume():
+    return audioop.mul(audioop.mul(Current, 2, 0.9), 2, 0.8)
+
+
+Mixer = AudioMixer()
+
+
+def mixerCrossfade():
+    currentVolume, nextVolume = equalPower(0.3)
+
+    return Mixer.mix(
+        [
+            (Current, currentVolume + 0.01, currentVolume),
+            (Next, nextVolume, nextVolume + 0.01),
+        ],
+        (0.79, 0.8),
+    )
+
+
+def mixerVolume():
+    return Mixer.mix([(Current, 0.89, 0.9)], (0.79, 0.8))
+
+
+def report(name, func):
+    elapsed = timeit.timeit(func, number=FRAMES)
+
+    print(f"{name:<24} {elapsed / FRAMES * 1e6:>10.2f} us/frame")
+
+
+if __name__ == "__main__":
+    print(f"{FRAMES} frames of {Config.FRAME_LENGTH}ms, {FRAME_SIZE} bytes each")
+
+    if audioop:
+        report("audioop crossfade", legacyCrossfade)
+        report("audioop volume", legacyVolume)
+    else:
+        print("audioop is not available, skipping the legacy path.")
+
+    report("AudioMixer crossfade", mixerCrossfade)
+    report("AudioMixer volume", mixerVolume)
@@ -0,0 +1,135 @@
+"""Compares the cpu time of the decode stage with the resampler the loader built again on every seek before,
+and :py:class:`discodo.natives.AudioResampler` which keeps a resampler for each input format over seeks.
+The frames already in the output format are passed through by pyav in both, the flac48 and wav rows show its cost.
+
+A corpus of common formats is encoded to a temporary directory, each file is decoded and converted
+with a seek every ``SEEK_INTERVAL`` seconds, and the cpu seconds per minute of audio are reported.
+
+Usage: ``python -m benchmark.resample [seconds]``"""
+
+import os
+import sys
+import tempfile
+import time
+
+import av
+import numpy
+
+from discodo.config import Config
+from discodo.natives.AudioResampler import AudioResampler
+
+SECONDS = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+SEEK_INTERVAL = 10
+ROUNDS = 3
+
+# name, encoder, sample rate, sample format and samples per frame of the encoder
+CORPUS = [
+    ("opus", "libopus", 48000, "s16", 960),
+    ("aac", "aac", 44100, "fltp", 1024),
+    ("mp3", "libmp3lame", 44100, "s16p", 1152),
+    ("flac", "flac", 44100, "s16", 4608),
+    ("flac48", "flac", 48000, "s16", 4608),
+    ("wav", "pcm_s16le", 48000, "s16", 1024),
+]
+EXTENSIONS = {"opus": "ogg", "aac": "m4a", "mp3": "mp3", "wav": "wav"}
+
+
+def encode(path, codec, rate, format, frameSize):
+    Container = av.open(path, "w")
+    Stream = Container.add_stream(codec, rate=rate)
+    Stream.layout = "stereo"
+    Stream.format = format
+
+    Time = numpy.arange(SECONDS * rate) / rate
+    Signal = numpy.sin(2 * numpy.pi * (220 + 20 * Time) * Time) * 0.3
+    Signal = numpy.stack([Signal, numpy.roll(Signal, 100)], axis=1)
+    Signal += numpy.random.uniform(-0.05, 0.05, Signal.shape)
+    Pcm = (Signal * 32767).astype(numpy.int16)
+
+    Resampler = av.AudioResampler(format=format, layout="stereo", rate=rate)
+
+    for start in range(0, len(Pcm) - frameSize + 1, frameSize):
+        Frame = av.AudioFrame.from_ndarray(
+            Pcm[start : start + frameSize].reshape(1, -1), format="s16", layout="stereo"
+        )
+        Frame.sample_rate = rate
+
+        Converted = Resampler.resample(Frame)
+        for Converted in Converted if isinstance(Converted, list) else [Converted]:
+            Container.mux(Stream.encode(Converted))
+
+    Container.mux(Stream.encode(None))
+    Container.close()
+
+
+class LegacyResampler:
+    """The resampler of the loader before, which is built again on every seek and resamples every frame."""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.Resampler = av.AudioResampler(
+            format=av.AudioFormat("s16").packed, layout="stereo", rate=48000
+        )
+
+    def resample(self, Frame):
+        return self.Resampler.resample(Frame)
+
+
+def decode(path, Resampler=None):
+    Container = av.open(path)
+    Stream = Container.streams.audio[0]
+
+    seekAt = SEEK_INTERVAL
+    start = time.process_time()
+
+    for Frame in Container.decode(Stream):
+        if Resampler is None:
+            continue
+
+        if Frame.time is not None and Frame.time >= seekAt:
+            seekAt += SEEK_INTERVAL
+            Resampler.reset()
+
+        Frame.pts = None
+        Resampler.resample(Frame)
+
+    elapsed = time.process_time() - start
+    Container.close()
+
+    return elapsed
+
+
+def report(name, path):
+    decodeTime, legacyTime, currentTime = (
+        min(decode(path, Resampler()) for _ in range(ROUNDS))
+        if Resampler
+        else min(decode(path) for _ in range(ROUNDS))
+        for Resampler in (None, LegacyResampler, AudioResampler)
+    )
+    perMinute = 60 / SECONDS * 1000
+
+    print(
+        f"{name:<8} {decodeTime * perMinute:>10.1f} {legacyTime * perMinute:>10.1f}"
+        f" {currentTime * perMinute:>10.1f}"
+        f" {(legacyTime - decodeTime) * perMinute:>10.1f} {(currentTime - decodeTime) * perMinute:>10.1f}"
+    )
+
+
+if __name__ == "__main__":
+    print(
+        f"{SECONDS}s of audio, a seek every {SEEK_INTERVAL}s, {Config.SAMPLING_RATE}Hz output"
+    )
+    print("cpu ms per minute of audio, the best of", ROUNDS, "rounds")
+    print(
+        f"{'format':<8} {'decode':>10} {'before':>10} {'after':>10}"
+        f" {'converted':>10} {'converted':>10}"
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, codec, rate, format, frameSize in CORPUS:
+            path = os.path.join(directory, f"{name}.{EXTENSIONS.get(name, 'flac')}")
+
+            encode(path, codec, rate, format, frameSize)
+            report(name, path)
@@ -161,11 +161,73 @@ playerGroup.add_argument(
     default=True,
     help="player's default auto related play state (default: True)",
 )
+playerGroup.add_argument(
+    "--default-gapless",
+    action="store_true",
+    help="play the next source right after the current one ends without gap (default: False)",
+)
+playerGroup.add_argument(
+    "--default-normalize",
+    action="store_true",
+    help="normalize the loudness of the sources with the cached analysis (default: False)",
+)
+playerGroup.add_argument(
+    "--opus-passthrough",
+    action="store_true",
+    help="send the packets of opus sources without transcoding while no volume, filter or crossfade is applied (default: False)",
+)
+playerGroup.add_argument(
+    "--loudness-target",
+    type=float,
+    default=-14.0,
+    help="target loudness of the normalization in LUFS (default: -14.0)",
+)
+playerGroup.add_argument(
+    "--loudness-cache",
+    type=str,
+    default=Config.LOUDNESS_CACHE,
+    help="json file path to keep the measured loudness of the sources",
+)
 playerGroup.add_argument(
     "--bufferlimit",
     type=int,
     default=5,
-    help="seconds of audio will be loaded in buffer (default: 5)",
+    help="seconds of audio will be loaded in buffer at first, adapted to the source (default: 5)",
+)
+playerGroup.add_argument(
+    "--min-bufferlimit",
+    type=float,
+    default=1.0,
+    help="seconds of audio the buffer of a source is shrunk to at least (default: 1.0)",
+)
+playerGroup.add_argument(
+    "--max-bufferlimit",
+    type=float,
+    default=30.0,
+    help="seconds of audio the buffer of a source is grown to at most (default: 30.0)",
+)
+playerGroup.add_argument(
+    "--max-live-bufferlimit",
+    type=float,
+    default=10.0,
+    help="seconds of audio the buffer of a live stream is grown to at most (default: 10.0)",
+)
+playerGroup.add_argument(
+    "--buffer-memory",
+    type=int,
+    default=None,
+    help="megabytes of the buffers of all sources, scaled down over it (default: unlimited)",
+)
+playerGroup.add_argument(
+    "--compressed-buffer",
+    action="store_true",
+    help="buffer the demuxed packets and decode only a few frames ahead of the player to save memory (default: False)",
+)
+playerGroup.add_argument(
+    "--pcm-window",
+    type=int,
+    default=3,
+    help="frames decoded ahead of the player with the compressed buffer (default: 3)",
 )
 playerGroup.add_argument(
     "--preload",
@@ -173,6 +235,84 @@ playerGroup.add_argument(
     default=10,
     help="seconds to load next song before this song ends (default: 10)",
 )
+playerGroup.add_argument(
+    "--seek-history",
+    type=float,
+    default=5.0,
+    help="seconds of demuxed packets kept to seek inside them without I/O, 0 to disable (default: 5.0)",
+)
+playerGroup.add_argument(
+    "--http-prefetch",
+    type=int,
+    default=0,
+    help="ranges of 256KB requested ahead on keep-alive connections to read http streams, 0 to use the http client of ffmpeg (default: 0)",
+)
+playerGroup.add_argument(
+    "--stream-cache",
+    type=str,
+    default=None,
+    help="directory to keep the played audio streams to play them again without downloading (default: disabled)",
+)
+playerGroup.add_argument(
+    "--stream-cache-size",
+    type=int,
+    default=1024,
+    help="megabytes of the stream cache, the least recently played are removed over it (default: 1024)",
+)
+playerGroup.add_argument(
+    "--segment-cache",
+    type=int,
+    default=0,
+    help="megabytes of the decoded audio shared by the sources playing the same track, 0 to disable (default: 0)",
+)
+playerGroup.add_argument(
+    "--packet-cache",
+    type=str,
+    default=None,
+    help="directory to keep the encoded packets of the tracks played often to send them without decoding (default: disabled)",
+)
+playerGroup.add_argument(
+    "--packet-cache-size",
+    type=int,
+    default=512,
+    help="megabytes of the packet cache, the least recently played are removed over it (default: 512)",
+)
+playerGroup.add_argument(
+    "--packet-cache-plays",
+    type=int,
+    default=3,
+    help="times a track is played before its packets are kept (default: 3)",
+)
+playerGroup.add_argument(
+    "--shared-scheduler",
+    action="store_true",
+    help="drive all players with a fixed pool of mixer threads",
+)
+playerGroup.add_argument(
+    "--mixer-threads",
+    type=int,
+    default=None,
+    help="mixer thread count of the shared scheduler (default: cpu core count)",
+)
+playerGroup.add_argument(
+    "--pacing-policy",
+    type=str,
+    choices=["burst", "drop", "stretch"],
+    default="burst",
+    help="what to do with the frames missed while the player stalled (default: burst)",
+)
+playerGroup.add_argument(
+    "--decoder-threads",
+    type=int,
+    default=None,
+    help="thread count of the decoder pool (default: twice the cpu core count)",
+)
+playerGroup.add_argument(
+    "--decoder-processes",
+    type=int,
+    default=0,
+    help="decode the sources in this number of worker processes, needs python 3.8 or later (default: 0)",
+)
 playerGroup.add_argument(
     "--timeout",
     type=int,
@@ -224,7 +364,31 @@ def main():
         Config.DEFAULT_AUTOPLAY = args.default_autoplay
         Config.DEFAULT_VOLUME = args.default_volume
         Config.DEFAULT_CROSSFADE = args.default_crossfade
+        Config.DEFAULT_GAPLESS = args.default_gapless
+        Config.DEFAULT_NORMALIZE = args.default_normalize
+        Config.OPUS_PASSTHROUGH = args.opus_passthrough
+        Config.LOUDNESS_TARGET = args.loudness_target
+        Config.LOUDNESS_CACHE = args.loudness_cache
+        Config.SHARED_SCHEDULER = args.shared_scheduler
+        Config.MIXER_THREADS = args.mixer_threads
+        Config.PACING_POLICY = args.pacing_policy
+        Config.DECODER_THREADS = args.decoder_threads
+        Config.DECODER_PROCESSES = args.decoder_processes
         Config.BUFFERLIMIT = args.bufferlimit
+        Config.MIN_BUFFERLIMIT = args.min_bufferlimit
+        Config.MAX_BUFFERLIMIT = args.max_bufferlimit
+        Config.MAX_LIVE_BUFFERLIMIT = args.max_live_bufferlimit
+        Config.BUFFER_MEMORY = args.buffer_memory
+        Config.COMPRESSED_BUFFER = args.compressed_buffer
+        Config.PCM_WINDOW = args.pcm_window
+        Config.SEEK_HISTORY = args.seek_history
+        Config.HTTP_PREFETCH = args.http_prefetch
+        Config.STREAM_CACHE = args.stream_cache
+        Config.STREAM_CACHE_SIZE = args.stream_cache_size
+        Config.SEGMENT_CACHE = args.segment_cache
+        Config.PACKET_CACHE = args.packet_cache
+        Config.PACKET_CACHE_SIZE = args.packet_cache_size
+        Config.PACKET_CACHE_PLAYS = args.packet_cache_plays
         Config.VCTIMEOUT = args.timeout
         Config.ENABLED_EXT_RESOLVER = args.enabled_resolver
         Config.SPOTIFY_ID = args.spotify_id
@@ -41,6 +41,8 @@ class VoiceClient:
         self._volume = 1.0
         self._crossfade = 10.0
         self._autoplay = True
+        self._gapless = False
+        self._normalize = False
         self._filter = {}
         self._context = {}
 
@@ -103,6 +105,22 @@ class VoiceClient:
 
         return self._autoplay
 
+    @property
+    def gapless(self):
+        """Represents the gapless state of this guild.
+
+        :rtype: bool"""
+
+        return self._gapless
+
+    @property
+    def normalize(self):
+        """Represents the loudness normalization state of this guild.
+
+        :rtype: bool"""
+
+        return self._normalize
+
     @property
     def filter(self):
         """Represents the autoplay state of this guild.
@@ -149,6 +167,8 @@ class VoiceClient:
         self._volume = options["volume"]
         self._crossfade = options["crossfade"]
         self._autoplay = options["autoplay"]
+        self._gapless = options.get("gapless", False)
+        self._normalize = options.get("normalize", False)
         self._filter = options["filter"]
 
         self._current = data["current"]
@@ -302,6 +322,8 @@ class VoiceClient:
         :param Optional[float] volume: The volume of the player to change.
         :param Optional[float] crossfade: The crossfade of the player to change.
         :param Optional[bool] autoplay: The autoplay state of the player to change.
+        :param Optional[bool] gapless: The gapless state of the player to change.
+        :param Optional[bool] normalize: The loudness normalization state of the player to change.
         :param Optional[dict] filter: The filter object of the player to change.
 
         :rtype: dict"""
@@ -312,6 +334,10 @@ class VoiceClient:
             self._crossfade = options["crossfade"]
         if "autoplay" in options:
             self._autoplay = options["autoplay"]
+        if "gapless" in options:
+            self._gapless = options["gapless"]
+        if "normalize" in options:
+            self._normalize = options["normalize"]
         if "filter" in options:
             self._filter = options["filter"]
 
@@ -344,6 +370,24 @@ class VoiceClient:
 
         return await self.setOptions(autoplay=autoplay)
 
+    async def setGapless(self, gapless):
+        r"""Set gapless state of the player
+
+        :param bool gapless: The gapless state of the player to change.
+
+        :rtype: dict"""
+
+        return await self.setOptions(gapless=gapless)
+
+    async def setNormalize(self, normalize):
+        r"""Set loudness normalization state of the player
+
+        :param bool normalize: The loudness normalization state of the player to change.
+
+        :rtype: dict"""
+
+        return await self.setOptions(normalize=normalize)
+
     async def setFilter(self, filter):
         r"""Set filter of the player
 
@@ -400,6 +444,15 @@ class VoiceClient:
 
         return data
 
+    async def fetchTelemetry(self):
+        r"""Fetch pacing statistics of the player like tick lateness and dropped frames.
+
+        :rtype: dict"""
+
+        data = await self.query("getTelemetry")
+
+        return data
+
     async def fetchQueue(self, ws=True):
         r"""Fetch queue to force refresh the internal queue.
 
@@ -501,6 +554,8 @@ class VoiceClient:
             volume=self.volume,
             crossfade=self.crossfade,
             autoplay=self.autoplay,
+            gapless=self.gapless,
+            normalize=self.normalize,
             filter=self.filter,
         )
 
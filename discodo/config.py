@@ -1,3 +1,5 @@
+import os
+import tempfile
 from typing import Optional, Union
 
 from .planner import RoutePlanner
@@ -16,14 +18,44 @@ class _Config:
         "DEFAULT_AUTOPLAY",
         "DEFAULT_VOLUME",
         "DEFAULT_CROSSFADE",
+        "DEFAULT_GAPLESS",
+        "GAPLESS_FRAMES",
+        "DEFAULT_NORMALIZE",
+        "LOUDNESS_TARGET",
+        "LOUDNESS_CACHE",
+        "SHARED_SCHEDULER",
+        "MIXER_THREADS",
+        "PLAYER_LAG_THRESHOLD",
+        "PACING_POLICY",
+        "DECODER_THREADS",
+        "DECODER_PROCESSES",
         "SAMPLING_RATE",
         "CHANNELS",
         "FRAME_LENGTH",
         "SAMPLE_SIZE",
         "EXPECTED_PACKETLOSS",
         "BITRATE",
+        "OPUS_PASSTHROUGH",
+        "SILENCE_SUPPRESSION",
+        "SILENCE_THRESHOLD",
+        "ENCODE_AHEAD",
         "BUFFERLIMIT",
+        "MIN_BUFFERLIMIT",
+        "MAX_BUFFERLIMIT",
+        "MAX_LIVE_BUFFERLIMIT",
+        "BUFFER_MEMORY",
+        "COMPRESSED_BUFFER",
+        "PCM_WINDOW",
+        "FAST_APPLY",
         "PRELOAD_TIME",
+        "SEEK_HISTORY",
+        "HTTP_PREFETCH",
+        "STREAM_CACHE",
+        "STREAM_CACHE_SIZE",
+        "SEGMENT_CACHE",
+        "PACKET_CACHE",
+        "PACKET_CACHE_SIZE",
+        "PACKET_CACHE_PLAYS",
         "VCTIMEOUT",
         "ENABLED_EXT_RESOLVER",
         "PLAYLIST_PAGE_LIMIT",
@@ -48,6 +80,21 @@ class _Config:
         self.DEFAULT_AUTOPLAY: bool = True
         self.DEFAULT_VOLUME: float = 1.0
         self.DEFAULT_CROSSFADE: float = 10.0
+        self.DEFAULT_GAPLESS: bool = False
+        self.GAPLESS_FRAMES: int = 5  # frames to be decoded before handoff
+        self.DEFAULT_NORMALIZE: bool = False
+        self.LOUDNESS_TARGET: float = -14.0  # LUFS
+        self.LOUDNESS_CACHE: Optional[str] = os.path.join(
+            tempfile.gettempdir(), "discodo-loudness.json"
+        )  # None: in memory only
+
+        # SCHEDULER
+        self.SHARED_SCHEDULER: bool = False
+        self.MIXER_THREADS: Optional[int] = None  # None: the number of cores
+        self.PLAYER_LAG_THRESHOLD: float = 20.0  # ms
+        self.PACING_POLICY: str = "burst"  # burst, drop, stretch
+        self.DECODER_THREADS: Optional[int] = None  # None: twice the number of cores
+        self.DECODER_PROCESSES: int = 0  # 0: decode in the node process
 
         # AUDIO
         self.SAMPLING_RATE: int = 48000
@@ -56,10 +103,31 @@ class _Config:
         self.SAMPLE_SIZE: int = 4
         self.EXPECTED_PACKETLOSS: int = 0
         self.BITRATE: int = 128
+        self.OPUS_PASSTHROUGH: bool = False  # send unprocessed opus as it is
+        self.SILENCE_SUPPRESSION: bool = False
+        self.SILENCE_THRESHOLD: float = 8.0  # rms of s16 samples
+        self.ENCODE_AHEAD: int = 3  # frames
 
         # BUFFER
-        self.BUFFERLIMIT: int = 5
+        self.BUFFERLIMIT: int = 5  # initial seconds of a source
+        self.MIN_BUFFERLIMIT: float = 1.0
+        self.MAX_BUFFERLIMIT: float = 30.0
+        self.MAX_LIVE_BUFFERLIMIT: float = 10.0  # live streams are loaded in realtime
+        self.BUFFER_MEMORY: Optional[int] = None  # MB of all sources, None: unlimited
+        self.COMPRESSED_BUFFER: bool = False  # buffer packets, not pcm
+        self.PCM_WINDOW: int = 3  # frames decoded ahead with COMPRESSED_BUFFER
+        self.FAST_APPLY: bool = False  # refill the buffer on filter changes
         self.PRELOAD_TIME: int = 10
+        self.SEEK_HISTORY: float = 5.0  # seconds of packets to seek in, 0: disabled
+        self.HTTP_PREFETCH: int = 0  # ranges requested ahead, 0: ffmpeg http
+
+        # CACHE
+        self.STREAM_CACHE: Optional[str] = None  # directory, None: disabled
+        self.STREAM_CACHE_SIZE: int = 1024  # MB
+        self.SEGMENT_CACHE: int = 0  # MB of shared decoded audio, 0: disabled
+        self.PACKET_CACHE: Optional[str] = None  # directory, None: disabled
+        self.PACKET_CACHE_SIZE: int = 512  # MB
+        self.PACKET_CACHE_PLAYS: int = 3  # plays to encode a track to the cache
 
         # CONNECTION
         self.VCTIMEOUT: float = 300.0
@@ -200,7 +200,7 @@ class VoiceConnector:
 
         return getattr(Cipher, self.encryptMode)(self.secretKey, header, data)  # type: ignore
 
-    def send(self, data: bytes, encode: bool = True):
+    def send(self, data: bytes, encode: bool = True, samples: int = None):
         self.sequence += 1
         if encode:
             data = self.encoder.encode(data)
@@ -208,4 +208,4 @@ class VoiceConnector:
         Packet = self.makePacket(data)
 
         self.socket.sendto(Packet, (self.endpointIp, self.endpointPort))
-        self.timestamp += Config.SAMPLES_PER_FRAME
+        self.timestamp += samples or Config.SAMPLES_PER_FRAME
@@ -0,0 +1,170 @@
+import collections
+import logging
+import os
+import threading
+import time
+import traceback
+
+from .config import Config
+
+log = logging.getLogger("discodo.decoder")
+
+
+class DecoderPool:
+    """Runs the decode jobs of the sources on a fixed pool of threads instead of a thread per source.
+
+    A job is queued while its buffer has to be filled and runs for ``QUANTUM`` seconds at a time in round robin,
+    the jobs of the sources which are about to underrun are queued in front.
+    When the buffer is full, the job is parked until the buffer event of its fifo is set again.
+
+    While the steps of a job can wait on the network, such as opening a container, it runs on a thread of its own
+    not to stall the other jobs, which is parked with the job and kept until it is not ``blocking`` anymore."""
+
+    QUANTUM = 0.01
+
+    def __init__(self) -> None:
+        self.threads = []
+        self.jobs = set()
+        self.queue = collections.deque()
+        self.blocking = {}  # job: the event waking its own thread
+
+        self._condition = threading.Condition()
+
+    def __repr__(self) -> str:
+        return f"<DecoderPool threads={len(self.threads)} jobs={len(self.jobs)} queue={len(self.queue)}>"
+
+    @property
+    def size(self) -> int:
+        return Config.DECODER_THREADS or (os.cpu_count() or 1) * 2
+
+    def submit(self, job) -> None:
+        with self._condition:
+            while len(self.threads) < self.size:
+                thread = threading.Thread(
+                    target=self.work,
+                    name=f"discodo-decoder-{len(self.threads)}",
+                    daemon=True,
+                )
+                thread.start()
+
+                self.threads.append(thread)
+
+            self.jobs.add(job)
+            self.enqueue(job)
+
+    def enqueue(self, job) -> None:
+        if job in self.blocking:
+            # the thread of the job moves it to the pool when it is not blocking anymore
+            job.state = "blocking"
+            self.blocking[job].set()
+            return
+
+        if job.blocking:
+            job.state = "blocking"
+
+            self.blocking[job] = threading.Event()
+            threading.Thread(
+                target=self.workAlone,
+                args=(job,),
+                name="discodo-decoder-blocking",
+                daemon=True,
+            ).start()
+            return
+
+        job.state = "queued"
+
+        if job.starving:
+            self.queue.appendleft(job)
+        else:
+            self.queue.append(job)
+
+        self._condition.notify()
+
+    def wake(self, job) -> None:
+        with self._condition:
+            if job.state == "parked":
+                self.enqueue(job)
+            elif job.state in ("running", "blocking"):
+                job.woken = True
+
+    def work(self) -> None:
+        while True:
+            with self._condition:
+                while not self.queue:
+                    self._condition.wait()
+
+                job = self.queue.popleft()
+                job.state, job.woken = "running", False
+
+            alive = self.run(job)
+
+            with self._condition:
+                self.settle(job, alive)
+
+    def workAlone(self, job) -> None:
+        event = self.blocking[job]
+
+        while True:
+            with self._condition:
+                if not job.blocking:
+                    del self.blocking[job]
+                    return self.enqueue(job)
+
+                job.woken = False
+
+            alive = self.run(job)
+
+            with self._condition:
+                if not alive:
+                    del self.blocking[job]
+                    return self.settle(job, alive)
+
+                if job.woken or job.needFill():
+                    continue
+
+                job.state = "parked"
+                event.clear()
+
+            event.wait()
+
+    def settle(self, job, alive: bool) -> None:
+        if not alive:
+            job.state = "done"
+            self.jobs.discard(job)
+        elif job.woken or job.needFill():
+            self.enqueue(job)
+        else:
+            job.state = "parked"
+
+    def run(self, job) -> bool:
+        sliceStart = time.perf_counter()
+
+        try:
+            while job.step():
+                if (
+                    not job.needFill()
+                    or time.perf_counter() - sliceStart > self.QUANTUM
+                ):
+                    return True
+        except:
+            log.warning(f"while decoding {job}, an error occured, stopped.")
+            traceback.print_exc()
+        finally:
+            job.decodeTime.add(time.perf_counter() - sliceStart)
+
+        job.finish()
+        return False
+
+    def toDict(self) -> dict:
+        with self._condition:
+            jobs = list(self.jobs)
+
+            return {
+                "threads": len(self.threads),
+                "blockingThreads": len(self.blocking),
+                "queue": len(self.queue),
+                "jobs": [job.toDict() for job in jobs],
+            }
+
+
+Decoders = DecoderPool()
@@ -1,48 +1,199 @@
 import logging
 import threading
 import traceback
+from typing import Optional, Union
 
 import av
 
 from ..config import Config
+from ..utils.threadLock import CallbackEvent
 
 log = logging.getLogger("discodo.natives.AudioFifo")
 
 
-class AudioFifo(av.AudioFifo):
+class AudioFifo:
+    """A preallocated ring of s16 interleaved pcm, written by the loader and read by the player.
+
+    The read data is a :py:class:`memoryview` of the ring, which is valid until the next read.
+    The ring grows when a write does not fit, and ``haveToFillBuffer`` is set while less than the limit is buffered.
+
+    :param Optional[int] capacity: The bytes of the ring, defaults to a second more than the limit
+    :param Optional[memoryview] buffer: The memory of the ring to use instead of allocating
+    :param Optional[float] limit: The seconds of audio to buffer, defaults to ``BUFFERLIMIT``"""
+
     SAMPLES_PER_FRAME = Config.SAMPLES_PER_FRAME
+    SAMPLE_SIZE = Config.SAMPLE_SIZE
 
-    def __init__(self, *args, **kwargs) -> None:
-        super().__init__(*args, **kwargs)
+    # the absolute bytes written and released by the reader, the ring on shared memory keeps them in its header
+    written = released = 0
+
+    def __init__(
+        self,
+        capacity: Optional[int] = None,
+        buffer: Optional[memoryview] = None,
+        limit: Optional[float] = None,
+    ) -> None:
+        self.limit = Config.BUFFERLIMIT if limit is None else limit
+        self.capacity = capacity or self.capacityOf(self.limit)
+        self._data = memoryview(bytearray(self.capacity)) if buffer is None else buffer
+        self._scratch = bytearray(self.SAMPLES_PER_FRAME * self.SAMPLE_SIZE)
+
+        self._reading = 0
+        self._lock = threading.Lock()
 
         self.AUDIOBUFFERLIMITMS = (
-            Config.BUFFERLIMIT * (1000 / Config.FRAME_LENGTH) * self.SAMPLES_PER_FRAME
+            self.limit * (1000 / Config.FRAME_LENGTH) * self.SAMPLES_PER_FRAME
         )
 
-        self.haveToFillBuffer = threading.Event()
+        self.haveToFillBuffer = CallbackEvent()
         self.haveToFillBuffer.set()
 
+    def __repr__(self) -> str:
+        return (
+            f"<{type(self).__name__} samples={self.samples} capacity={self.capacity}>"
+        )
+
+    @staticmethod
+    def capacityOf(limit: float) -> int:
+        return int((limit + 1) * Config.SAMPLING_RATE * Config.SAMPLE_SIZE)
+
+    @property
+    def samples(self) -> int:
+        return (self.written - self._reading) // self.SAMPLE_SIZE
+
+    @property
+    def free(self) -> int:
+        return self.capacity - (self.written - self.released)
+
     def is_ready(self) -> bool:
         return self.samples >= self.SAMPLES_PER_FRAME
 
     def check_buffer(self) -> None:
         if self.samples < self.AUDIOBUFFERLIMITMS:
-            self.haveToFillBuffer.set()
+            if not self.haveToFillBuffer.is_set():
+                self.haveToFillBuffer.set()
         else:
             self.haveToFillBuffer.clear()
 
-    def read(self, samples: int = SAMPLES_PER_FRAME) -> bytes:
-        AudioFrame = super().read(samples)
-        if not AudioFrame:
-            return
+    def setLimit(self, limit: float) -> None:
+        """Change the seconds of audio to buffer, the ring is shrunk when it is much larger than needed."""
+
+        self.limit = limit
+        self.AUDIOBUFFERLIMITMS = (
+            limit * (1000 / Config.FRAME_LENGTH) * self.SAMPLES_PER_FRAME
+        )
+
+        capacity = self.capacityOf(limit)
+        if self.capacity > capacity * 2 and self.written - self.released <= capacity:
+            self.resize(capacity)
 
         self.check_buffer()
 
-        return AudioFrame.planes[0].to_bytes()
+    def sync(self) -> None:
+        pass
+
+    def load(
+        self, index: int, size: int, Scratch: Optional[bytearray] = None
+    ) -> memoryview:
+        start = index % self.capacity
+        end = start + size
+
+        if end <= self.capacity:
+            return self._data[start:end]
+
+        if Scratch is None:
+            Scratch = self._scratch if size <= len(self._scratch) else bytearray(size)
+        split = self.capacity - start
+
+        Scratch[:split] = self._data[start:]
+        Scratch[split:size] = self._data[: end - self.capacity]
+
+        return memoryview(Scratch)[:size]
+
+    def store(self, index: int, data: memoryview) -> None:
+        start = index % self.capacity
+        end = start + len(data)
+
+        if end <= self.capacity:
+            self._data[start:end] = data
+        else:
+            split = self.capacity - start
+
+            self._data[start:] = data[:split]
+            self._data[: end - self.capacity] = data[split:]
+
+    def read(
+        self, samples: int = SAMPLES_PER_FRAME, partial: bool = False
+    ) -> Optional[memoryview]:
+        with self._lock:
+            self.released = self._reading
+            self.sync()
 
-    def write(self, *args, **kwargs) -> None:
+            available = self.written - self._reading
+            size = min(samples * self.SAMPLE_SIZE, available) if samples else available
+
+            if not size or (not partial and size < samples * self.SAMPLE_SIZE):
+                return None
+
+            Data = self.load(self._reading, size)
+            self._reading += size
+
+        self.check_buffer()
+
+        return Data
+
+    def skip(self, samples: int) -> int:
+        """Discard the samples without reading, the last read data stays valid.
+
+        :returns: The number of samples discarded.
+        :rtype: int"""
+
+        with self._lock:
+            self.sync()
+
+            size = min(samples * self.SAMPLE_SIZE, self.written - self._reading)
+            size -= size % self.SAMPLE_SIZE
+
+            self._reading += size
+
+        self.check_buffer()
+
+        return size // self.SAMPLE_SIZE
+
+    def reserve(self, size: int) -> bool:
+        if self.free >= size:
+            return True
+
+        self.resize(max(self.capacity * 2, self.written - self.released + size))
+
+        return True
+
+    def resize(self, capacity: int) -> None:
+        """Move the buffered data to a new ring of the capacity, called by the writer."""
+
+        with self._lock:
+            used = self.written - self.released
+            Pending = self.load(self.released, used, bytearray(used))
+
+            self.capacity = capacity
+            self._data = memoryview(bytearray(capacity))
+
+            self.store(self.released, Pending)
+
+    def write(self, data: Union[av.AudioFrame, bytes]) -> None:
         try:
-            super().write(*args, **kwargs)
+            if isinstance(data, av.AudioFrame):
+                data = memoryview(data.planes[0]).cast("B")[
+                    : data.samples * self.SAMPLE_SIZE
+                ]
+            else:
+                data = memoryview(data).cast("B")
+
+            if not self.reserve(len(data)):
+                return
+
+            self.store(self.written, data)
+            self.written += len(data)
         except:
             traceback.print_exc()
             log.warning("while writing on fifo, an error occured, ignored.")
@@ -1,8 +1,48 @@
+import collections
+from typing import Dict, Optional, Tuple
+
 import av
 import av.filter
 
+# the filters keeping no history of the frames, whose graphs can be used again
+STATELESS = {"volume", "pan", "channelmap", "asetrate", "aformat", "abuffersink"}
+# the runtime command of the filters taking the value without the option name
+COMMANDS = {"volume": "volume", "atempo": "tempo"}
+
+
+def parseOptions(filter: str, value: Optional[str]) -> Optional[Dict[str, str]]:
+    """Split the value of a filter to the options of runtime commands, ``None`` when it cannot be.
+
+    :rtype: Optional[Dict[str, str]]"""
+
+    if value is None:
+        return {}
+
+    Options = {}
+    for Option in str(value).split(":"):
+        key, sep, Value = Option.partition("=")
+        if sep:
+            Options[key] = Value
+        elif filter in COMMANDS and not Options:
+            Options[COMMANDS[filter]] = key
+        else:
+            return None
+
+    return Options
+
 
 class AudioFilter:
+    """Filters the decoded frames by a graph of libavfilter, keeping the configured graphs of the latest ``CACHE`` filters.
+
+    Only the graphs of the ``STATELESS`` filters are kept, since libavfilter cannot reset
+    the history of the others, such as the echo of aecho, without closing the graph.
+
+    When only the values of the filters are changed, they are sent to the graph as runtime commands
+    with a pyav which supports them, so an equalizer or atempo keeps playing without a new graph.
+    It needs ``FilterContext.process_command``, which pyav 8.0.3 does not have, so a new graph is configured there."""
+
+    CACHE = 8
+
     def __init__(self) -> None:
         self.selectAudioStream = None
         self._Filters = {}
@@ -10,14 +50,82 @@ class AudioFilter:
         self.Graph = None
         self.configured = False
 
+        # the key of the filters: (graph, chain)
+        self.Graphs = collections.OrderedDict()
+        self._Stream = None
+
+    def __repr__(self) -> str:
+        return f"<AudioFilter filters={self._Filters} cached={len(self.Graphs)}>"
+
+    @staticmethod
+    def keyOf(filters: dict) -> Tuple:
+        return tuple(filters.items())
+
     def setFilters(self, filters: dict) -> None:
-        self._Filters = {}
-        for filter, value in filters.items():
-            self._Filters[filter] = value
-        self._Filters["abuffersink"] = None
+        if self.selectAudioStream is not self._Stream:
+            self.Graphs.clear()
+            self._Stream = self.selectAudioStream
+
+        Filters = {**filters, "abuffersink": None}
+        Key = self.keyOf(Filters)
+
+        if Key in self.Graphs:
+            self.Graphs.move_to_end(Key)
+            self.Graph, self._FilterChains = self.Graphs[Key]
+            self._Filters = Filters
+            self.drain()
+            return
+
+        if self.update(Filters):
+            return
+
+        self._Filters = Filters
 
         self.configure()
 
+    def update(self, Filters: dict) -> bool:
+        """Send the changed values to the current graph as runtime commands.
+
+        :returns: Whether the graph is updated in place.
+        :rtype: bool"""
+
+        if (
+            not self.configured
+            or list(Filters) != list(self._Filters)
+            or not all(
+                hasattr(Context, "process_command") for Context in self._FilterChains
+            )
+        ):
+            return False
+
+        Commands = []
+        for Context, filter in zip(self._FilterChains[1:], Filters):
+            Before = parseOptions(filter, self._Filters[filter])
+            After = parseOptions(filter, Filters[filter])
+
+            if Before is None or After is None or Before.keys() != After.keys():
+                return False
+
+            Commands += [
+                (Context, key, value)
+                for key, value in After.items()
+                if Before[key] != value
+            ]
+
+        try:
+            for Context, key, value in Commands:
+                Context.process_command(key, value)
+        except (av.FFmpegError, ValueError):
+            # the filter does not take the option as a command
+            return False
+
+        self.Graphs.pop(self.keyOf(self._Filters), None)
+        self._Filters = Filters
+        if STATELESS.issuperset(Filters):
+            self.Graphs[self.keyOf(Filters)] = (self.Graph, self._FilterChains)
+
+        return True
+
     def configure(self) -> None:
         if not self.selectAudioStream:
             return
@@ -32,6 +140,19 @@ class AudioFilter:
 
         self.configured = True
 
+        if not STATELESS.issuperset(self._Filters):
+            return
+
+        self.Graphs[self.keyOf(self._Filters)] = (self.Graph, self._FilterChains)
+        while len(self.Graphs) > self.CACHE:
+            self.Graphs.popitem(last=False)
+
+    def drain(self) -> None:
+        """Drop the frames left in the graph, filtered before it is used again."""
+
+        while self.pull():
+            pass
+
     def push(self, Frame: av.AudioFrame) -> None:
         if not self.Graph:
             return
@@ -0,0 +1,139 @@
+import math
+from typing import List, Optional, Tuple, Union
+
+import numpy
+
+from ..config import Config
+
+MAX_GAIN = 2.0
+
+
+def equalPower(progress: float) -> Tuple[float, float]:
+    """Get the gains of the fading out and fading in track with equal power curve.
+
+    :param float progress: The progress of the crossfade between 0.0 and 1.0
+
+    :rtype: Tuple[float, float]"""
+
+    if progress <= 0.0:
+        return 1.0, 0.0
+    if progress >= 1.0:
+        return 0.0, 1.0
+
+    return math.cos(progress * math.pi / 2), math.sin(progress * math.pi / 2)
+
+
+def rms(data: Union[bytes, memoryview]) -> float:
+    """Get the root mean square of s16 pcm data, digital silence is checked without the arithmetic.
+
+    :rtype: float"""
+
+    Samples = numpy.frombuffer(data, dtype=numpy.int16)
+
+    if not Samples.any():
+        return 0.0
+
+    return float(numpy.sqrt(numpy.mean(numpy.square(Samples, dtype=numpy.float32))))
+
+
+class AudioMixer:
+    """Mixes s16 interleaved pcm frames in a single pass.
+
+    Every track is multiplied by a per-sample gain ramp from its previous gain to its new gain,
+    summed up, multiplied by the master gain ramp and clipped to 16 bit range.
+    The mixed data is a view of the output buffer of the mixer, which is valid until the next mix."""
+
+    def __init__(
+        self,
+        samples: int = Config.SAMPLES_PER_FRAME,
+        channels: int = Config.CHANNELS,
+    ) -> None:
+        self.samples = samples
+        self.channels = channels
+
+        self._ramp = (
+            numpy.arange(1, samples + 1, dtype=numpy.float32) / samples
+        ).reshape(-1, 1)
+        self._buffer = numpy.zeros((samples, channels), dtype=numpy.float32)
+        self._scratch = numpy.zeros((samples, channels), dtype=numpy.float32)
+        self._output = numpy.zeros((samples, channels), dtype=numpy.int16)
+
+    def gain(self, start: float, end: float, samples: int):
+        start, end = min(start, MAX_GAIN), min(end, MAX_GAIN)
+
+        if start == end:
+            return numpy.float32(start)
+
+        if samples > self.samples:
+            ramp = (
+                numpy.arange(1, samples + 1, dtype=numpy.float32) / samples
+            ).reshape(-1, 1)
+        else:
+            ramp = self._ramp[:samples] * (self.samples / samples)
+
+        return start + (end - start) * ramp
+
+    def mix(
+        self,
+        tracks: List[Tuple[Union[bytes, memoryview], float, float]],
+        master: Optional[Tuple[float, float]] = None,
+    ) -> Union[bytes, memoryview]:
+        """Mix the tracks and apply the master gain.
+
+        :param list tracks: The list of ``(data, start gain, end gain)``
+        :param Optional[tuple] master: The master gain as ``(start gain, end gain)``
+
+        :rtype: Union[bytes, memoryview]"""
+
+        masterStart, masterEnd = master or (1.0, 1.0)
+
+        if (
+            len(tracks) == 1
+            and tracks[0][1] == tracks[0][2] == 1.0
+            and masterStart == masterEnd == 1.0
+        ):
+            return tracks[0][0]
+
+        frameSize = 2 * self.channels
+        samples = max(len(data) for data, _, _ in tracks) // frameSize
+
+        if samples > self.samples:
+            Buffer = numpy.zeros((samples, self.channels), dtype=numpy.float32)
+            Scratch = numpy.empty_like(Buffer)
+            Output = numpy.empty((samples, self.channels), dtype=numpy.int16)
+        else:
+            Buffer, Scratch = self._buffer[:samples], self._scratch[:samples]
+            Output = self._output[:samples]
+
+        Master = self.gain(masterStart, masterEnd, samples)
+        mixed = False
+
+        for data, start, end in tracks:
+            if start == end == 0.0:
+                continue
+
+            Track = numpy.frombuffer(data, dtype=numpy.int16).reshape(-1, self.channels)
+            length = len(Track)
+
+            Gain = self.gain(start, end, length) * (
+                Master if Master.ndim == 0 else Master[:length]
+            )
+
+            if not mixed:
+                if length < samples:
+                    Buffer.fill(0.0)
+
+                numpy.multiply(Track, Gain, out=Buffer[:length])
+                mixed = True
+            else:
+                numpy.multiply(Track, Gain, out=Scratch[:length])
+                Buffer[:length] += Scratch[:length]
+
+        if not mixed:
+            Buffer.fill(0.0)
+
+        numpy.clip(Buffer, -32768, 32767, out=Buffer)
+
+        numpy.copyto(Output, Buffer, casting="unsafe")
+
+        return memoryview(Output).cast("B")
@@ -0,0 +1,63 @@
+from typing import Dict, Optional, Tuple
+
+import av
+
+from ..config import Config
+
+FORMAT = av.AudioFormat("s16").packed
+
+
+class AudioResampler:
+    """Converts the decoded frames to packed s16 stereo of ``SAMPLING_RATE``, keeping a resampler for each input format.
+
+    The resampler of pyav returns the frames already in the output format as they are,
+    so a source of s16 stereo on the sampling rate is not converted at all.
+    A resampler rejecting a frame, such as pyav 8 does after a discontinuity of the timestamps, is built again."""
+
+    def __init__(self) -> None:
+        self.Resamplers: Dict[Tuple[str, str, int], av.AudioResampler] = {}
+        self.Resampler: Optional[av.AudioResampler] = None
+
+    def __repr__(self) -> str:
+        return f"<AudioResampler formats={list(self.Resamplers)}>"
+
+    @staticmethod
+    def keyOf(Frame: av.AudioFrame) -> Tuple[str, str, int]:
+        return (Frame.format.name, Frame.layout.name, Frame.sample_rate)
+
+    def resamplerOf(
+        self, Frame: av.AudioFrame, rebuild: bool = False
+    ) -> av.AudioResampler:
+        Key = self.keyOf(Frame)
+
+        if rebuild or Key not in self.Resamplers:
+            self.Resamplers[Key] = av.AudioResampler(
+                format=FORMAT, layout="stereo", rate=Config.SAMPLING_RATE
+            )
+
+        return self.Resamplers[Key]
+
+    def resample(self, Frame: av.AudioFrame) -> av.AudioFrame:
+        # the format of the decoded frames can change in a stream
+        self.Resampler = self.resamplerOf(Frame)
+
+        try:
+            return self.Resampler.resample(Frame)
+        except ValueError:
+            self.Resampler = self.resamplerOf(Frame, rebuild=True)
+
+            return self.Resampler.resample(Frame)
+
+    def reset(self) -> None:
+        """Drop the resamplers converting the rate, which keep the delayed samples of the previous position.
+
+        The others convert each frame alone, so they are kept over seeks."""
+
+        self.Resamplers = {
+            Key: Resampler
+            for Key, Resampler in self.Resamplers.items()
+            if Key[2] == Config.SAMPLING_RATE
+        }
+
+        if self.Resampler not in self.Resamplers.values():
+            self.Resampler = None
@@ -0,0 +1,119 @@
+import math
+from typing import Optional
+
+import numpy
+
+from ..config import Config
+
+# ITU-R BS.1770 K-weighting filters for 48kHz
+SHELF = (
+    (1.53512485958697, -2.69169618940638, 1.19839281085285),
+    (1.0, -1.69065929318241, 0.73248077421585),
+)
+HIGHPASS = ((1.0, -2.0, 1.0), (1.0, -1.99004745483398, 0.99007225036621))
+
+ABSOLUTE_GATE = -70.0
+RELATIVE_GATE = -10.0
+
+
+def responsePower(
+    filter: tuple, frequencies: numpy.ndarray, rate: int
+) -> numpy.ndarray:
+    """Get the power response of the biquad filter on the frequencies.
+
+    :rtype: numpy.ndarray"""
+
+    (b0, b1, b2), (a0, a1, a2) = filter
+    z = numpy.exp(-2j * numpy.pi * frequencies / rate)
+
+    return numpy.abs((b0 + b1 * z + b2 * z ** 2) / (a0 + a1 * z + a2 * z ** 2)) ** 2
+
+
+def toLoudness(power) -> float:
+    return -0.691 + 10 * numpy.log10(power)
+
+
+class LoudnessMeter:
+    """Measures the integrated loudness of s16 interleaved pcm in LUFS.
+
+    The K-weighting is applied in frequency domain on every 100ms of the audio,
+    and the gated 400ms blocks overlap by 75% as ITU-R BS.1770 describes."""
+
+    def __init__(
+        self, rate: int = Config.SAMPLING_RATE, channels: int = Config.CHANNELS
+    ) -> None:
+        self.channels = channels
+        self.step = rate // 10
+
+        frequencies = numpy.fft.rfftfreq(self.step, 1 / rate)
+
+        # parseval's theorem on rfft, the mean square of a step is the weighted sum of the bins
+        scale = numpy.full(len(frequencies), 2.0)
+        scale[0] = 1.0
+        if not self.step % 2:
+            scale[-1] = 1.0
+
+        self._weights = (
+            responsePower(SHELF, frequencies, rate)
+            * responsePower(HIGHPASS, frequencies, rate)
+            * scale
+            / self.step ** 2
+        ).astype(numpy.float32)
+
+        self._pending = numpy.empty((0, channels), dtype=numpy.float32)
+        self.powers = []
+
+    def __repr__(self) -> str:
+        return f"<LoudnessMeter duration={len(self.powers) / 10}>"
+
+    def write(self, data) -> None:
+        """Feed s16 interleaved pcm to the meter.
+
+        :param data: The pcm as bytes or an int16 array"""
+
+        Samples = (
+            numpy.frombuffer(data, dtype=numpy.int16)
+            if isinstance(data, (bytes, bytearray, memoryview))
+            else numpy.asarray(data, dtype=numpy.int16)
+        )
+        Samples = Samples.reshape(-1, self.channels).astype(numpy.float32) / 32768
+
+        if len(self._pending):
+            Samples = numpy.concatenate((self._pending, Samples))
+
+        steps = len(Samples) // self.step
+        self._pending = Samples[steps * self.step :]
+
+        if not steps:
+            return
+
+        Spectrum = numpy.fft.rfft(
+            Samples[: steps * self.step].reshape(steps, self.step, self.channels),
+            axis=1,
+        )
+        Power = numpy.abs(Spectrum) ** 2 * self._weights[None, :, None]
+
+        self.powers.extend(Power.sum(axis=(1, 2)).tolist())
+
+    @property
+    def integrated(self) -> Optional[float]:
+        """The gated integrated loudness of the audio written so far in LUFS.
+
+        :rtype: Optional[float]"""
+
+        if len(self.powers) < 4:
+            return None
+
+        Blocks = numpy.convolve(self.powers, numpy.full(4, 0.25), mode="valid")
+        Blocks = Blocks[Blocks > 0]
+        Blocks = Blocks[toLoudness(Blocks) > ABSOLUTE_GATE]
+
+        if not len(Blocks):
+            return None
+
+        relativeGate = toLoudness(Blocks.mean()) + RELATIVE_GATE
+        Blocks = Blocks[toLoudness(Blocks) > relativeGate]
+
+        loudness = toLoudness(Blocks.mean())
+
+        return round(float(loudness), 2) if math.isfinite(loudness) else None
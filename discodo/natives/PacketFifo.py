@@ -0,0 +1,100 @@
+import collections
+import threading
+from typing import List, Optional, Tuple
+
+import av
+
+from ..config import Config
+from ..utils.threadLock import CallbackEvent
+
+
+class PacketFifo:
+    """A fifo of demuxed opus packets with the same buffering rule as :py:class:`AudioFifo`
+
+    :param Optional[float] limit: The seconds of audio to buffer, defaults to ``BUFFERLIMIT``"""
+
+    SAMPLES_PER_FRAME = Config.SAMPLES_PER_FRAME
+
+    def __init__(self, limit: Optional[float] = None) -> None:
+        self.Packets = collections.deque()
+        self.samples = 0
+
+        self._lock = threading.Lock()
+
+        self.haveToFillBuffer = CallbackEvent()
+        self.haveToFillBuffer.set()
+
+        self.setLimit(Config.BUFFERLIMIT if limit is None else limit)
+
+    def setLimit(self, limit: float) -> None:
+        self.limit = limit
+        self.AUDIOBUFFERLIMITMS = (
+            limit * (1000 / Config.FRAME_LENGTH) * self.SAMPLES_PER_FRAME
+        )
+
+        self.check_buffer()
+
+    def is_ready(self) -> bool:
+        return self.samples >= self.SAMPLES_PER_FRAME
+
+    def check_buffer(self) -> None:
+        if self.samples < self.AUDIOBUFFERLIMITMS:
+            if not self.haveToFillBuffer.is_set():
+                self.haveToFillBuffer.set()
+        else:
+            self.haveToFillBuffer.clear()
+
+    def read(
+        self, samples: int = SAMPLES_PER_FRAME, partial: bool = False
+    ) -> List[Tuple[av.Packet, int]]:
+        with self._lock:
+            if not partial and self.samples < samples:
+                return []
+
+            Packets, Read = [], 0
+            while self.Packets and Read < samples:
+                Packet = self.Packets.popleft()
+                Packets.append(Packet)
+
+                Read += Packet[1]
+
+            self.samples -= Read
+
+        self.check_buffer()
+
+        return Packets
+
+    def skip(self, samples: int) -> int:
+        """Discard the packets of the samples.
+
+        :returns: The number of samples discarded.
+        :rtype: int"""
+
+        with self._lock:
+            Skipped = 0
+            while self.Packets and Skipped < samples:
+                Skipped += self.Packets.popleft()[1]
+
+            self.samples -= Skipped
+
+        self.check_buffer()
+
+        return Skipped
+
+    def drain(self) -> List[Tuple[av.Packet, int]]:
+        with self._lock:
+            Packets = list(self.Packets)
+
+            self.Packets.clear()
+            self.samples = 0
+
+        self.check_buffer()
+
+        return Packets
+
+    def write(self, Packet: av.Packet, samples: int) -> None:
+        with self._lock:
+            self.Packets.append((Packet, samples))
+            self.samples += samples
+
+        self.check_buffer()
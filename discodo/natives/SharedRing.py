@@ -0,0 +1,163 @@
+import time
+from typing import Optional
+
+import numpy
+
+from ..config import Config
+from .AudioFifo import AudioFifo
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+
+class SharedRing(AudioFifo):
+    """A single producer, single consumer ring of s16 pcm on shared memory, with the interface of :py:class:`AudioFifo`.
+
+    The decoder process writes to the ring and the player reads from the ring of the same name.
+    The read data is a view of the shared memory, which is valid until the next read.
+
+    :param Optional[int] size: The bytes of the ring to create, defaults to 2 seconds more than ``BUFFERLIMIT``
+    :param Optional[str] name: The name of the ring to attach"""
+
+    HEADER = 128
+
+    # index of the int64 header
+    WRITE, READ, GENERATION, RESET, EOF, CAPACITY = range(6)
+
+    def __init__(self, size: Optional[int] = None, name: Optional[str] = None) -> None:
+        if not shared_memory:
+            raise RuntimeError("Shared memory ring needs python 3.8 or later.")
+
+        self.owner = name is None
+
+        if self.owner:
+            size = size or int(
+                (Config.BUFFERLIMIT + 2) * Config.SAMPLING_RATE * Config.SAMPLE_SIZE
+            )
+            self.Memory = shared_memory.SharedMemory(
+                create=True, size=self.HEADER + size
+            )
+        else:
+            self.Memory = shared_memory.SharedMemory(name=name)
+
+        self._header = numpy.ndarray(8, dtype=numpy.int64, buffer=self.Memory.buf)
+        self._values = numpy.ndarray(
+            2, dtype=numpy.float64, buffer=self.Memory.buf, offset=64
+        )
+
+        if self.owner:
+            self._header[:] = 0
+            self._values[:] = 0.0
+            self._header[self.CAPACITY] = size
+
+        capacity = int(self._header[self.CAPACITY])
+        super().__init__(
+            capacity, self.Memory.buf[self.HEADER : self.HEADER + capacity]
+        )
+
+        self._generation = 0
+        self._reading = int(self._header[self.READ])
+        self.aborted = self.closed = False
+
+    def __repr__(self) -> str:
+        return f"<SharedRing name='{self.name}' samples={self.samples} capacity={self.capacity}>"
+
+    @property
+    def name(self) -> str:
+        return self.Memory.name
+
+    @property
+    def position(self) -> float:
+        return float(self._values[0])
+
+    @position.setter
+    def position(self, value: float) -> None:
+        self._values[0] = value
+
+    @property
+    def duration(self) -> float:
+        return float(self._values[1])
+
+    @duration.setter
+    def duration(self, value: float) -> None:
+        self._values[1] = value
+
+    @property
+    def eof(self) -> bool:
+        return bool(self._header[self.EOF])
+
+    @eof.setter
+    def eof(self, value: bool) -> None:
+        self._header[self.EOF] = int(value)
+
+    @property
+    def written(self) -> int:
+        return int(self._header[self.WRITE])
+
+    @written.setter
+    def written(self, value: int) -> None:
+        self._header[self.WRITE] = value
+
+    @property
+    def released(self) -> int:
+        return int(max(self._header[self.READ], self._header[self.RESET]))
+
+    @released.setter
+    def released(self, value: int) -> None:
+        self._header[self.READ] = value
+
+    @property
+    def samples(self) -> int:
+        if self.owner:
+            self.sync()
+
+            return (self.written - self._reading) // Config.SAMPLE_SIZE
+
+        return (self.written - self.released) // Config.SAMPLE_SIZE
+
+    def sync(self) -> None:
+        generation = int(self._header[self.GENERATION])
+
+        if self._generation != generation:
+            self._generation = generation
+            self._reading = max(self._reading, int(self._header[self.RESET]))
+
+    def reserve(self, size: int) -> bool:
+        if size > self.capacity:
+            raise ValueError("Data is larger than the ring.")
+
+        while self.free < size:
+            if self.aborted or self.closed:
+                return False
+
+            time.sleep(0.005)
+
+        return True
+
+    def resize(self, capacity: int) -> None:
+        pass
+
+    def reset(self) -> None:
+        """Discard the written data, called by the writer."""
+
+        self._header[self.RESET] = self._header[self.WRITE]
+        self._header[self.GENERATION] += 1
+
+        self.check_buffer()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+
+        self._header = self._values = self._data = None
+
+        try:
+            self.Memory.close()
+        except BufferError:
+            pass
+
+        if self.owner:
+            self.Memory.unlink()
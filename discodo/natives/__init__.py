@@ -1,4 +1,9 @@
 from . import opus
 from .AudioFifo import AudioFifo
 from .AudioFilter import AudioFilter
+from .AudioMixer import AudioMixer
+from .AudioResampler import AudioResampler
 from .encrypt import Cipher
+from .LoudnessMeter import LoudnessMeter
+from .PacketFifo import PacketFifo
+from .SharedRing import SharedRing
@@ -1,8 +1,10 @@
-import array
 import ctypes
 import ctypes.util
 import os
 import sys
+from typing import Union
+
+import numpy
 
 from ..config import Config
 
@@ -135,6 +137,34 @@ SIGNAL_CTL = {
 }
 
 
+SILENCE_FRAME = b"\xf8\xff\xfe"
+SILENCE_FRAMES = 5
+
+
+def getPacketSamples(Packet: bytes) -> int:
+    """Get the sample count of the opus packet from its TOC byte. the unit is 48kHz samples.
+
+    :rtype: int"""
+
+    config, code = Packet[0] >> 3, Packet[0] & 0x03
+
+    if config < 12:
+        frameSize = (480, 960, 1920, 2880)[config % 4]
+    elif config < 16:
+        frameSize = (480, 960)[config % 2]
+    else:
+        frameSize = (120, 240, 480, 960)[config % 4]
+
+    if code == 0:
+        frames = 1
+    elif code in (1, 2):
+        frames = 2
+    else:
+        frames = Packet[1] & 0x3F
+
+    return frameSize * frames
+
+
 class Encoder:
     def __init__(self, application: int = ENCODER_CTL["APPLICATION_AUDIO"]) -> None:
         self.application = application
@@ -153,6 +183,9 @@ class Encoder:
             )
 
         self.state = self.createState()
+        self._output = ctypes.create_string_buffer(
+            self.SAMPLES_PER_FRAME * self.SAMPLE_SIZE
+        )
         self.setBitrate(self.BITRATE)
         self.setFec(True)
         self.setExpectedPacketLoss(self.EXPECTED_PACKETLOSS)
@@ -201,14 +234,18 @@ class Encoder:
     def setExpectedPacketLoss(self, percentage: float) -> None:
         _library.opus_encoder_ctl(self.state, ENCODER_CTL["CTL_SET_PLP"], percentage)
 
-    def encode(self, Pcm: bytes, FrameSize: int = None) -> bytes:
+    def encode(self, Pcm: Union[bytes, memoryview], FrameSize: int = None) -> bytes:
         if not FrameSize:
             FrameSize = self.SAMPLES_PER_FRAME
 
-        max_length = len(Pcm)
-        Pcm = ctypes.cast(Pcm, c_int16_pointer)
-        Data = (ctypes.c_char * max_length)()
+        Pcm = numpy.frombuffer(Pcm, dtype=numpy.int16)
 
-        Encoded = _library.opus_encode(self.state, Pcm, FrameSize, Data, max_length)
+        Encoded = _library.opus_encode(
+            self.state,
+            Pcm.ctypes.data_as(c_int16_pointer),
+            FrameSize,
+            self._output,
+            len(self._output),
+        )
 
-        return array.array("b", Data[:Encoded]).tobytes()
+        return ctypes.string_at(self._output, Encoded)
@@ -1,17 +1,30 @@
 import asyncio
-import audioop
+import collections
 import contextlib
 import logging
 import threading
 import time
 import traceback
+import weakref
 
 from .config import Config
 from .errors import NotPlaying
+from .natives import AudioMixer
+from .natives.AudioMixer import MAX_GAIN, equalPower, rms
+from .natives.LoudnessMeter import LoudnessMeter
+from .natives.opus import SILENCE_FRAME, SILENCE_FRAMES, getPacketSamples
+from .scheduler import Scheduler
 from .source import AudioData, AudioSource
+from .utils import Pacer, PlayerTelemetry
+from .utils.loudness import Loudness
 
 log = logging.getLogger("discodo.player")
 
+# the seconds decoded before the position to stop replaying at, the buffered audio after it is skipped
+PREWARM_MARGIN = 0.5
+# the seconds of silence before the frames are suppressed, not to toggle speaking on short pauses
+SILENCE_HOLD = 0.5
+
 
 class Player(threading.Thread):
     def __init__(self, client):
@@ -22,13 +35,26 @@ class Player(threading.Thread):
 
         self._end = threading.Event()
 
+        self.scheduler = self.pacer = None
+
         self._getSourceTask = None
         self._current = self._next = None
-        self._volume = client.volume
+        self._volume = self._appliedVolume = client.volume
+        self._appliedVolumes = weakref.WeakKeyDictionary()
+        self.mixer = AudioMixer()
+        self.FrameRing = collections.deque()
+        self._frameLock = threading.Lock()
+        # counted up when the frames are flushed, the frames encoded across it are dropped
+        self._generation = 0
+        self._rewound = False
+        self.telemetry = PlayerTelemetry()
 
         self.loops = 0
         self.crossfadeLoops = 0
+        self.silentFrames = 0
         self._request_dispatched = False
+        self._transition = None
+        self._underrun = None
 
     def __del__(self):
         self.stop()
@@ -42,6 +68,8 @@ class Player(threading.Thread):
         return (1.0 / (self.crossfade / Config.DELAY)) if self.crossfade else 1.0
 
     def seek(self, offset):
+        self.flush()
+
         if self.current:
             return self.current.seek(offset)
         if self.client.Queue:
@@ -60,15 +88,24 @@ class Player(threading.Thread):
         if self._current.filter != self.client.filter:
             self._current.filter = self.client.filter
 
-        if not self._current.BufferLoader:
+        if not self._current.BufferLoader and not self._current.played:
             self.client.dispatcher.dispatch("SOURCE_START", source=self._current)
-            self._current.start()
+
+            if not self._current.Replay:
+                self._current.start()
 
         return self._current
 
     def clearCurrent(self):
         self.client.dispatcher.dispatch("SOURCE_STOP", source=self._current)
 
+        if self._current.LoudnessMeter and self._current.loudness is not None:
+            Loudness.set(
+                self._current.AudioData.id,
+                self._current.loudness,
+                loop=self.client.loop,
+            )
+
         self.client.loop.call_soon_threadsafe(self._current.cleanup)
         self._current = None
 
@@ -85,6 +122,7 @@ class Player(threading.Thread):
                 self._current.remain <= (Config.PRELOAD_TIME + self.crossfade)
                 and not (self._current.AudioData and self._current.AudioData.is_live)
             )
+            or (self.client.gapless and self._current.stopped)
         )
 
         if not self._next:
@@ -126,7 +164,10 @@ class Player(threading.Thread):
             self._next.filter = self.client.filter
 
         if self._current and not self._next.BufferLoader:
-            if is_load_condition:
+            if is_load_condition and (self.crossfade or not self._next.Replay):
+                # the crossfade mixes the decoded audio of the next source
+                self._next.stopReplay()
+
                 self.client.dispatcher.dispatch("SOURCE_START", source=self._next)
                 self._next.start()
 
@@ -165,6 +206,15 @@ class Player(threading.Thread):
 
                 Source.volume = 1.0
                 Source.filter = self.client.filter
+
+                if Data.id:
+                    Source.loudness = Loudness.get(Data.id)
+                    if (
+                        Source.loudness is None
+                        and self.client.normalize
+                        and not Data.is_live
+                    ):
+                        Source.LoudnessMeter = LoudnessMeter()
             except Exception:
                 log.exception(f"while processing AudioData {Source}, an error occured")
                 self.client.dispatcher.dispatch(
@@ -180,17 +230,55 @@ class Player(threading.Thread):
                 Task(*args, **kwargs), self.client.loop
             )
 
-    def read(self):
-        if not self.current:
-            return
+    def read(self, Prefix: bytes = b""):
+        if not self.current or self.current.Replay:
+            return self.pad(Prefix)
+
+        loading = self.current.loading
+        Data = self.current.read(
+            Config.SAMPLES_PER_FRAME - len(Prefix) // Config.SAMPLE_SIZE, timeout=0
+        )
+
+        if not Data and loading and self.current.volume > 0.0:
+            self.underrun(self.current)
+
+            return self.pad(Prefix)
+
+        self.recover()
 
-        Data = self.current.read()
+        if self.current.filterLatency is not None:
+            self.telemetry.controlLatency.add(self.current.filterLatency)
+            self.current.filterLatency = None
 
         if not Data or self.current.volume <= 0.0:
+            if not Data and not self.isHandoffReady():
+                # the tail is held to continue into the next source without a gap
+                if not self._transition:
+                    self._transition = [self._current, 0.0]
+
+                return self.pad(Prefix)
+
+            Tail = (
+                self.current.AudioFifo.read(
+                    Config.SAMPLES_PER_FRAME - len(Prefix) // Config.SAMPLE_SIZE,
+                    partial=True,
+                )
+                if not Data and self.client.gapless and self.current.AudioFifo
+                else None
+            )
+
+            Previous = self._current
+
             self.crossfadeLoops = 0
             self.current = None
 
-            return self.read()
+            if not self._transition and (self.next or self.client.Queue):
+                self._transition = [Previous, 0.0]
+
+            return self.read(Prefix + (Tail or b""))
+
+        if Prefix:
+            Data = Prefix + Data
 
         is_crossfade_timing = self.next and (
             (
@@ -200,16 +288,17 @@ class Player(threading.Thread):
             or self.current.skipped
         )
 
+        Tracks = [(Data, self.current)]
+
         if is_crossfade_timing and self.next.AudioFifo.is_ready():
-            NextData = self.next.read()
+            NextData = self.next.read(timeout=0)
             if NextData:
                 self.crossfadeLoops += 1
                 crossfadeVolume = self.crossfadeVolume * self.crossfadeLoops
 
-                self.current.volume = 1.0 - crossfadeVolume
-                self.next.volume = crossfadeVolume
+                self.current.volume, self.next.volume = equalPower(crossfadeVolume)
 
-                Data = audioop.add(Data, NextData, 2)
+                Tracks.append((NextData, self.next))
         elif self.next:
             self.next.volume = 1.0 if self.crossfade == 0 else 0.0
 
@@ -222,7 +311,158 @@ class Player(threading.Thread):
             elif self.current.volume > 1.0:
                 self.current.volume = 1.0
 
-        return Data
+        return self.mix(Tracks)
+
+    def isHandoffReady(self) -> bool:
+        """Whether the next source has ``Config.GAPLESS_FRAMES`` frames buffered to continue without a gap,
+        or will not buffer more.
+
+        :rtype: bool"""
+
+        Next = self.next
+        if not self.client.gapless or not isinstance(Next, AudioSource) or Next.Replay:
+            return True
+
+        buffered = (Next.AudioFifo.samples if Next.AudioFifo else 0) + (
+            Next.PacketFifo.samples if Next.PacketFifo else 0
+        )
+
+        return buffered >= Config.GAPLESS_FRAMES * Config.SAMPLES_PER_FRAME or bool(
+            Next.BufferLoader and not Next.loading
+        )
+
+    def pad(self, Prefix: bytes):
+        if not Prefix:
+            return
+
+        Frame = bytes(Prefix).ljust(
+            Config.SAMPLES_PER_FRAME * Config.SAMPLE_SIZE, b"\x00"
+        )
+
+        Master = (self._appliedVolume, self._volume)
+        self._appliedVolume = self._volume
+
+        return self.mixer.mix([(Frame, 1.0, 1.0)], Master)
+
+    def underrun(self, Source) -> None:
+        if self._underrun is Source or not Source.played:
+            return
+
+        self.recover()
+
+        self._underrun = Source
+        Source.starve()
+        self.telemetry.underruns += 1
+
+        log.debug(f"the source of {self.client.guild_id} is not buffered yet, skipped.")
+        self.client.dispatcher.dispatch(
+            "SOURCE_UNDERRUN", source=Source, **Source.bufferHealth()
+        )
+
+    def recover(self) -> None:
+        if not self._underrun:
+            return
+
+        Source, self._underrun = self._underrun, None
+
+        starved = Source.recover()
+        self.telemetry.starvation.add(starved)
+
+        self.client.dispatcher.dispatch(
+            "SOURCE_RECOVERED",
+            source=Source,
+            starved=round(starved * 1000, 2),
+            **Source.bufferHealth(),
+        )
+
+    def isUnprocessed(self, Source) -> bool:
+        return (
+            not Source.skipped
+            and not self.client.filter
+            and self.client.volume == self._volume == self._appliedVolume == 1.0
+            and self.gainOf(Source) == self._appliedVolumes.get(Source, 1.0) == 1.0
+            and not Source.LoudnessMeter
+        )
+
+    def canPassthrough(self, Source) -> bool:
+        is_crossfade_timing = self.next and (
+            Source.remain <= self.crossfade + Config.DELAY
+            and not (Source.AudioData and Source.AudioData.is_live)
+        )
+
+        return (
+            Config.OPUS_PASSTHROUGH
+            and not is_crossfade_timing
+            and self.isUnprocessed(Source)
+            and Source.is_opus()
+        )
+
+    def readReplay(self):
+        Source = self.current
+        if not Source or not Source.Replay:
+            return
+
+        mixAt = (
+            Source.duration - self.crossfade - Config.DELAY
+            if self.crossfade and self.next and Source.duration
+            else None
+        )
+
+        if not self.isUnprocessed(Source) or (
+            mixAt is not None and Source.position >= mixAt
+        ):
+            return Source.stopReplay()
+
+        if mixAt is not None and Source.position >= mixAt - Config.PRELOAD_TIME:
+            Source.prewarm(max(mixAt - PREWARM_MARGIN, Source.position))
+
+        return Source.readReplay() or None
+
+    def readPackets(self):
+        if not self.current:
+            return
+
+        Source = self.current
+        Source.passthrough = self.canPassthrough(Source)
+
+        if not Source.passthrough or Source.AudioFifo.is_ready():
+            return
+
+        if Source.AudioFifo.samples:
+            Source.AudioFifo.read(0)
+
+        loading = Source.loading
+        Packets = Source.readPackets()
+        if not Packets:
+            if not loading:
+                return
+
+            self.underrun(Source)
+        else:
+            self.recover()
+
+        return Packets
+
+    def gainOf(self, Source) -> float:
+        if not self.client.normalize or Source.loudness is None:
+            return Source.volume
+
+        return Source.volume * min(
+            10 ** ((Config.LOUDNESS_TARGET - Source.loudness) / 20), MAX_GAIN
+        )
+
+    def mix(self, Tracks) -> bytes:
+        Gains = []
+        for Data, Source in Tracks:
+            Gain = self.gainOf(Source)
+
+            Gains.append((Data, self._appliedVolumes.get(Source, Gain), Gain))
+            self._appliedVolumes[Source] = Gain
+
+        Master = (self._appliedVolume, self._volume)
+        self._appliedVolume = self._volume
+
+        return self.mixer.mix(Gains, Master)
 
     def speak(self, state) -> None:
         if self.client.speakState == state:
@@ -231,45 +471,244 @@ class Player(threading.Thread):
         self.client.speakState = state
         asyncio.run_coroutine_threadsafe(self.client.ws.speak(state), self.client.loop)
 
-    def run(self):
-        with contextlib.suppress(Exception):
-            _start = time.perf_counter()
+    def start(self) -> None:
+        if Config.SHARED_SCHEDULER:
+            self.scheduler = Scheduler
+            self.scheduler.register(self)
+        else:
+            super().start()
+
+    def is_alive(self) -> bool:
+        if self.scheduler:
+            return not self._end.is_set()
+
+        return super().is_alive()
+
+    def readFrame(self):
+        if self._volume != self.client.volume:
+            if self._volume < self.client.volume:
+                self._volume = round(self._volume + 0.01, 3)
+            if self._volume > self.client.volume:
+                self._volume = round(self._volume - 0.01, 3)
+
+        readStart = time.perf_counter()
+
+        Packets = self.readReplay()
+        if Packets is None:
+            Packets = self.readPackets()
+        if Packets is not None:
+            self.telemetry.readTime.add(time.perf_counter() - readStart)
+            self.measureTransition(bool(Packets))
+            if Packets:
+                self.silentFrames = 0
+
+            return [(bytes(Packet), samples) for Packet, samples in Packets]
+
+        Data = self.read()
+        encodeStart = time.perf_counter()
+        self.telemetry.readTime.add(encodeStart - readStart)
+        self.measureTransition(bool(Data))
+
+        if not Data:
+            return
 
-            while not self._end.is_set():
-                try:
-                    if not self.client.connectedThreadEvent.is_set():
-                        self.client.connectedThreadEvent.wait()
+        if Config.SILENCE_SUPPRESSION and rms(Data) <= Config.SILENCE_THRESHOLD:
+            self.silentFrames += 1
+        else:
+            self.silentFrames = 0
 
-                        self.loops = 0
-                        _start = time.perf_counter()
+        suppressed = self.silentFrames - round(
+            SILENCE_HOLD * 1000 / Config.FRAME_LENGTH
+        )
+        if suppressed > 0:
+            return self.silence(suppressed)
 
-                    Data = self.read() if not self.client.paused else None
+        Data = self.client.encoder.encode(Data)
+        self.telemetry.encodeTime.add(time.perf_counter() - encodeStart)
 
-                    if self._volume != self.client.volume:
-                        if self._volume < self.client.volume:
-                            self._volume = round(self._volume + 0.01, 3)
-                        if self._volume > self.client.volume:
-                            self._volume = round(self._volume - 0.01, 3)
+        return [(Data, Config.SAMPLES_PER_FRAME)]
 
-                    self.speak(bool(Data))
+    def silence(self, suppressed: int) -> list:
+        """The frame of the suppressed silence, the opus silence frames are sent first for ``SILENCE_FRAMES`` of them.
+        The samples which are not sent are ``None``, so that the timestamp advances by the frame.
 
-                    if Data:
-                        if self._volume != 1.0:
-                            Data = audioop.mul(Data, 2, min(self._volume, 2.0))
+        :rtype: list"""
 
-                        self.client.send(Data)
+        samples = getPacketSamples(SILENCE_FRAME)
+        perFrame = max(Config.SAMPLES_PER_FRAME // samples, 1)
 
-                    self.loops += 1
-                    nextTime = _start + Config.DELAY * self.loops
-                    time.sleep(max(0, Config.DELAY + (nextTime - time.perf_counter())))
-                except:
-                    log.exception(
-                        f"on the player of {self.client.guild_id}, an error occured"
-                    )
+        count = min(max(SILENCE_FRAMES - (suppressed - 1) * perFrame, 0), perFrame)
+
+        Frame = [(SILENCE_FRAME, samples)] * count
+        if Config.SAMPLES_PER_FRAME > count * samples:
+            Frame.append((None, Config.SAMPLES_PER_FRAME - count * samples))
+
+        return Frame
+
+    def measureTransition(self, played: bool) -> None:
+        if not self._transition:
+            return
+
+        if not played:
+            self._transition[1] += Config.FRAME_LENGTH
+            return
+
+        Previous, gap = self._transition
+        self._transition = None
+
+        self.telemetry.transitionGap.add(gap / 1000)
+        self.client.dispatcher.dispatch(
+            "SOURCE_TRANSITION", previous=Previous, source=self._current, gap=gap
+        )
+
+    def produce(self) -> None:
+        if self.client.paused:
+            return
+
+        try:
+            while len(self.FrameRing) < max(Config.ENCODE_AHEAD, 1):
+                generation, Source = self._generation, self._current
+                Filter = Source.filter if Source else None
+
+                # encoded without the lock, not to block a flush from the event loop
+                Frame = self.readFrame()
+                if not Frame:
+                    break
+
+                with self._frameLock:
+                    if generation == self._generation:
+                        self.FrameRing.append(Frame)
+                        continue
+
+                    # the audio read with the previous filter is decoded again, as the flushed frames
+                    if (
+                        self._rewound
+                        and Source is self._current
+                        and Source.filter is Filter
+                    ):
+                        Source._discarded += sum(samples for _, samples in Frame)
+        except:
+            log.exception(f"on the player of {self.client.guild_id}, an error occured")
+            self.client.dispatcher.dispatch(
+                "PLAYER_TRACEBACK", traceback=traceback.format_exc()
+            )
+
+    def sendFrame(self, deadline: float = None) -> None:
+        try:
+            if deadline is not None:
+                lagging = self.telemetry.tick(deadline)
+                if lagging is not None:
                     self.client.dispatcher.dispatch(
-                        "PLAYER_TRACEBACK", traceback=traceback.format_exc()
+                        "PLAYER_LAG", **self.telemetry.toDict()
                     )
 
+            Frame = (
+                self.FrameRing.popleft()
+                if self.FrameRing and not self.client.paused
+                else None
+            )
+
+            self.speak(bool(Frame) and any(Data for Data, _ in Frame))
+
+            if not Frame:
+                if self._current and not self.client.paused:
+                    self.telemetry.droppedFrames += 1
+                return
+
+            if not self.client.speakState:
+                self.client.timestamp += sum(samples for _, samples in Frame)
+                self.telemetry.suppressedFrames += 1
+                return
+
+            sendStart = time.perf_counter()
+            for Data, samples in Frame:
+                if Data is None:
+                    self.client.timestamp += samples
+                    continue
+
+                self.client.send(Data, encode=False, samples=samples)
+
+            self.telemetry.sendTime.add(time.perf_counter() - sendStart)
+            self.telemetry.frames += 1
+        except:
+            log.exception(f"on the player of {self.client.guild_id}, an error occured")
+            self.client.dispatcher.dispatch(
+                "PLAYER_TRACEBACK", traceback=traceback.format_exc()
+            )
+
+    def dropFrames(self, count: int) -> None:
+        """Drop the frames of the missed ticks, skipping the buffered audio of the current source
+        after the encoded frames not to read, mix and encode the frames to discard."""
+
+        try:
+            with self._frameLock:
+                while count and self.FrameRing:
+                    Frame = self.FrameRing.popleft()
+                    count -= 1
+
+                    self.client.timestamp += sum(samples for _, samples in Frame)
+                    self.telemetry.droppedFrames += 1
+
+                if not count or self.client.paused or not self._current:
+                    return
+
+                samples = self._current.drop(count * Config.SAMPLES_PER_FRAME)
+
+                self.client.timestamp += samples
+                self.telemetry.droppedFrames += -(-samples // Config.SAMPLES_PER_FRAME)
+        except:
+            log.exception(f"on the player of {self.client.guild_id}, an error occured")
+            self.client.dispatcher.dispatch(
+                "PLAYER_TRACEBACK", traceback=traceback.format_exc()
+            )
+
+    def tick(self, deadline: float = None) -> None:
+        self.sendFrame(deadline)
+        self.produce()
+
+    def flush(self, rewind: bool = False) -> None:
+        """Discard the encoded frames, the current source is rewound by them to decode them again when ``rewind`` is set."""
+
+        with self._frameLock:
+            if rewind:
+                Source = self._current
+                if not Source or not Source.rewindable:
+                    # the buffered audio is played as it is, so are the frames
+                    return
+
+                Source._discarded += sum(
+                    samples for Frame in self.FrameRing for _, samples in Frame
+                )
+
+            self.FrameRing.clear()
+            self._generation += 1
+            self._rewound = rewind
+
+    def run(self):
+        with contextlib.suppress(Exception):
+            self.pacer = Pacer()
+
+            while not self._end.is_set():
+                if not self.client.connectedThreadEvent.is_set():
+                    self.client.connectedThreadEvent.wait()
+
+                    self.loops = 0
+                    self.pacer.reset()
+
+                self.tick(self.pacer.deadline)
+                self.loops += 1
+
+                stalls = self.pacer.stalls
+                dropped = self.pacer.wait()
+
+                if self.pacer.stalls != stalls:
+                    self.telemetry.stalls += 1
+                if dropped:
+                    self.dropFrames(dropped)
+
+        self.cleanup()
+
+    def cleanup(self) -> None:
         if self._current:
             self.client.loop.call_soon_threadsafe(self._current.cleanup)
             self._current = None
@@ -0,0 +1,255 @@
+import logging
+import os
+import threading
+import time
+
+from .config import Config
+from .utils import Pacer
+
+log = logging.getLogger("discodo.scheduler")
+
+# the ticks between the checks of a mixer to move its players to the others
+REBALANCE_INTERVAL = 50
+# the overruns in the interval to move the slowest player of a mixer
+OVERRUN_THRESHOLD = 5
+# the seconds of a tick the other players of a mixer must save to move the slowest player
+REBALANCE_MARGIN = 0.001
+
+
+class MixerThread(threading.Thread):
+    """Ticks its players in turn, a player raising an error is detached and cleaned up, not to stop the others."""
+
+    def __init__(self, index: int, scheduler: "PlayerScheduler" = None) -> None:
+        threading.Thread.__init__(self, name=f"discodo-mixer-{index}")
+        self.daemon = True
+
+        self.scheduler = scheduler
+        self._end = threading.Event()
+        self.players = []
+        self.costs = {}  # player: the average seconds to tick it
+        self._lock = threading.Lock()
+
+        self.pacer = Pacer()
+        self.ticks = 0
+        self.overruns = 0
+        self._checkedOverruns = 0
+        self.lastTickTime = 0.0
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def __repr__(self) -> str:
+        return f"<MixerThread name='{self.name}' players={len(self)} overruns={self.overruns}>"
+
+    @property
+    def load(self) -> float:
+        """The average seconds to tick all players of the mixer."""
+
+        with self._lock:
+            return sum(self.costs.get(player, 0.0) for player in self.players)
+
+    def costOf(self, player) -> float:
+        return self.costs.get(player, 0.0)
+
+    def add(self, player, cost: float = 0.0) -> None:
+        with self._lock:
+            self.players.append(player)
+            if cost:
+                self.costs[player] = cost
+
+    def remove(self, player) -> None:
+        with self._lock:
+            if player in self.players:
+                self.players.remove(player)
+            self.costs.pop(player, None)
+
+    def detach(self, player) -> None:
+        self.remove(player)
+
+        try:
+            player.cleanup()
+        except Exception:
+            log.exception(
+                f"while cleaning up a player on {self.name}, an error occured."
+            )
+
+    def call(self, player, func, *args) -> bool:
+        """Call a method of the player, which is detached when it raises.
+
+        :returns: Whether the call succeeded.
+        :rtype: bool"""
+
+        try:
+            func(*args)
+        except Exception:
+            log.exception(
+                f"while ticking a player on {self.name}, an error occured, detached."
+            )
+            self.detach(player)
+            return False
+
+        return True
+
+    def measure(self, player, seconds: float) -> None:
+        cost = self.costs.get(player)
+        self.costs[player] = seconds if cost is None else cost * 0.9 + seconds * 0.1
+
+    def tick(self, deadline: float) -> None:
+        with self._lock:
+            players = list(self.players)
+
+        for player in filter(lambda player: player._end.is_set(), players):
+            self.detach(player)
+
+        players = [
+            player
+            for player in players
+            if not player._end.is_set() and player.client.connectedThreadEvent.is_set()
+        ]
+
+        elapsed = {}
+
+        for player in players:
+            sendStart = time.perf_counter()
+            if not self.call(player, player.sendFrame, deadline):
+                continue
+
+            player.loops += 1
+            elapsed[player] = time.perf_counter() - sendStart
+
+        for player in elapsed:
+            produceStart = time.perf_counter()
+            if self.call(player, player.produce):
+                self.measure(
+                    player, elapsed[player] + time.perf_counter() - produceStart
+                )
+
+    def stop(self) -> None:
+        self._end.set()
+
+    def run(self) -> None:
+        while not self._end.is_set():
+            with self._lock:
+                players = list(self.players)
+
+            tickStart = time.perf_counter()
+            self.tick(self.pacer.deadline)
+            self.lastTickTime = time.perf_counter() - tickStart
+
+            if self.lastTickTime > Config.DELAY:
+                self.overruns += 1
+
+                log.debug(
+                    f"{self.name} took {round(self.lastTickTime * 1000)}ms to tick {len(players)} players."
+                )
+
+            self.ticks += 1
+            if self.scheduler and not self.ticks % REBALANCE_INTERVAL:
+                try:
+                    self.scheduler.rebalance(
+                        self, self.overruns - self._checkedOverruns > OVERRUN_THRESHOLD
+                    )
+                except Exception:
+                    log.exception(f"while rebalancing {self.name}, an error occured.")
+                self._checkedOverruns = self.overruns
+
+            stalls = self.pacer.stalls
+            dropped = self.pacer.wait()
+
+            with self._lock:
+                players = [player for player in players if player in self.players]
+
+            for player in players:
+                if self.pacer.stalls != stalls:
+                    player.telemetry.stalls += 1
+                if dropped:
+                    self.call(player, player.dropFrames, dropped)
+
+    def toDict(self) -> dict:
+        return {
+            "name": self.name,
+            "players": len(self),
+            "overruns": self.overruns,
+            "load": round(self.load * 1000, 3),
+            "pacer": self.pacer.toDict(),
+            "lastTickTime": round(self.lastTickTime * 1000, 3),
+        }
+
+
+class PlayerScheduler:
+    """Drives the players with a fixed pool of mixer threads instead of a thread per player.
+
+    The threads are started when the first player is registered."""
+
+    def __init__(self) -> None:
+        self.mixers = []
+        self.moves = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<PlayerScheduler mixers={len(self.mixers)} players={sum(map(len, self.mixers))}>"
+
+    @property
+    def size(self) -> int:
+        return Config.MIXER_THREADS or os.cpu_count() or 1
+
+    def register(self, player) -> None:
+        with self._lock:
+            while len(self.mixers) < self.size:
+                mixer = MixerThread(len(self.mixers), scheduler=self)
+                mixer.start()
+
+                self.mixers.append(mixer)
+
+            mixer = min(self.mixers, key=len)
+
+        mixer.add(player)
+
+    def rebalance(self, mixer: MixerThread, overran: bool = False) -> bool:
+        """Move a player of the mixer to the least loaded one, called by the mixer between its ticks.
+
+        The slowest player is moved when the mixer overran the tick, so it does not stall the others,
+        and a player is moved when the mixer has more than one player over the emptiest one.
+
+        :returns: Whether a player is moved.
+        :rtype: bool"""
+
+        with self._lock:
+            others = [other for other in self.mixers if other is not mixer]
+
+        with mixer._lock:
+            players = list(mixer.players)
+
+        if not others or not players:
+            return False
+
+        if overran and len(players) > 1:
+            player = max(players, key=mixer.costOf)
+            target = min(others, key=lambda other: other.load)
+
+            # the player is moved to stall fewer players, not to move it back and forth
+            if target.load + REBALANCE_MARGIN >= mixer.load - mixer.costOf(player):
+                return False
+        else:
+            target = min(others, key=len)
+            if len(players) <= len(target) + 1:
+                return False
+
+            player = min(players, key=mixer.costOf)
+
+        cost = mixer.costOf(player)
+        mixer.remove(player)
+        target.add(player, cost)
+        self.moves += 1
+
+        log.debug(f"moved a player from {mixer.name} to {target.name}.")
+        return True
+
+    def toDict(self) -> dict:
+        return {
+            "moves": self.moves,
+            "mixers": [mixer.toDict() for mixer in self.mixers],
+        }
+
+
+Scheduler = PlayerScheduler()
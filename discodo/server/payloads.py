@@ -80,6 +80,8 @@ class WebsocketPayloads:
                     "autoplay": VoiceClient.autoplay,
                     "volume": VoiceClient.volume,
                     "crossfade": VoiceClient.crossfade,
+                    "gapless": VoiceClient.gapless,
+                    "normalize": VoiceClient.normalize,
                     "filter": VoiceClient.filter,
                 },
                 "context": VoiceClient.Context,
@@ -103,6 +105,21 @@ class WebsocketPayloads:
 
         return await self.sendJson(payload)
 
+    @staticmethod
+    @need_manager
+    async def getTelemetry(self, data):
+        VoiceClient = self.ClientManager.getVC(data["guild_id"])
+
+        payload = {
+            "op": "getTelemetry",
+            "d": {
+                "guild_id": VoiceClient.guild_id,
+                **(VoiceClient.player.telemetry.toDict() if VoiceClient.player else {}),
+            },
+        }
+
+        return await self.sendJson(payload)
+
     @staticmethod
     @need_manager
     async def VC_DESTROY(self, data):
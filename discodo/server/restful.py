@@ -172,6 +172,8 @@ async def getOptions(request, VoiceClient):
             "autoplay": VoiceClient.autoplay,
             "volume": VoiceClient.volume,
             "crossfade": VoiceClient.crossfade,
+            "gapless": VoiceClient.gapless,
+            "normalize": VoiceClient.normalize,
             "filter": VoiceClient.filter,
         }
     )
@@ -190,6 +192,12 @@ async def setOptions(request, VoiceClient):
     if "autoplay" in request.json:
         VoiceClient.autoplay = request.json["autoplay"]
 
+    if "gapless" in request.json:
+        VoiceClient.gapless = request.json["gapless"]
+
+    if "normalize" in request.json:
+        VoiceClient.normalize = request.json["normalize"]
+
     if "filter" in request.json:
         VoiceClient.filter = request.json["filter"]
 
@@ -198,6 +206,8 @@ async def setOptions(request, VoiceClient):
             "autoplay": VoiceClient.autoplay,
             "volume": VoiceClient.volume,
             "crossfade": VoiceClient.crossfade,
+            "gapless": VoiceClient.gapless,
+            "normalize": VoiceClient.normalize,
             "filter": VoiceClient.filter,
         }
     )
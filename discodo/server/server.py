@@ -1,7 +1,17 @@
 from sanic import Sanic, response
 
 from .. import __version__
+from ..config import Config
+from ..decoder import Decoders
+from ..scheduler import Scheduler
+from ..source.ProcessLoader import DecoderProcesses
 from ..utils import getStatus
+from ..utils.buffer import Buffers
+from ..utils.http import Sessions
+from ..utils.loudness import Loudness
+from ..utils.packetCache import Encoded
+from ..utils.segmentCache import Segments
+from ..utils.streamCache import Streams
 from .planner import app as PlannerBlueprint
 from .restful import app as RestfulBlueprint
 from .websocket import app as WebsocketBlueprint
@@ -16,6 +26,16 @@ app.blueprint(WebsocketBlueprint)
 app.blueprint(RestfulBlueprint)
 
 
+@app.listener("after_server_stop")
+async def closeSessions(app, loop):
+    await Sessions.close()
+
+
+@app.listener("after_server_stop")
+async def saveLoudness(app, loop):
+    Loudness.flush()
+
+
 @app.route("/")
 async def index(request):
     return response.html(f"<h1>Discodo</h1> <h3>{__version__}")
@@ -23,4 +43,30 @@ async def index(request):
 
 @app.route("/status")
 async def status(request):
-    return response.json(getStatus())
+    Status = {
+        **getStatus(),
+        "Scheduler": Scheduler.toDict(),
+        "Decoder": {**Decoders.toDict(), **DecoderProcesses.toDict()},
+        "Buffer": Buffers.toDict(),
+        "StreamCache": Streams.toDict(),
+        "SegmentCache": Segments.toDict(),
+        "PacketCache": Encoded.toDict(),
+        "HTTP": Sessions.toDict(),
+    }
+
+    # the players tell which bots and guilds are served, only shown with the password
+    if request.headers.get("Authorization") == Config.PASSWORD:
+        ClientManagers = getattr(request.app.ctx, "ClientManagers", {})
+
+        Status["Players"] = [
+            {
+                "user_id": manager.id,
+                "guild_id": guild_id,
+                **voiceClient.player.telemetry.toDict(),
+            }
+            for manager in ClientManagers.values()
+            for guild_id, voiceClient in manager.voiceClients.items()
+            if voiceClient.player
+        ]
+
+    return response.json(Status)
@@ -1,14 +1,15 @@
+import asyncio
 import uuid
 from typing import Any, Dict, List, Optional
 
-import aiohttp
-import yarl
 import youtube_dl
 
 from ..config import Config
 from ..errors import Forbidden, TooManyRequests
 from ..extractor import YOUTUBE_VIDEO_ID_REGEX, extract
 from ..extractor.youtube_dl import clear_cache
+from ..utils.http import Sessions
+from ..utils.streamCache import Streams
 from .AudioSource import AudioSource
 
 
@@ -161,15 +162,30 @@ class AudioData:
     async def source(
         self, *args, _retry: int = 0, _limited: bool = False, **kwargs
     ) -> AudioSource:
+        cacheable = not self.is_file and not self.is_live
+
+        if not self._source and cacheable and not _limited:
+            path = Streams.get(self.id)
+            if path:
+                self._source = AudioSource(
+                    path,
+                    AudioData=self,
+                    start_position=self.start_position,
+                    cacheKey=self.id,
+                    **kwargs,
+                )
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self._source.openReplay
+                )
+
+                return self._source
+
         if not self.stream_url or _limited:
             await self.gather()
 
         if not self._source:
             if not self.is_file:
-                async with aiohttp.ClientSession() as session:
-                    URL = yarl.URL(self.stream_url, encoded=True)
-                    async with session.get(URL) as resp:
-                        Status = resp.status
+                Status = await Sessions.probe(self.stream_url, address=self.address)
 
                 if Status == 403:
                     if _retry == 0:
@@ -196,7 +212,11 @@ class AudioData:
                 self.stream_url,
                 AudioData=self,
                 start_position=self.start_position,
+                cacheKey=self.id if cacheable else None,
                 **kwargs,
             )
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._source.openReplay
+            )
 
         return self._source
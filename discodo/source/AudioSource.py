@@ -2,12 +2,13 @@ import time
 from typing import Any, Coroutine, NoReturn
 
 from ..errors import NotSeekable
+from ..utils.packetCache import Encoded
 from .PyAVSource import PyAVSource
 
 
 class AudioSource(PyAVSource):
     def __init__(self, *args, AudioData=None, **kwargs) -> None:
-        super().__init__(*args, **kwargs)
+        super().__init__(*args, live=bool(AudioData and AudioData.is_live), **kwargs)
 
         self.AudioData = AudioData
         self.address = self.AudioData.address if self.AudioData else None
@@ -15,6 +16,19 @@ class AudioSource(PyAVSource):
         self.Context = AudioData.Context
         self._skipped: bool = False
 
+    def openReplay(self) -> None:
+        """Open the cached packets of the track to send them instead of decoding, or start to record them.
+        The files are opened here, which is called on the executor not to block the event loop."""
+
+        if not self.AudioData.id or self.AudioData.is_live or self.start_position:
+            return
+
+        Encoded.play(self.AudioData.id)
+
+        self.Replay = Encoded.open(self.AudioData.id)
+        if not self.Replay:
+            self.PacketRecorder = Encoded.record(self.AudioData.id)
+
     def toDict(self) -> dict:
         Value = self.AudioData.toDict() if self.AudioData else {}
 
@@ -69,7 +83,7 @@ class AudioSource(PyAVSource):
         if self.AudioData and self.AudioData.is_live and "atempo" in value:
             raise ValueError("Cannot use `atempo` filter in live streaming.")
 
-        self._filter = value
+        PyAVSource.filter.fset(self, value)
 
     @property
     def skipped(self) -> bool:
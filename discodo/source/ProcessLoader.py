@@ -0,0 +1,329 @@
+import logging
+import multiprocessing
+import threading
+import traceback
+import uuid
+
+from ..config import Config
+from ..natives.SharedRing import SharedRing
+from .PyAVSource import PyAVSource
+
+log = logging.getLogger("discodo.source.ProcessLoader")
+
+
+class RingSource(PyAVSource):
+    """The source in the decoder process, which writes the decoded pcm to the shared ring."""
+
+    def __init__(self, ringName: str, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        self.AudioFifo = SharedRing(name=ringName)
+        self.PacketFifo = None
+
+        # the buffer is sized by the source in the node
+        self.Buffer.adaptive = False
+
+    def resetBuffer(self) -> None:
+        if self.AudioFifo:
+            self.AudioFifo.reset()
+
+    def scheduleRewind(self) -> None:
+        # the decoder process runs no event loop
+        self.rewind()
+
+    def publish(self) -> None:
+        if not self.AudioFifo:
+            return
+
+        self.AudioFifo.check_buffer()
+
+        self.AudioFifo.position = self._position
+        if self._duration:
+            self.AudioFifo.duration = self._duration
+
+        if self.stopped and not self._loading.locked():
+            self.AudioFifo.eof = True
+
+    def cleanup(self) -> None:
+        self._end.set()
+
+        if self.AudioFifo:
+            self.AudioFifo.aborted = True
+
+            if not self.AudioFifo.haveToFillBuffer.is_set():
+                self.AudioFifo.haveToFillBuffer.set()
+
+
+def work(connection, options: dict) -> None:
+    for key, value in options.items():
+        setattr(Config, key, value)
+    Config.DECODER_PROCESSES = 0
+
+    Sources = {}
+    Closing = []
+
+    while True:
+        try:
+            if connection.poll(0.005):
+                op, key, *args = connection.recv()
+
+                if op == "start":
+                    ringName, source, start_position, cacheKey, filter = args
+
+                    Source = RingSource(
+                        ringName,
+                        source,
+                        start_position=start_position,
+                        cacheKey=cacheKey,
+                    )
+                    Source.filter = filter
+                    Source.start()
+
+                    Sources[key] = Source
+                elif key in Sources:
+                    if op == "seek":
+                        # the ring is read by the node, not to be skipped here
+                        Sources[key]._seek(*args, buffered=False)
+                    elif op == "filter":
+                        Sources[key].filter = args[0]
+                    elif op == "limit":
+                        Sources[key].Buffer.resize(args[0])
+                    elif op == "stop":
+                        Source = Sources.pop(key)
+                        Source.cleanup()
+
+                        Closing.append(Source)
+        except (EOFError, OSError):
+            break
+        except:
+            traceback.print_exc()
+
+        for Source in Sources.values():
+            Source.publish()
+
+        for Source in list(Closing):
+            if not Source._loading.locked():
+                Source.AudioFifo.close()
+                Closing.remove(Source)
+
+    for Source in Sources.values():
+        Source.cleanup()
+
+
+class DecoderProcess:
+    """A worker process of the decode jobs, which is failed when the process exits or its pipe is closed."""
+
+    def __init__(self, index: int) -> None:
+        Context = multiprocessing.get_context("spawn")
+
+        self.connection, childConnection = Context.Pipe()
+        self.process = Context.Process(
+            target=work,
+            args=(
+                childConnection,
+                {
+                    key: getattr(Config, key)
+                    for key in Config.__slots__
+                    if not key.startswith("_") and hasattr(Config, key)
+                },
+            ),
+            name=f"discodo-decoder-{index}",
+            daemon=True,
+        )
+        self.process.start()
+
+        self.jobs = set()
+        self.failed = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    @property
+    def alive(self) -> bool:
+        if self.failed:
+            return False
+
+        with self._lock:
+            try:
+                # the worker sends nothing, so the pipe is readable only at its end
+                if not self.process.is_alive() or self.connection.poll():
+                    self.failed = True
+            except OSError:
+                self.failed = True
+
+        return not self.failed
+
+    def send(self, *message) -> None:
+        with self._lock:
+            if self.failed:
+                return
+
+            try:
+                self.connection.send(message)
+            except OSError:
+                self.failed = True
+
+    def close(self) -> None:
+        self.connection.close()
+
+        if self.process.is_alive():
+            self.process.kill()
+
+
+class DecoderProcessPool:
+    """Runs the decode jobs in ``Config.DECODER_PROCESSES`` worker processes, so decoding does not hold the GIL of the node.
+
+    The processes are started when the first job is submitted."""
+
+    def __init__(self) -> None:
+        self.processes = []
+        self.restarts = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<DecoderProcessPool processes={len(self.processes)} jobs={sum(map(len, self.processes))}>"
+
+    def submit(self, job) -> DecoderProcess:
+        with self._lock:
+            while len(self.processes) < Config.DECODER_PROCESSES:
+                self.processes.append(DecoderProcess(len(self.processes)))
+
+            Process = min(self.processes, key=len)
+            Process.jobs.add(job)
+
+        return Process
+
+    def restart(self, Process: DecoderProcess) -> None:
+        """Replace the failed process with a new one, the jobs of it are failed by their sources."""
+
+        with self._lock:
+            if Process not in self.processes:
+                return
+
+            index = self.processes.index(Process)
+            self.processes[index] = DecoderProcess(index)
+            self.restarts += 1
+
+        log.warning(
+            f"the decoder process {Process.process.pid} exited with {Process.process.exitcode}, restarted."
+        )
+        Process.close()
+
+    def toDict(self) -> dict:
+        return {
+            "processes": [
+                {"pid": Process.process.pid, "jobs": len(Process)}
+                for Process in self.processes
+            ],
+            "restarts": self.restarts,
+        }
+
+
+DecoderProcesses = DecoderProcessPool()
+
+
+class ProcessLoader:
+    """The decode job of a source, which is run by a decoder process.
+
+    The decoded pcm is read from :py:class:`discodo.natives.SharedRing` and
+    seek, filter change and stop are sent over the pipe of the process."""
+
+    def __init__(self, AudioSource: PyAVSource) -> None:
+        self.Source = AudioSource
+
+        self.key = str(uuid.uuid4())
+        self.Filter = dict(AudioSource.filter)
+        self.Process = self.Ring = None
+        self.limit = None
+
+        # the decoder process cannot notify the source, so the waits poll the ring
+        self.interval = 0.005
+        self.state = None
+
+    def __repr__(self) -> str:
+        return f"<ProcessLoader state={self.state} source={self.Source}>"
+
+    def start(self) -> None:
+        self.Source._loading.acquire()
+
+        self.Source.AudioFifo = self.Ring = SharedRing()
+        self.Source.PacketFifo = None
+
+        self.Process = DecoderProcesses.submit(self)
+        self.Process.send(
+            "start",
+            self.key,
+            self.Ring.name,
+            self.Source.Source,
+            self.Source.start_position,
+            self.Source.cacheKey,
+            self.Filter,
+        )
+
+        self.state = "running"
+
+    def update(self) -> None:
+        if self.state != "running" or self.Ring.closed:
+            return
+
+        if not self.Process.alive:
+            log.warning(f"the decoder process of {self.Source} exited, stopped.")
+            DecoderProcesses.restart(self.Process)
+
+            self.state = "failed"
+
+            self.Source.stop()
+            self.Source._loading.release()
+            self.Source.notify()
+            return
+
+        if self.Source.filter != self.Filter:
+            self.Filter = dict(self.Source.filter)
+            self.Process.send("filter", self.key, self.Filter)
+            self.Source.filterApplied()
+
+        limit = min(
+            self.Source.Buffer.limit,
+            self.Ring.capacity / Config.SAMPLING_RATE / Config.SAMPLE_SIZE - 1,
+        )
+        if limit != self.limit:
+            self.limit = limit
+            self.Process.send("limit", self.key, limit)
+
+        self.Source._position = self.Ring.position
+        if self.Ring.duration:
+            self.Source._duration = self.Ring.duration
+
+        if self.Ring.eof:
+            self.state = "done"
+
+            self.Source.stop()
+            self.Source._loading.release()
+
+    def seek(self, offset: float) -> None:
+        if self.state == "running":
+            self.Process.send("seek", self.key, offset)
+
+    def stop(self) -> None:
+        if self.state == "closed":
+            return
+
+        if self.state == "running":
+            self.Source._loading.release()
+            self.Source.notify()
+
+        self.state = "closed"
+
+        self.Process.send("stop", self.key)
+        self.Process.jobs.discard(self)
+
+        self.Ring.close()
+
+    def toDict(self) -> dict:
+        return {
+            "state": self.state,
+            "position": self.Source._position,
+            "duration": self.Source._duration,
+            "buffer": self.Source.Buffer.toDict(),
+        }
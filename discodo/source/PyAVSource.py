@@ -1,15 +1,26 @@
 import asyncio
-import audioop
 import functools
+import logging
+import os
 import threading
-import traceback
-from typing import Coroutine
+import time
+from typing import Callable, Coroutine, Optional, Tuple
 
 import av
 
 from ..config import Config
-from ..natives import AudioFifo, AudioFilter
+from ..decoder import Decoders
+from ..natives import AudioFifo, AudioFilter, AudioResampler, PacketFifo
+from ..natives.opus import getPacketSamples
+from ..utils import RollingHistogram
+from ..utils.buffer import AdaptiveBuffer
+from ..utils.httpStream import HTTPStream
+from ..utils.segmentCache import Segments
+from ..utils.streamCache import Streams
 from ..utils.threadLock import withLock
+from .SeekIndex import SeekIndex
+
+log = logging.getLogger("discodo.source.PyAVSource")
 
 AVOption = {
     "err_detect": "ignore_err",
@@ -20,30 +31,64 @@ AVOption = {
 
 
 class PyAVSource:
-    def __init__(self, Source: str, start_position: float = 0.0) -> None:
+    def __init__(
+        self,
+        Source: str,
+        start_position: float = 0.0,
+        cacheKey: Optional[str] = None,
+        live: bool = False,
+    ) -> None:
         self.loop = asyncio.get_event_loop()
 
         self.Source: str = Source
         self.start_position: float = start_position
+        self.cacheKey: Optional[str] = cacheKey  # the key to store the stream with
 
         self.AVOption: dict = AVOption
+        self.address: Optional[str] = None  # the local address to request from
         self.Container: av.StreamContainer = None
-        self.selectAudioStream = self.FrameGenerator = None
+        self.IO: Optional[HTTPStream] = None
+        self.ranged: bool = True  # False when the server does not answer range requests
+        self.selectAudioStream = self.PacketGenerator = None
 
         self._end = threading.Event()
         self._haveToReloadResampler = threading.Event()
-        self._waitforread = threading.Lock()
+        self._state = threading.Condition()
         self._loading = threading.Lock()
         self._seeking = threading.Lock()
         self._seeked = False
+        self._skipUntil: Optional[float] = None
+        self.SeekIndex = SeekIndex()
         self.BufferLoader: Loader = None
+        self.Replay = None  # the encoded packets sent instead of decoding
+        self.PacketRecorder = None
 
-        self.AudioFifo = AudioFifo()
+        self.Buffer = AdaptiveBuffer(local=os.path.isfile(Source), live=live)
+        self.AudioFifo = self.createAudioFifo()
+        self.PacketFifo = PacketFifo(limit=self.Buffer.limit)
+        self._passthrough: bool = False
         self._duration: float = None
         self._position: float = 0.0
         self._volume: float = 1.0
         self._filter: dict = {}
+        self._filterChangedAt: Optional[float] = None
+        # the samples of the previous filter left to play
+        self._filterPending: Optional[int] = None
+        # the samples read by the player and discarded before the next filter change
+        self._discarded: int = 0
+        # the position to decode again from after a filter change, until the rewind is run
+        self._rewindTo: Optional[float] = None
+        self._rewindLock = threading.Lock()
+        # the seconds from the last filter change until its audio was read
+        self.filterLatency: Optional[float] = None
+        self.starvedTime: float = 0.0
+        self._starvedAt: Optional[float] = None
+        self.loudness: Optional[float] = None
+        self.LoudnessMeter = None
         self.stopped: bool = False
+        self.played: bool = (
+            False  # read since started or seeked, to tell starvation from buffering
+        )
 
     def __del__(self):
         self.cleanup()
@@ -62,7 +107,87 @@ class PyAVSource:
 
     @filter.setter
     def filter(self, value: dict) -> None:
-        self._filter = value
+        fastApply = self.rewindable
+        Previous, self._filter = self._filter, value
+        discarded, self._discarded = self._discarded, 0
+
+        if self.BufferLoader:
+            self._filterChangedAt = time.monotonic()
+            self._filterPending = None
+
+        if not fastApply:
+            return
+
+        # the position is taken now, before the player reads the buffer again
+        position = max(
+            self.positionOf(Previous)
+            - discarded
+            / Config.SAMPLING_RATE
+            * (float(Previous["atempo"]) if "atempo" in Previous else 1.0),
+            0.0,
+        )
+
+        # the empty buffer is not an underrun of the player
+        self.played = False
+
+        # not to play the audio again, which is read until the buffer is reset by the loader
+        self.AudioFifo.skip(self.AudioFifo.samples)
+        self._position = position
+
+        with self._rewindLock:
+            scheduled = self._rewindTo is not None
+            self._rewindTo = position
+
+        if not scheduled:
+            self.scheduleRewind()
+
+    @property
+    def seekable(self) -> bool:
+        return True
+
+    @property
+    def rewindable(self) -> bool:
+        """Whether the buffered audio is decoded again on filter changes,
+        which is done by the decoder process when the source is decoded in it."""
+
+        return bool(
+            Config.FAST_APPLY
+            and not Config.DECODER_PROCESSES
+            and self.seekable
+            and self.BufferLoader
+            and not self.compressed
+            and not self.Replay
+            and self.AudioFifo
+            and self.AudioFifo.samples
+        )
+
+    @property
+    def passthrough(self) -> bool:
+        return self._passthrough
+
+    @passthrough.setter
+    def passthrough(self, value: bool) -> None:
+        if self._passthrough == value:
+            return
+
+        self._passthrough = value
+
+        if not value and self.PacketFifo:
+            self.PacketFifo.haveToFillBuffer.set()
+        if value and self.AudioFifo:
+            self.AudioFifo.haveToFillBuffer.set()
+
+    @property
+    def compressed(self) -> bool:
+        """Whether the demuxed packets are buffered instead of the pcm, which is decoded a few frames ahead of the player."""
+
+        return Config.COMPRESSED_BUFFER and not Config.DECODER_PROCESSES
+
+    @property
+    def pcmLimit(self) -> float:
+        return (
+            Config.PCM_WINDOW * Config.DELAY if self.compressed else self.Buffer.limit
+        )
 
     @property
     def duration(self) -> float:
@@ -70,58 +195,414 @@ class PyAVSource:
 
     @property
     def position(self) -> float:
+        return self.positionOf(self.filter)
+
+    def positionOf(self, filter: dict) -> float:
+        """The played position, when the buffered audio is filtered by the filter.
+
+        :rtype: float"""
+
+        if self.Replay:
+            return round(self.Replay.position / Config.SAMPLING_RATE, 2)
+
+        # the queued packets are not filtered yet, unlike the decoded audio
         return round(
             self._position
             - (
                 self.AudioFifo.samples
-                / Config.SAMPLES_PER_FRAME
-                / (1000 / Config.FRAME_LENGTH)
-                * (float(self.filter["atempo"]) if "atempo" in self.filter else 1.0)
-            ),
+                * (float(filter["atempo"]) if "atempo" in filter else 1.0)
+                + (self.PacketFifo.samples if self.PacketFifo else 0)
+            )
+            / Config.SAMPLING_RATE,
             2,
         )
 
-    def read(self) -> bytes:
+    @property
+    def loading(self) -> bool:
+        return self._loading.locked()
+
+    @property
+    def starving(self) -> bool:
+        return self._starvedAt is not None
+
+    @property
+    def fill(self) -> float:
+        """The seconds of audio buffered."""
+
+        return round(
+            (
+                (self.AudioFifo.samples if self.AudioFifo else 0)
+                + (self.PacketFifo.samples if self.PacketFifo else 0)
+            )
+            / Config.SAMPLING_RATE,
+            2,
+        )
+
+    def starve(self) -> None:
+        """Mark the source starved, called by the player when the loader fell behind."""
+
+        if self.starving:
+            return
+
+        self._starvedAt = time.monotonic()
+        self.Buffer.underrun()
+
+    def recover(self) -> float:
+        """Mark the source recovered from the starvation.
+
+        :returns: The seconds the source was starved.
+        :rtype: float"""
+
+        if not self.starving:
+            return 0.0
+
+        starved = time.monotonic() - self._starvedAt
+        self._starvedAt = None
+        self.starvedTime += starved
+
+        return starved
+
+    def bufferHealth(self) -> dict:
+        return {
+            "fill": self.fill,
+            "limit": round(self.Buffer.limit, 2),
+            "underruns": self.Buffer.underruns,
+            "starvedTime": round(
+                (
+                    self.starvedTime
+                    + (time.monotonic() - self._starvedAt if self.starving else 0.0)
+                )
+                * 1000,
+                2,
+            ),
+            "loadRate": round(self.Buffer.rate, 2)
+            if self.Buffer.rate is not None
+            else None,
+        }
+
+    def notify(self) -> None:
+        """Wake up the threads waiting for the state of the source, called by the loader."""
+
+        with self._state:
+            self._state.notify_all()
+
+    def waitFor(self, predicate: Callable[[], bool], timeout: float = None) -> bool:
+        """Wait until the predicate is true or the timeout is over.
+
+        :rtype: bool"""
+
+        endTime = None if timeout is None else time.monotonic() + timeout
+
+        with self._state:
+            while True:
+                if self.BufferLoader:
+                    self.BufferLoader.update()
+
+                if predicate():
+                    return True
+
+                remain = None if endTime is None else endTime - time.monotonic()
+                if remain is not None and remain <= 0:
+                    return False
+
+                waits = [
+                    value
+                    for value in (
+                        remain,
+                        self.BufferLoader.interval if self.BufferLoader else None,
+                    )
+                    if value is not None
+                ]
+                self._state.wait(min(waits) if waits else None)
+
+    def waitForFrames(
+        self, samples: int = Config.SAMPLES_PER_FRAME, timeout: float = None
+    ) -> bool:
+        """Wait until the samples are buffered or the source ends.
+
+        :rtype: bool"""
+
+        return self.waitFor(
+            lambda: not self.AudioFifo
+            or self.AudioFifo.samples >= samples
+            or not self.loading,
+            timeout,
+        )
+
+    def waitForOpen(self, timeout: float = None) -> bool:
+        """Wait until the container is opened or the source ends.
+
+        :rtype: bool"""
+
+        return self.waitFor(
+            lambda: self.Container is not None or not self.loading, timeout
+        )
+
+    def waitForEnd(self, timeout: float = None) -> bool:
+        """Wait until the source is loaded to the end.
+
+        :rtype: bool"""
+
+        return self.waitFor(lambda: not self.loading, timeout)
+
+    def read(
+        self, samples: int = Config.SAMPLES_PER_FRAME, timeout: float = None
+    ) -> Optional[memoryview]:
+        """Read the samples, waiting for the loader at most timeout seconds.
+
+        With ``timeout=0``, this never blocks and returns ``None`` when the samples are not buffered yet,
+        check :py:attr:`loading` before reading to tell it apart from the end of the source."""
+
+        self.stopReplay()
+
         if not self.BufferLoader:
             self.start()
 
         if not self.AudioFifo:
             return
 
-        Data = self.AudioFifo.read()
-        if not Data and self._loading.locked():
-            while self._loading.locked():
-                if not self._waitforread.locked():
-                    self._waitforread.acquire()
-                self._waitforread.acquire()
+        self.BufferLoader.update()
 
-                Data = self.AudioFifo.read()
-                if Data:
-                    break
+        Data = self.AudioFifo.read(samples)
+        if not Data and timeout != 0 and self.loading:
+            if self.waitForFrames(samples, timeout) and self.AudioFifo:
+                Data = self.AudioFifo.read(samples)
 
-        if Data and self.volume != 1.0:
-            Data = audioop.mul(Data, 2, min(self._volume, 2.0))
+        if Data:
+            self.played = True
+            if self._filterPending is not None:
+                self.measureFilter(len(Data) // Config.SAMPLE_SIZE)
+        if self.PacketRecorder:
+            self.record(Data)
 
         return Data
 
-    def _seek(self, offset: float, *args, **kwargs) -> None:
+    def filterApplied(self) -> None:
+        """Called by the loader when it applied the filter, the audio buffered before is played with the previous one."""
+
+        if self._filterChangedAt is not None:
+            self._filterPending = self.AudioFifo.samples if self.AudioFifo else 0
+
+    def measureFilter(self, samples: int) -> None:
+        if self._filterPending >= samples:
+            self._filterPending -= samples
+            return
+
+        self.filterLatency = time.monotonic() - self._filterChangedAt
+        self._filterChangedAt = self._filterPending = None
+
+    def record(self, Data: Optional[memoryview]) -> None:
+        if self.filter:
+            return self.stopRecording()
+
+        if Data:
+            return self.PacketRecorder.write(Data)
+
+        if not self.loading:
+            # the recorder checks the duration after the queued audio is encoded
+            self.stopRecording(complete=bool(self.duration), duration=self.duration)
+
+    def stopRecording(
+        self, complete: bool = False, duration: Optional[float] = None
+    ) -> None:
+        Recorder, self.PacketRecorder = self.PacketRecorder, None
+
+        if Recorder:
+            Recorder.close(complete, duration)
+
+    def readReplay(self) -> list:
+        """Read the next encoded packet, an empty list at the end of the packets.
+
+        :rtype: list"""
+
+        Packet = self.Replay.read() if self.Replay else None
+        if not Packet:
+            self.stopReplay()
+            return []
+
+        self.played = True
+
+        return [(Packet, Config.SAMPLES_PER_FRAME)]
+
+    def stopReplay(self) -> None:
+        """Stop sending the encoded packets, the decoded audio continues from the replayed position."""
+
+        if not self.Replay:
+            return
+
+        Replay, self.Replay = self.Replay, None
+        Replay.close()
+
+        position = Replay.position / Config.SAMPLING_RATE
+
+        if not self.BufferLoader:
+            self._position = self.start_position = position
+
+        if Replay.ended:
+            self.stop()
+            self._end.set()
+        elif self.BufferLoader and not self.seekBuffered(position):
+            if self.AudioFifo:
+                self.AudioFifo.skip(self.AudioFifo.samples)
+
+            self.loop.call_soon_threadsafe(self.seek, position)
+
+    def prewarm(self, offset: float) -> None:
+        """Start to decode from the offset while the encoded packets are sent, to continue without waiting for the loader."""
+
+        if not self.Replay or self.BufferLoader:
+            return
+
+        self.start_position = offset
+        self.start()
+
+    def readPackets(self) -> list:
+        if not self.BufferLoader:
+            self.start()
+
+        if not self.PacketFifo:
+            return []
+
+        Packets = self.PacketFifo.read(partial=not self._loading.locked())
+        if Packets:
+            self.played = True
+            self.stopRecording()
+
+        return Packets
+
+    def drop(self, samples: int) -> int:
+        """Discard the buffered audio of the frames which the player is late for, without reading it.
+
+        :returns: The number of samples discarded.
+        :rtype: int"""
+
+        # the recording would miss the audio
+        self.stopRecording()
+
+        if self.Replay:
+            Skipped = 0
+            while Skipped < samples and self.Replay.read():
+                Skipped += Config.SAMPLES_PER_FRAME
+
+            return Skipped
+
+        Skipped = self.AudioFifo.skip(samples) if self.AudioFifo else 0
+        if self.passthrough and self.PacketFifo and Skipped < samples:
+            Skipped += self.PacketFifo.skip(samples - Skipped)
+
+        return Skipped
+
+    def seekBuffered(self, offset: float) -> bool:
+        """Seek forward inside the buffer without I/O, by discarding the buffered audio before the offset.
+
+        :returns: Whether the offset is in the buffer.
+        :rtype: bool"""
+
+        if "atempo" in self.filter or not self.BufferLoader:
+            return False
+
+        skip = offset - self.position
+        if skip < 0 or offset > self._position:
+            return False
+
+        samples = int(skip * Config.SAMPLING_RATE)
+
+        # the pcm left in the fifo is played before the packets
+        if self.AudioFifo:
+            samples -= self.AudioFifo.skip(samples)
+        if self.PacketFifo and samples > 0:
+            if self.BufferLoader.compressing:
+                # the queued packets are decoded and dropped to keep the state of the decoder
+                self._skipUntil = offset
+                self._haveToReloadResampler.set()
+            else:
+                self.PacketFifo.skip(samples)
+
+        return True
+
+    def openContainer(self) -> None:
+        """Open the container of the source, reading http streams by :py:class:`discodo.utils.httpStream.HTTPStream` when ``Config.HTTP_PREFETCH`` is set."""
+
+        if (
+            Config.HTTP_PREFETCH
+            and not Config.DECODER_PROCESSES
+            and self.Source.startswith(("http://", "https://"))
+            and self.ranged
+        ):
+            if not self.IO or self.IO.closed:
+                IO = HTTPStream(self.Source, self.loop, address=self.address)
+                self.IO = IO if IO.open() else None
+                # not to request the ranges again on every reopen
+                self.ranged = bool(self.IO)
+
+            if self.IO:
+                self.IO.seek(0)
+                self.Container = av.open(
+                    self.IO, options={"err_detect": self.AVOption["err_detect"]}
+                )
+                return
+
+        self.Container = av.open(self.Source, options=self.AVOption)
+
+    def _seek(self, offset: float, *args, buffered: bool = True, **kwargs) -> None:
+        self.played = False
+        self.stopRecording()
+
+        if self.Replay:
+            Replay, self.Replay = self.Replay, None
+            Replay.close()
+
+            if not self.BufferLoader:
+                self._position = self.start_position = offset
+                return
+
+        if buffered and self.seekBuffered(offset):
+            return
+
+        if Config.DECODER_PROCESSES:
+            if not self.BufferLoader:
+                self.start_position = offset
+            else:
+                self.BufferLoader.seek(offset)
+            return
+
         with withLock(self._seeking):
             self._seeked = True
 
+            if self.loading and self.SeekIndex.seek(offset):
+                self._skipUntil = offset
+                self.reload()
+                return
+
+            self._skipUntil = None
+
+            if not self.Container and self.loading:
+                self.waitForOpen()
+
             if not self.Container:
-                if not self._loading.locked():
-                    self.Container = av.open(
-                        self.Source.Source, options=self.Source.AVOption
-                    )
-                else:
-                    while not self.Container:
-                        pass
+                self.openContainer()
 
             kwargs["any_frame"] = True
 
+            self.SeekIndex.clear()
             self.Container.seek(round(max(offset, 1) * 1000000), *args, **kwargs)
             self.reload()
 
+    def scheduleRewind(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.run_in_executor, None, self.rewind)
+
+    def rewind(self) -> None:
+        """Decode the audio buffered with the previous filter again from the position of the latest filter change,
+        the changes made before it is run are applied by one seek."""
+
+        with self._rewindLock:
+            position, self._rewindTo = self._rewindTo, None
+
+        if position is None:
+            return
+
+        self._seek(position, buffered=False)
+
     def seek(self, offset: float, *args, **kwargs) -> Coroutine:
         return self.loop.run_in_executor(
             None, functools.partial(self._seek, offset, *args, **kwargs)
@@ -134,129 +615,655 @@ class PyAVSource:
             if self._end.is_set():
                 self._end.clear()
             self.start()
+        elif self.BufferLoader:
+            self.BufferLoader.wake()
 
     def start(self) -> None:
-        self.BufferLoader = Loader(self)
+        if Config.DECODER_PROCESSES:
+            from .ProcessLoader import ProcessLoader
+
+            self.BufferLoader = ProcessLoader(self)
+        else:
+            self.BufferLoader = Loader(self)
+
         self.BufferLoader.start()
 
+    def createAudioFifo(self) -> AudioFifo:
+        if not self.compressed:
+            return AudioFifo(limit=self.Buffer.limit)
+
+        # the ring grows when a decoded packet does not fit
+        return AudioFifo(
+            capacity=2
+            * Config.PCM_WINDOW
+            * Config.SAMPLES_PER_FRAME
+            * Config.SAMPLE_SIZE,
+            limit=self.pcmLimit,
+        )
+
+    def resetBuffer(self) -> None:
+        self.AudioFifo = self.createAudioFifo()
+        self.PacketFifo = PacketFifo(limit=self.Buffer.limit)
+
+    def applyBufferLimit(self) -> None:
+        for Fifo, limit in (
+            (self.AudioFifo, self.pcmLimit),
+            (self.PacketFifo, self.Buffer.limit),
+        ):
+            if Fifo and Fifo.limit != limit:
+                Fifo.setLimit(limit)
+
     def stop(self) -> bool:
         self.stopped = True
         return self.stopped
 
-    @staticmethod
-    def is_opus() -> bool:
-        return False
+    def is_opus(self) -> bool:
+        if not self.selectAudioStream:
+            return False
+
+        return (
+            self.selectAudioStream.codec_context.name == "opus"
+            and self.selectAudioStream.codec_context.sample_rate == Config.SAMPLING_RATE
+        )
 
     def cleanup(self) -> None:
+        self.stopRecording()
+        if self.Replay:
+            self.Replay.close()
+
         self._end.set()
         if self.AudioFifo and not self.AudioFifo.haveToFillBuffer.is_set():
             self.AudioFifo.haveToFillBuffer.set()
-        self.AudioFifo = None
+        if self.PacketFifo and not self.PacketFifo.haveToFillBuffer.is_set():
+            self.PacketFifo.haveToFillBuffer.set()
+        self.AudioFifo = self.PacketFifo = None
 
+        if self.BufferLoader:
+            self.BufferLoader.stop()
 
-class Loader(threading.Thread):
-    def __init__(self, AudioSource: PyAVSource) -> None:
-        threading.Thread.__init__(self)
-        self.daemon = True
+        self.Buffer.close()
+        self.notify()
+
+
+class Loader:
+    """The decode job of a source, which is run by :py:class:`discodo.decoder.DecoderPool`."""
+
+    # the seconds the demuxer can be behind the shared segments, before it seeks instead of demuxing to the position
+    CATCHUP = 10.0
 
+    def __init__(self, AudioSource: PyAVSource) -> None:
         self.Source = AudioSource
 
-        self.Resampler = None
+        self.Resampler = AudioResampler()
         self.Filter = {}
+        self.AudioFilter = AudioFilter()  # keeps the graphs of the latest filters
         self.FilterGraph = None
+        self.Recorder = None
+
+        # the position of the next sample to write, the segments are shared by it
+        self.samples: Optional[int] = None
+        # the position minus the timestamp of the decoded audio, which differs by the codec delay
+        self.offset: Optional[int] = None
+        self.resumed = False
+        self.demuxed: Optional[float] = None
+        self.Segment: Optional[Tuple[int, bytearray]] = None
+        self.Shared: Optional[Tuple[int, bytes, bool, int]] = None
+        self.missed: Optional[int] = None
+
+        self.opened = False
+        self.exhausted = (
+            False  # demuxed to the end, with the queued packets left to decode
+        )
+        self.interval = None
+        self.loaded = 0.0
+        self.rejectedFrames = 0  # the decoded frames which the resampler rejected
+        self.state = None
+        self.woken = False
+        self.decodeTime = RollingHistogram(size=100)
+
+    def __repr__(self) -> str:
+        return f"<Loader state={self.state} source={self.Source}>"
+
+    def start(self) -> None:
+        self.Source._loading.acquire()
+
+        Decoders.submit(self)
+
+    def wake(self) -> None:
+        Decoders.wake(self)
+
+    def update(self) -> None:
+        pass
 
-    def _do_run(self) -> None:
-        with withLock(self.Source._loading):
-            if not self.Source.Container:
-                self.Source.Container = av.open(
-                    self.Source.Source, options=self.Source.AVOption
+    def stop(self) -> None:
+        self.wake()
+
+    @property
+    def starving(self) -> bool:
+        Fifo = self.Fifo
+
+        return bool(Fifo) and not Fifo.is_ready()
+
+    @property
+    def blocking(self) -> bool:
+        """Whether the steps can wait on the network, the container is not opened
+        or the stream is read by ffmpeg, which cannot tell the data is received yet."""
+
+        return not self.opened or (
+            not self.Source.IO and not os.path.isfile(self.Source.Source)
+        )
+
+    @property
+    def Fifo(self):
+        if self.Source.passthrough and self.Source.is_opus():
+            return self.Source.PacketFifo
+
+        return self.Source.AudioFifo
+
+    def needFill(self) -> bool:
+        for Fifo in (self.Source.AudioFifo, self.Source.PacketFifo):
+            if Fifo:
+                Fifo.haveToFillBuffer.callback = self.wake
+
+        if self.Source._end.is_set():
+            return True
+
+        Fifo = self.Fifo
+        needPcm = not Fifo or Fifo.haveToFillBuffer.is_set()
+
+        if self.compressing and needPcm and self.Source.PacketFifo.samples:
+            # the queued packets are decoded without reading the stream
+            return True
+
+        IO = self.Source.IO
+        if self.opened and IO and not IO.closed and not IO.ready(self.wake):
+            # parked until the range to read is received
+            return False
+
+        if (
+            self.compressing
+            and not self.exhausted
+            and self.Source.PacketFifo.haveToFillBuffer.is_set()
+        ):
+            return True
+
+        return needPcm
+
+    def open(self) -> None:
+        if not self.Source.Container:
+            self.Source.openContainer()
+        self.Source._duration = round(self.Source.Container.duration / 1000000, 2)
+
+        if self.Source.start_position:
+            self.Source.LoudnessMeter = None
+            self.Source.Container.seek(
+                round(max(self.Source.start_position, 1) * 1000000), any_frame=True
+            )
+
+        self.Source.selectAudioStream = self.Source.Container.streams.audio[0]
+        self.Source.PacketGenerator = self.Source.Container.demux(
+            self.Source.selectAudioStream
+        )
+
+        if (
+            self.Source.cacheKey
+            and not self.Source.start_position
+            and not os.path.isfile(self.Source.Source)
+        ):
+            self.Recorder = Streams.record(
+                self.Source.cacheKey, self.Source.selectAudioStream
+            )
+
+        if self.Source.cacheKey:
+            Segments.acquire(self.Source.cacheKey)
+        self.samples = None if self.Source.start_position else 0
+        self.demuxed = self.Source.start_position
+
+        self.opened = True
+        self.Source.notify()
+
+    def step(self) -> bool:
+        """Demux a packet and write it to the fifo, measuring the loading rate of the source.
+
+        :returns: Whether the source has more packets to load.
+        :rtype: bool"""
+
+        stepStart = time.perf_counter()
+        self.loaded = 0.0
+
+        try:
+            return self.load()
+        finally:
+            self.Source.Buffer.measure(self.loaded, time.perf_counter() - stepStart)
+
+    def load(self) -> bool:
+        if self.Source._end.is_set():
+            return False
+
+        if not self.opened:
+            self.open()
+
+        self.Source.applyBufferLimit()
+
+        if self.Source.filter != self.Filter:
+            self.Filter = self.Source.filter
+
+            if self.Source.filter:
+                self.FilterGraph = self.AudioFilter
+                self.FilterGraph.selectAudioStream = self.Source.selectAudioStream
+                self.FilterGraph.setFilters(self.Filter)
+            else:
+                self.FilterGraph = None
+
+            self.samples = None
+            self.Source.filterApplied()
+
+        if self.Source._haveToReloadResampler.is_set():
+            self.Resampler.reset()
+            self.Source._haveToReloadResampler.clear()
+
+        if self.sharing:
+            shared = self.readSegment()
+            if shared is not None:
+                return shared
+
+            self.catchUp()
+
+        if self.compressing and not self.Source._seeked:
+            queued = self.decodeQueued()
+            if queued is not None:
+                return queued
+
+        _seek_locked = False
+        if self.Source._seeking.locked():
+            self.Source._seeking.acquire()
+            _seek_locked = True
+
+        Packet = self.Source.SeekIndex.next()
+        replayed = Packet is not None
+
+        if not replayed:
+            Packet = next(self.Source.PacketGenerator, None)
+
+        if _seek_locked:
+            self.Source._seeking.release()
+
+        if self.Source._seeked:
+            self.Source._seeked = False
+            self.Source.LoudnessMeter = None
+
+            self.Source.resetBuffer()
+            self.samples = self.demuxed = self.Segment = None
+            self.resumed = self.exhausted = False
+            if self.Source._filterPending is not None:
+                self.Source._filterPending = 0
+
+            if not replayed:
+                self.Source.SeekIndex.clear()
+
+                if self.Recorder:
+                    self.Recorder.close(complete=False)
+
+        if Packet is not None and not replayed:
+            self.Source.SeekIndex.add(Packet, self.Source.position)
+
+            if self.Recorder:
+                self.Recorder.write(Packet)
+
+        if Packet is not None and Packet.pts is not None:
+            self.demuxed = float(
+                (Packet.pts + (Packet.duration or 0)) * Packet.time_base
+            )
+
+        if Packet is None:
+            if self.compressing and self.Source.PacketFifo.samples:
+                self.exhausted = True
+                return True
+
+            if self.Source.LoudnessMeter:
+                self.Source.loudness = self.Source.LoudnessMeter.integrated
+
+            if self.Recorder:
+                # the demuxer also ends when the connection is lost
+                self.Recorder.close(
+                    complete=self.Recorder.position >= (self.Source._duration or 0) - 1
                 )
-            self.Source._duration = round(self.Source.Container.duration / 1000000, 2)
 
-            if self.Source.start_position:
-                self.Source.Container.seek(
-                    round(max(self.Source.start_position, 1) * 1000000), any_frame=True
+            if self.Segment and self.sharing:
+                index, Data = self.Segment
+                Segments.put(
+                    self.Source.cacheKey, index, bytes(Data), self.offset, final=True
                 )
 
-            self.Source.selectAudioStream = self.Source.Container.streams.audio[0]
-            self.Source.FrameGenerator = self.Source.Container.decode(
-                self.Source.selectAudioStream
+            return False
+
+        if (
+            self.samples is not None
+            and self.demuxed is not None
+            and self.demuxed < (self.samples / Config.SAMPLING_RATE - SeekIndex.PREROLL)
+        ):
+            # the audio of the packet is already written from the shared segments
+            self.resumed = True
+            return True
+
+        if self.Source.passthrough and self.Source.is_opus():
+            self.Source.LoudnessMeter = None
+            self.samples = self.Segment = None
+
+            if Packet.size:
+                self.writePacket(Packet)
+            return True
+
+        if self.compressing and Packet.duration:
+            self.queuePacket(Packet)
+            return True
+
+        if self.Source.PacketFifo:
+            for QueuedPacket, _ in self.Source.PacketFifo.drain():
+                self.decodePacket(QueuedPacket)
+
+        self.decodePacket(Packet)
+
+        return True
+
+    @property
+    def sharing(self) -> bool:
+        """Whether the decoded audio is shared with the sources playing the same track."""
+
+        return (
+            Segments.enabled
+            and bool(self.Source.cacheKey)
+            and not self.FilterGraph
+            and not (self.Source.passthrough and self.Source.is_opus())
+            and not self.Source._seeked
+            and not self.Source.SeekIndex.replaying
+            and self.Source._skipUntil is None
+            and self.Source.AudioFifo is not None
+            and not self.compressing
+        )
+
+    @property
+    def compressing(self) -> bool:
+        """Whether the demuxed packets are queued to decode them just in time."""
+
+        return (
+            self.Source.compressed
+            and self.Source.PacketFifo is not None
+            and not (self.Source.passthrough and self.Source.is_opus())
+        )
+
+    def decodeQueued(self) -> Optional[bool]:
+        """Decode a queued packet when the pcm window is not filled.
+
+        :returns: ``None`` to demux a packet, otherwise whether the source has more audio.
+        :rtype: Optional[bool]"""
+
+        Fifo = self.Source.AudioFifo
+        if Fifo and Fifo.haveToFillBuffer.is_set():
+            Packets = self.Source.PacketFifo.read(1, partial=True)
+
+            for Packet, _ in Packets:
+                self.decodePacket(Packet)
+
+            if Packets:
+                # the audio is measured when the packets are demuxed
+                self.loaded = 0.0
+                return True
+
+        if self.exhausted and self.Source.PacketFifo.samples:
+            return True
+
+        return None
+
+    def queuePacket(self, Packet: av.Packet) -> None:
+        samples = round(Packet.duration * Packet.time_base * Config.SAMPLING_RATE)
+
+        self.Source.PacketFifo.write(Packet, samples)
+        self.loaded += samples / Config.SAMPLING_RATE
+
+        if Packet.pts is not None:
+            # the position is the end of the audio in the buffers
+            self.Source._position = float(
+                (Packet.pts + Packet.duration) * Packet.time_base
+            )
+
+        self.Source.notify()
+
+    def readSegment(self) -> Optional[bool]:
+        """Write the audio at the position from the shared segment instead of decoding.
+
+        :returns: ``None`` when the segment is not cached, otherwise whether the source has more audio.
+        :rtype: Optional[bool]"""
+
+        if self.samples is None:
+            return None
+
+        index, offset = divmod(self.samples, Segments.samples)
+
+        if not self.Shared or self.Shared[0] != index:
+            if self.missed == index:
+                return None
+
+            Segment = Segments.get(self.Source.cacheKey, index)
+            if not Segment:
+                self.missed = index
+                return None
+
+            self.Shared = (index, *Segment)
+
+        _, Data, final, self.offset = self.Shared
+
+        start = offset * Config.SAMPLE_SIZE
+        end = min(start + Config.SAMPLES_PER_FRAME * Config.SAMPLE_SIZE, len(Data))
+
+        if start < end:
+            self.Source.LoudnessMeter = None
+            self.Source.AudioFifo.write(memoryview(Data)[start:end])
+
+            # the decoder and the resampler continue from another position after the segments
+            if not self.resumed:
+                self.resumed = True
+                self.Source._haveToReloadResampler.set()
+            self.Segment = None
+
+            self.samples += (end - start) // Config.SAMPLE_SIZE
+            self.loaded += (end - start) / Config.SAMPLE_SIZE / Config.SAMPLING_RATE
+            self.Source._position = self.samples / Config.SAMPLING_RATE
+
+            self.Source.notify()
+
+        return not final or end < len(Data)
+
+    def catchUp(self) -> None:
+        """Seek the demuxer to the position when it is far behind after the shared segments."""
+
+        if self.samples is None or self.demuxed is None:
+            return
+
+        position = self.samples / Config.SAMPLING_RATE
+        if position - self.demuxed < self.CATCHUP:
+            return
+
+        with withLock(self.Source._seeking):
+            if self.Source._seeked:
+                return
+
+            self.Source.SeekIndex.clear()
+            if self.Recorder:
+                self.Recorder.close(complete=False)
+
+            self.Source.Container.seek(
+                round(max(position - 1, 1) * 1000000), any_frame=True
             )
+            self.demuxed = position - 1
+
+    def writeSegment(self, position: int, Data: memoryview) -> None:
+        """Add the decoded audio at the position to the segment, which is shared when it is filled."""
+
+        size = Segments.samples * Config.SAMPLE_SIZE
+        start = position * Config.SAMPLE_SIZE
 
-            while not self.Source._end.is_set():
-                if self.Source.filter != self.Filter:
-                    self.Filter = self.Source.filter
-
-                    if self.Source.filter:
-                        self.FilterGraph = AudioFilter()
-                        self.FilterGraph.selectAudioStream = (
-                            self.Source.selectAudioStream
-                        )
-                        self.FilterGraph.setFilters(self.Filter)
-                    else:
-                        self.FilterGraph = None
-
-                if not self.Resampler or self.Source._haveToReloadResampler.is_set():
-                    self.Resampler = av.AudioResampler(
-                        format=av.AudioFormat("s16").packed, layout="stereo", rate=48000
+        while len(Data):
+            index, offset = divmod(start, size)
+            length = min(len(Data), size - offset)
+
+            if not offset:
+                self.Segment = (index, bytearray())
+
+            if (
+                self.Segment
+                and self.Segment[0] == index
+                and len(self.Segment[1]) == offset
+            ):
+                self.Segment[1].extend(Data[:length])
+
+                if len(self.Segment[1]) == size:
+                    Segments.put(
+                        self.Source.cacheKey, index, bytes(self.Segment[1]), self.offset
                     )
-                    self.Source._haveToReloadResampler.clear()
+                    self.Segment = None
+            else:
+                self.Segment = None
+
+            Data = Data[length:]
+            start += length
+
+    def skipped(self, position: float) -> bool:
+        """Whether the audio at the position is before the offset of the seek replaying the packets."""
 
-                _seek_locked = False
-                if self.Source._seeking.locked():
-                    self.Source._seeking.acquire()
-                    _seek_locked = True
+        if self.Source._skipUntil is None:
+            return False
 
-                Frame = next(self.Source.FrameGenerator, None)
+        if position < self.Source._skipUntil:
+            return True
 
-                if _seek_locked:
-                    self.Source._seeking.release()
+        self.Source._skipUntil = None
+        return False
 
-                if self.Source._seeked:
-                    self.Source._seeked = False
+    def writePacket(self, Packet: av.Packet) -> None:
+        if Packet.pts is not None and self.skipped(
+            float(Packet.pts * Packet.time_base)
+        ):
+            return
 
-                    self.Source.AudioFifo = AudioFifo()
+        samples = (
+            round(Packet.duration * Packet.time_base * Config.SAMPLING_RATE)
+            if Packet.duration
+            else getPacketSamples(bytes(Packet))
+        )
 
-                if not Frame:
-                    self.Source.stop()
-                    break
+        if self.Source.PacketFifo:
+            self.Source.PacketFifo.write(Packet, samples)
 
-                _current_position = float(Frame.pts * Frame.time_base)
+        self.loaded += samples / Config.SAMPLING_RATE
 
-                if self.FilterGraph:
-                    self.FilterGraph.push(Frame)
-                    Frame = self.FilterGraph.pull()
+        if Packet.pts is not None:
+            self.Source._position = float(Packet.pts * Packet.time_base)
 
-                    if not Frame:
-                        continue
+        self.Source.notify()
 
-                Frame.pts = None
-                try:
-                    Frame = self.Resampler.resample(Frame)
-                except ValueError:
-                    self.Source._haveToReloadResampler.set()
-                    continue
+    def decodePacket(self, Packet: av.Packet) -> None:
+        # seeking the container flushes the decoder
+        with withLock(self.Source._seeking):
+            Frames = self.Source.selectAudioStream.decode(Packet)
 
-                if self.Source.AudioFifo:
-                    if not self.Source.AudioFifo.haveToFillBuffer.is_set():
-                        self.Source.AudioFifo.haveToFillBuffer.wait()
+        for Frame in Frames:
+            self.writeFrame(Frame)
 
-                if self.Source.AudioFifo:
-                    self.Source.AudioFifo.write(Frame)
+    def writeFrame(self, Frame: av.AudioFrame) -> None:
+        _current_position = float(Frame.pts * Frame.time_base)
+
+        if self.skipped(_current_position):
+            return
 
-                self.Source._position = _current_position
+        if self.FilterGraph:
+            self.FilterGraph.push(Frame)
+            Frame = self.FilterGraph.pull()
 
-                if self.Source._waitforread.locked():
-                    self.Source._waitforread.release()
+            if not Frame:
+                return
 
-    def run(self) -> None:
+        Frame.pts = None
         try:
-            self._do_run()
-        except:
-            traceback.print_exc()
-        finally:
-            if self.Source.Container:
-                self.Source.Container.close()
-                self.Source.Container = None
+            Frame = self.Resampler.resample(Frame)
+        except ValueError as exc:
+            self.rejectedFrames += 1
+            log.warning(
+                f"dropped a frame of {Frame.format.name} {Frame.layout.name} {Frame.sample_rate}Hz "
+                f"at {round(_current_position, 3)}s of {self.Source.Source}, the resampler rejected it: {exc}"
+            )
+
+            self.Resampler.reset()
+            return
+
+        if self.Source.LoudnessMeter:
+            if self.FilterGraph:
+                self.Source.LoudnessMeter = None
+            else:
+                self.Source.LoudnessMeter.write(Frame.to_ndarray())
+
+        Data = memoryview(Frame.planes[0]).cast("B")[
+            : Frame.samples * Config.SAMPLE_SIZE
+        ]
+
+        if not self.FilterGraph:
+            position = round(_current_position * Config.SAMPLING_RATE)
+
+            if self.samples is None:
+                self.samples = position + (self.offset or 0)
+
+            if self.resumed:
+                # the audio before the position is already written from the shared segments
+                written = self.samples - position - (self.offset or 0)
+                if written > 0:
+                    Data = Data[written * Config.SAMPLE_SIZE :]
+                    if not len(Data):
+                        return
+
+                self.resumed = False
+            else:
+                self.offset = self.samples - position
+
+        if self.Source.AudioFifo:
+            self.Source.AudioFifo.write(Data)
+
+        if self.samples is not None:
+            if self.sharing:
+                self.writeSegment(self.samples, Data)
+            self.samples += len(Data) // Config.SAMPLE_SIZE
+
+        self.loaded += len(Data) / Config.SAMPLE_SIZE / Config.SAMPLING_RATE
+        if not self.compressing:
+            self.Source._position = _current_position
+
+        self.Source.notify()
+
+    def finish(self) -> None:
+        if self.Recorder:
+            self.Recorder.close(complete=False)
+
+        if self.opened and self.Source.cacheKey:
+            Segments.release(self.Source.cacheKey)
+
+        if self.Source.Container:
+            self.Source.Container.close()
+            self.Source.Container = None
+        if self.Source.IO:
+            self.Source.IO.close()
+        self.Source.SeekIndex.clear()
+
+        self.Source.stop()
+        self.Source._loading.release()
+
+        self.Source.notify()
 
-            self.Source.stop()
+    def toDict(self) -> dict:
+        return {
+            "state": self.state,
+            "position": self.Source._position,
+            "duration": self.Source._duration,
+            "decodeTime": self.decodeTime.toDict(),
+            "rejectedFrames": self.rejectedFrames,
+            "buffer": self.Source.Buffer.toDict(),
+            "http": self.Source.IO.toDict() if self.Source.IO else None,
+        }
@@ -0,0 +1,127 @@
+import collections
+import threading
+from typing import Optional
+
+import av
+
+from ..config import Config
+from ..utils.buffer import Buffers
+
+
+class SeekIndex:
+    """The demuxed packets of a source in order, to seek inside the seen region without I/O.
+
+    The packets from ``Config.SEEK_HISTORY`` seconds before the played position are kept with their timestamp and keyframe flag,
+    a seek inside them replays the packets from the keyframe before the offset and the demuxer continues after the last one.
+    The size of the packets is held in :py:data:`discodo.utils.buffer.Buffers`."""
+
+    PREROLL = 0.08  # opus needs 80 ms of preroll after a discontinuity
+
+    def __init__(self) -> None:
+        self.Packets = collections.deque()
+        self.first = 0
+        self.cursor = None
+        self.end: Optional[float] = None
+        self.size = 0
+
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.Packets)
+
+    def __repr__(self) -> str:
+        return f"<SeekIndex packets={len(self)} start={self.start} end={self.end} replaying={self.replaying}>"
+
+    @property
+    def start(self) -> Optional[float]:
+        # the packets without timestamp are trimmed from the front
+        return self.Packets[0][0] if self.Packets else None
+
+    @property
+    def replaying(self) -> bool:
+        return self.cursor is not None
+
+    def add(self, Packet: av.Packet, played: Optional[float] = None) -> None:
+        """Add a demuxed packet, trimming the packets before ``Config.SEEK_HISTORY`` seconds of the played position,
+        or of the packet when it is not given."""
+
+        if not Config.SEEK_HISTORY:
+            return
+
+        time = float(Packet.pts * Packet.time_base) if Packet.pts is not None else None
+        since = played if played is not None else time
+
+        with self._lock:
+            self.Packets.append((time, Packet.is_keyframe, Packet))
+            self.hold(Packet.size)
+            if time is not None:
+                self.end = time
+
+            while (
+                len(self.Packets) > 1
+                and (self.cursor is None or self.first < self.cursor)
+                and (
+                    self.Packets[0][0] is None
+                    or since is not None
+                    and since - self.Packets[0][0] > Config.SEEK_HISTORY
+                )
+            ):
+                self.hold(-self.Packets.popleft()[2].size)
+                self.first += 1
+
+    def hold(self, size: int) -> None:
+        self.size += size
+        Buffers.hold(size)
+
+    def covers(self, offset: float) -> bool:
+        start, end = self.start, self.end
+
+        return start is not None and start <= offset <= end
+
+    def seek(self, offset: float) -> bool:
+        """Move the cursor to the keyframe before the offset to replay the packets from there.
+
+        :returns: Whether the offset is in the index.
+        :rtype: bool"""
+
+        if not self.covers(offset):
+            return False
+
+        with self._lock:
+            index = 0
+            for current, (time, keyframe, _) in enumerate(self.Packets):
+                if time is None or not keyframe:
+                    continue
+                if time > offset - self.PREROLL:
+                    break
+
+                index = current
+
+            self.cursor = self.first + index
+
+        return True
+
+    def next(self) -> Optional[av.Packet]:
+        """Get the next packet to replay, ``None`` when the demuxer has to continue."""
+
+        with self._lock:
+            if self.cursor is None:
+                return None
+
+            # the packet to replay is trimmed, the demuxer continues instead
+            if not 0 <= self.cursor - self.first < len(self.Packets):
+                self.cursor = None
+                return None
+
+            _, _, Packet = self.Packets[self.cursor - self.first]
+            self.cursor += 1
+
+            return Packet
+
+    def clear(self) -> None:
+        with self._lock:
+            self.first += len(self.Packets)
+            self.Packets.clear()
+            self.cursor = self.end = None
+
+            self.hold(-self.size)
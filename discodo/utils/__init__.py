@@ -1,4 +1,6 @@
 from . import tcp, threadLock
 from .callbackList import CallbackList
 from .eventDispatcher import EventDispatcher
+from .pacer import Pacer
 from .status import *
+from .telemetry import PlayerTelemetry, RollingHistogram
@@ -0,0 +1,186 @@
+import threading
+import time
+
+from ..config import Config
+
+# a second of the demuxed packets, estimated at 256 kbps
+COMPRESSED_BYTES_PER_SECOND = 32 * 1024
+
+
+class BufferBudget:
+    """Keeps the total buffer size of the sources under ``Config.BUFFER_MEMORY`` megabytes.
+
+    When the buffer sizes of the sources are over the ceiling, all of them are scaled down to fit.
+    The bytes held besides the buffers, such as the packets of the seek indexes, are taken from the ceiling first."""
+
+    def __init__(self) -> None:
+        self.buffers = 0
+        self.total = 0.0
+        self.held = 0
+
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<BufferBudget buffers={self.buffers} total={round(self.total, 2)} scale={round(self.scale, 2)}>"
+
+    @property
+    def bytesPerSecond(self) -> int:
+        if Config.COMPRESSED_BUFFER and not Config.DECODER_PROCESSES:
+            return COMPRESSED_BYTES_PER_SECOND
+
+        return Config.SAMPLING_RATE * Config.SAMPLE_SIZE
+
+    @property
+    def scale(self) -> float:
+        if not Config.BUFFER_MEMORY or not self.total:
+            return 1.0
+
+        return min(
+            max(Config.BUFFER_MEMORY * 1024 * 1024 - self.held, 0)
+            / (self.total * self.bytesPerSecond),
+            1.0,
+        )
+
+    def add(self, seconds: float, buffers: int = 0) -> None:
+        with self._lock:
+            self.total += seconds
+            self.buffers += buffers
+
+    def hold(self, size: int) -> None:
+        """Add the bytes held besides the buffers."""
+
+        with self._lock:
+            self.held += size
+
+    def toDict(self) -> dict:
+        return {
+            "buffers": self.buffers,
+            "total": round(self.total, 2),
+            "memory": int(self.total * self.scale * self.bytesPerSecond),
+            "held": self.held,
+            "scale": round(self.scale, 3),
+        }
+
+
+Buffers = BufferBudget()
+
+
+class AdaptiveBuffer:
+    """The buffer size of a source in seconds, between ``Config.MIN_BUFFERLIMIT`` and ``Config.MAX_BUFFERLIMIT``.
+
+    The size is doubled on underrun and grown while the source is loaded slower than ``MARGINAL_RATE`` times realtime,
+    and shrunk toward the floor while it is loaded faster than ``FAST_RATE`` times realtime with no underrun for ``STABLE`` seconds.
+    Otherwise it decays back toward ``Config.BUFFERLIMIT`` when it has not grown for ``STABLE`` seconds.
+    Local files start from the floor, and live streams, which are loaded in realtime, only grow on underrun
+    up to ``Config.MAX_LIVE_BUFFERLIMIT``.
+
+    :param bool local: Whether the source is a local file
+    :param bool live: Whether the source is a live stream"""
+
+    MARGINAL_RATE = 2.0
+    FAST_RATE = 8.0
+    STABLE = 30.0
+
+    # the loading to measure before adapting, in seconds of wall time or audio
+    WINDOW = 1.0
+    AUDIO_WINDOW = 5.0
+
+    def __init__(self, local: bool = False, live: bool = False) -> None:
+        self.live = live
+        self.target = min(
+            Config.MIN_BUFFERLIMIT if local else float(Config.BUFFERLIMIT),
+            self.ceiling,
+        )
+        self.adaptive = True
+        self.closed = False
+
+        self.rate = None
+        self.underruns = 0
+        self._underrunAt = self._grownAt = None
+        self._audio = self._elapsed = 0.0
+
+        Buffers.add(self.target, 1)
+
+    def __repr__(self) -> str:
+        return f"<AdaptiveBuffer target={round(self.target, 2)} limit={round(self.limit, 2)} rate={self.rate}>"
+
+    def __del__(self) -> None:
+        self.close()
+
+    @property
+    def limit(self) -> float:
+        return max(
+            self.target * Buffers.scale, min(Config.MIN_BUFFERLIMIT, self.target)
+        )
+
+    @property
+    def ceiling(self) -> float:
+        if self.live:
+            return max(
+                min(Config.MAX_LIVE_BUFFERLIMIT, Config.MAX_BUFFERLIMIT),
+                Config.MIN_BUFFERLIMIT,
+            )
+
+        return Config.MAX_BUFFERLIMIT
+
+    def stable(self, since: float) -> bool:
+        return since is None or time.monotonic() - since > self.STABLE
+
+    def resize(self, target: float) -> None:
+        target = min(max(target, Config.MIN_BUFFERLIMIT), self.ceiling)
+
+        if not self.closed:
+            Buffers.add(target - self.target)
+
+        self.target = target
+
+    def underrun(self) -> None:
+        self.underruns += 1
+        self._underrunAt = time.monotonic()
+
+        if self.adaptive:
+            self.grow(2)
+
+    def grow(self, factor: float) -> None:
+        self._grownAt = time.monotonic()
+        self.resize(self.target * factor)
+
+    def measure(self, audio: float, elapsed: float) -> None:
+        """Add the seconds of audio loaded in the elapsed seconds."""
+
+        self._audio += audio
+        self._elapsed += elapsed
+
+        if self._elapsed < self.WINDOW and self._audio < self.AUDIO_WINDOW:
+            return
+
+        rate = self._audio / self._elapsed if self._elapsed else self.FAST_RATE
+        self._audio = self._elapsed = 0.0
+
+        self.rate = rate if self.rate is None else self.rate * 0.7 + rate * 0.3
+
+        if not self.adaptive:
+            return
+
+        if self.rate < self.MARGINAL_RATE and not self.live:
+            self.grow(1.5)
+        elif self.rate > self.FAST_RATE and self.stable(self._underrunAt):
+            self.resize(self.target * 0.9)
+        elif self.target > Config.BUFFERLIMIT and self.stable(self._grownAt):
+            self.resize(max(self.target * 0.9, Config.BUFFERLIMIT))
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+
+        Buffers.add(-self.target, -1)
+
+    def toDict(self) -> dict:
+        return {
+            "target": round(self.target, 2),
+            "limit": round(self.limit, 2),
+            "rate": round(self.rate, 2) if self.rate is not None else None,
+            "underruns": self.underruns,
+            "live": self.live,
+        }
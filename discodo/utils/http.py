@@ -0,0 +1,98 @@
+import asyncio
+import time
+from typing import Optional
+
+import aiohttp
+import yarl
+
+# the seconds an idle connection is kept to be reused
+KEEPALIVE = 60.0
+# the seconds the status of a probed url is reused
+PROBE_TTL = 30.0
+
+
+class SessionPool:
+    """Keeps a keep-alive session for each local address of the route planner, shared by the node."""
+
+    def __init__(self) -> None:
+        self.Sessions = {}
+        self.Probes = {}  # url: (status, probed at)
+        self.probes = self.probeHits = 0
+
+    def __repr__(self) -> str:
+        return f"<SessionPool sessions={len(self.Sessions)}>"
+
+    def get(self, address: Optional[str] = None) -> aiohttp.ClientSession:
+        """Get the session of the address, called in the event loop.
+
+        :rtype: aiohttp.ClientSession"""
+
+        loop = asyncio.get_running_loop()
+        Key = (loop, str(address) if address else None)
+
+        Session = self.Sessions.get(Key)
+        if not Session or Session.closed:
+            for StaleKey in [Key for Key in self.Sessions if Key[0].is_closed()]:
+                del self.Sessions[StaleKey]
+
+            Session = self.Sessions[Key] = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    local_addr=(str(address), 0) if address else None,
+                    keepalive_timeout=KEEPALIVE,
+                )
+            )
+
+        return Session
+
+    async def close(self) -> None:
+        for Session in self.Sessions.values():
+            await Session.close()
+
+        self.Sessions.clear()
+
+    async def probe(self, url: str, address: Optional[str] = None) -> int:
+        """Request the first byte of the url to check it can be played,
+        the successful status is reused for ``PROBE_TTL`` seconds.
+
+        :rtype: int"""
+
+        now = time.monotonic()
+
+        Cached = self.Probes.get(url)
+        if Cached and now - Cached[1] < PROBE_TTL:
+            self.probeHits += 1
+            return Cached[0]
+
+        async with self.get(address).get(
+            yarl.URL(url, encoded=True), headers={"Range": "bytes=0-0"}
+        ) as resp:
+            Status = resp.status
+
+        self.probes += 1
+
+        # the probes are inserted in order, so the expired ones are at the front
+        for Key in list(self.Probes):
+            if now - self.Probes[Key][1] < PROBE_TTL:
+                break
+            del self.Probes[Key]
+
+        if Status < 400:
+            self.Probes.pop(url, None)
+            self.Probes[url] = (Status, now)
+
+        return Status
+
+    def toDict(self) -> dict:
+        return {
+            "sessions": len(self.Sessions),
+            "connections": sum(
+                len(getattr(Session.connector, "_conns", {}))
+                for Session in self.Sessions.values()
+                if not Session.closed
+            ),
+            "probes": self.probes,
+            "probeHits": self.probeHits,
+        }
+
+
+Sessions = SessionPool()
@@ -0,0 +1,275 @@
+import asyncio
+import concurrent.futures
+import io
+import logging
+import re
+import time
+from typing import Callable, Dict, Optional
+
+import aiohttp
+import yarl
+
+from ..config import Config
+from .buffer import Buffers
+from .http import Sessions
+from .telemetry import RollingHistogram
+
+log = logging.getLogger("discodo.utils.httpStream")
+
+CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+# the whence of ffmpeg asking the size of the stream
+AVSEEK_SIZE = 0x10000
+# the bytes ffmpeg reads at a time from a file-like object
+READ_SIZE = 32768
+
+
+class HTTPStream(io.RawIOBase):
+    """A file-like object of an http stream for :py:func:`av.open`, which is read by the decoder thread.
+
+    The stream is requested in ranges of ``CHUNK`` bytes on the keep-alive sessions of the node,
+    ``Config.HTTP_PREFETCH`` chunks after the read position are requested concurrently,
+    and a request reset by the server is resumed from the bytes already received.
+    The requested chunks are held in :py:data:`discodo.utils.buffer.Buffers`,
+    and a read fails when no bytes are received for ``TIMEOUT`` seconds.
+
+    :param str url: The url of the stream
+    :param asyncio.AbstractEventLoop loop: The event loop to request on
+    :param Optional[str] address: The local address to request from"""
+
+    CHUNK = 256 * 1024
+    RETRIES = 3
+    TIMEOUT = 10.0
+
+    def __init__(
+        self,
+        url: str,
+        loop: asyncio.AbstractEventLoop,
+        address: Optional[str] = None,
+    ) -> None:
+        super().__init__()
+
+        self.url = url
+        self.loop = loop
+        self.address = address
+
+        self.size: Optional[int] = None
+        self.position = 0
+        self.Chunks: Dict[int, concurrent.futures.Future] = {}
+        self.Watched = set()  # the indexes of the chunks calling back when received
+
+        self.requests = 0
+        self.retries = 0
+        self.received = 0
+        self.receivedAt = time.monotonic()  # the last time bytes are received
+        self.throughput: Optional[float] = None  # bytes per second of a chunk
+        self.latency = RollingHistogram(size=100)  # time to the response headers
+        self.waitTime = RollingHistogram(size=100)  # time the reads waited for a chunk
+
+    def __repr__(self) -> str:
+        return f"<HTTPStream position={self.position} size={self.size} requests={self.requests}>"
+
+    def open(self) -> bool:
+        """Request the first chunk to know the size of the stream.
+
+        :returns: Whether the server answered the range request
+        :rtype: bool"""
+
+        try:
+            self.wait(0)
+        except Exception as exc:
+            log.info(f"cannot request {self.url} in ranges: {exc!r}")
+            self.close()
+
+            return False
+
+        return True
+
+    def chunk(self, index: int) -> concurrent.futures.Future:
+        if index not in self.Chunks:
+            self.Chunks[index] = asyncio.run_coroutine_threadsafe(
+                self.fetch(index), self.loop
+            )
+            Buffers.hold(self.CHUNK)
+
+        return self.Chunks[index]
+
+    def discard(self, index: int) -> None:
+        self.Chunks.pop(index).cancel()
+        self.Watched.discard(index)
+        Buffers.hold(-self.CHUNK)
+
+    def wait(self, index: int) -> bytes:
+        """Wait for the chunk while the stream is receiving bytes.
+
+        :raises OSError: No bytes are received for ``TIMEOUT`` seconds.
+        :rtype: bytes"""
+
+        Future = self.chunk(index)
+
+        while True:
+            try:
+                return Future.result(self.TIMEOUT)
+            except concurrent.futures.TimeoutError:
+                if time.monotonic() - self.receivedAt >= self.TIMEOUT:
+                    self.discard(index)
+
+                    raise OSError(f"{self.url} stalled for {self.TIMEOUT} seconds")
+
+    def prefetch(self, index: int) -> None:
+        last = index + Config.HTTP_PREFETCH
+        if self.size is not None:
+            last = min(last, (self.size - 1) // self.CHUNK)
+
+        for Index in [Index for Index in self.Chunks if not index <= Index <= last]:
+            self.discard(Index)
+
+        for Index in range(index, last + 1):
+            self.chunk(Index)
+
+    async def fetch(self, index: int) -> bytes:
+        start = index * self.CHUNK
+        end = start + self.CHUNK - 1
+        if self.size is not None:
+            end = min(end, self.size - 1)
+
+        Data = bytearray()
+        fetchStart = time.perf_counter()
+
+        for attempt in range(self.RETRIES + 1):
+            requestStart = time.perf_counter()
+
+            try:
+                async with Sessions.get(self.address).get(
+                    yarl.URL(self.url, encoded=True),
+                    headers={"Range": f"bytes={start + len(Data)}-{end}"},
+                    timeout=aiohttp.ClientTimeout(
+                        sock_connect=self.TIMEOUT, sock_read=self.TIMEOUT
+                    ),
+                ) as resp:
+                    self.requests += 1
+                    self.latency.add(time.perf_counter() - requestStart)
+                    self.receivedAt = time.monotonic()
+
+                    if resp.status == 416:
+                        return bytes(Data)
+                    if resp.status != 206:
+                        raise ValueError(f"the server answered {resp.status}")
+
+                    Match = CONTENT_RANGE.match(resp.headers.get("Content-Range", ""))
+                    if Match and Match.group(3) != "*":
+                        self.size = int(Match.group(3))
+
+                    async for Part in resp.content.iter_any():
+                        Data += Part
+                        self.received += len(Part)
+                        self.receivedAt = time.monotonic()
+
+                if len(Data) >= end - start + 1 or self.size == start + len(Data):
+                    break
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                if attempt == self.RETRIES:
+                    raise
+
+                log.debug(f"resuming a reset range of {self.url}: {exc}")
+
+            self.retries += 1
+            await asyncio.sleep(0.1 * 2 ** attempt)
+
+        elapsed = time.perf_counter() - fetchStart
+        if Data and elapsed:
+            rate = len(Data) / elapsed
+            self.throughput = (
+                rate if self.throughput is None else self.throughput * 0.7 + rate * 0.3
+            )
+
+        return bytes(Data)
+
+    def ready(self, callback: Optional[Callable[[], None]] = None) -> bool:
+        """Whether the next read is served by the received ranges without waiting,
+        the callback is called when they are received otherwise, registered once for a chunk.
+
+        :rtype: bool"""
+
+        if self.closed or (self.size is not None and self.position >= self.size):
+            return True
+
+        first = self.position // self.CHUNK
+        last = (self.position + READ_SIZE) // self.CHUNK
+        if self.size is not None:
+            last = min(last, (self.size - 1) // self.CHUNK)
+
+        self.prefetch(first)
+
+        Pending = [
+            index for index in range(first, last + 1) if not self.chunk(index).done()
+        ]
+        if callback:
+            for index in Pending:
+                if index not in self.Watched:
+                    self.Watched.add(index)
+                    self.chunk(index).add_done_callback(lambda _: callback())
+
+        return not Pending
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        Buffer = memoryview(buffer).cast("B")
+        size = 0
+
+        while size < len(Buffer) and (self.size is None or self.position < self.size):
+            index, offset = divmod(self.position, self.CHUNK)
+            self.prefetch(index)
+
+            waitStart = time.perf_counter()
+            Chunk = self.wait(index)
+            self.waitTime.add(time.perf_counter() - waitStart)
+
+            Part = Chunk[offset : offset + len(Buffer) - size]
+            if not Part:
+                break
+
+            Buffer[size : size + len(Part)] = Part
+            size += len(Part)
+            self.position += len(Part)
+
+        return size
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == AVSEEK_SIZE:
+            return -1 if self.size is None else self.size
+        if whence == io.SEEK_END:
+            if self.size is None:
+                raise OSError("the size of the stream is unknown")
+
+            offset += self.size
+        elif whence == io.SEEK_CUR:
+            offset += self.position
+
+        self.position = max(offset, 0)
+
+        return self.position
+
+    def tell(self) -> int:
+        return self.position
+
+    def close(self) -> None:
+        for Index in list(self.Chunks):
+            self.discard(Index)
+
+        super().close()
+
+    def toDict(self) -> dict:
+        return {
+            "size": self.size,
+            "requests": self.requests,
+            "retries": self.retries,
+            "received": self.received,
+            "throughput": round(self.throughput) if self.throughput else None,
+            "latency": self.latency.toDict(),
+            "waitTime": self.waitTime.toDict(),
+        }
@@ -0,0 +1,118 @@
+import collections
+import json
+import logging
+import os
+import threading
+from typing import Optional
+
+from ..config import Config
+
+log = logging.getLogger("discodo.utils.loudness")
+
+
+class LoudnessCache:
+    """Keeps the measured loudness of the tracks by id in memory and in ``Config.LOUDNESS_CACHE`` file.
+
+    The file is loaded on the first access. The changes are saved together ``FLUSH_DELAY`` seconds after the first of them,
+    and the least recently measured tracks over ``LIMIT`` are forgotten."""
+
+    LIMIT = 100000
+    FLUSH_DELAY = 5.0
+
+    def __init__(self) -> None:
+        self._values = None
+        self._lock = threading.Lock()
+        self._saveLock = threading.Lock()
+        self.dirty = 0  # the changes not saved yet
+        self._flushing = False
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __repr__(self) -> str:
+        return f"<LoudnessCache path='{Config.LOUDNESS_CACHE}' items={len(self)} dirty={self.dirty}>"
+
+    @property
+    def values(self) -> collections.OrderedDict:
+        if self._values is None:
+            self._values = self.load()
+
+        return self._values
+
+    def load(self) -> collections.OrderedDict:
+        if not Config.LOUDNESS_CACHE or not os.path.isfile(Config.LOUDNESS_CACHE):
+            return collections.OrderedDict()
+
+        try:
+            with open(Config.LOUDNESS_CACHE, "r") as fp:
+                return collections.OrderedDict(json.load(fp))
+        except (OSError, ValueError):
+            log.warning(
+                f"cannot load the loudness cache {Config.LOUDNESS_CACHE}, ignored."
+            )
+
+            return collections.OrderedDict()
+
+    def save(self, values: dict) -> None:
+        if not Config.LOUDNESS_CACHE:
+            return
+
+        temporaryPath = f"{Config.LOUDNESS_CACHE}.tmp"
+
+        try:
+            with self._saveLock:
+                with open(temporaryPath, "w") as fp:
+                    json.dump(values, fp)
+
+                os.replace(temporaryPath, Config.LOUDNESS_CACHE)
+        except OSError:
+            log.warning(
+                f"cannot save the loudness cache {Config.LOUDNESS_CACHE}, ignored."
+            )
+
+    def flush(self) -> None:
+        """Save the changes to the file, if there are any."""
+
+        with self._lock:
+            self._flushing = False
+
+            if not self.dirty:
+                return
+
+            Values, self.dirty = dict(self.values), 0
+
+        self.save(Values)
+
+    def get(self, key: str) -> Optional[float]:
+        with self._lock:
+            return self.values.get(key)
+
+    def set(self, key: str, loudness: float, loop=None) -> None:
+        """Set the loudness of the track, the file is saved on the executor of the loop if it is given.
+
+        :param Optional[asyncio.AbstractEventLoop] loop: The event loop to save the changes on"""
+
+        with self._lock:
+            if self.values.get(key) == loudness:
+                return
+
+            self.values[key] = loudness
+            self.values.move_to_end(key)
+            while len(self.values) > self.LIMIT:
+                self.values.popitem(last=False)
+
+            self.dirty += 1
+
+            if self._flushing:
+                return
+            self._flushing = True
+
+        if not loop:
+            return self.flush()
+
+        loop.call_soon_threadsafe(
+            loop.call_later, self.FLUSH_DELAY, loop.run_in_executor, None, self.flush
+        )
+
+
+Loudness = LoudnessCache()
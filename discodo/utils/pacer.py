@@ -0,0 +1,103 @@
+import time
+
+from ..config import Config
+
+
+class Pacer:
+    """Paces ticks on absolute monotonic deadlines, so sleeping never accumulates drift.
+
+    When a tick wakes up more than one interval late, the pacer counts a stall and follows the policy:
+
+    - ``burst``: run the missed ticks back to back until the schedule is caught up,
+      the ticks missed over ``BURST`` are dropped as ``drop``.
+    - ``drop``: skip the missed ticks, the caller should drop the frames of them to stay in sync.
+    - ``stretch``: move the schedule to now, the audio plays smoothly but falls behind.
+
+    :var float interval: The seconds between the ticks, defaults to ``Config.DELAY``
+    :var str policy: The policy for late ticks, defaults to ``Config.PACING_POLICY``"""
+
+    POLICIES = ("burst", "drop", "stretch")
+    BURST = 5  # the most ticks run back to back
+
+    def __init__(self, interval: float = None, policy: str = None) -> None:
+        self.interval = interval or Config.DELAY
+        self.policy = policy or Config.PACING_POLICY
+
+        if self.policy not in self.POLICIES:
+            raise ValueError(f"`policy` must be one of {', '.join(self.POLICIES)}.")
+
+        self.stalls = 0
+        self.dropped = 0
+        self.stalled = False
+
+        self.reset()
+
+    def __repr__(self) -> str:
+        return f"<Pacer policy='{self.policy}' ticks={self.ticks} stalls={self.stalls} dropped={self.dropped}>"
+
+    def reset(self) -> None:
+        """Start a new schedule from now."""
+
+        self.start = time.perf_counter()
+        self.ticks = 0
+
+    @property
+    def deadline(self) -> float:
+        """The :py:func:`time.perf_counter` value the current tick is due.
+
+        :rtype: float"""
+
+        return self.start + self.interval * self.ticks
+
+    def wait(self) -> int:
+        """Wait for the deadline of the next tick.
+
+        :returns: The number of ticks dropped, the caller should drop the frames of them.
+        :rtype: int"""
+
+        self.ticks += 1
+
+        late = time.perf_counter() - self.deadline
+        if late <= 0:
+            self.stalled = False
+            time.sleep(-late)
+            return 0
+
+        if late < self.interval:
+            return 0
+
+        if not self.stalled:
+            self.stalls += 1
+        self.stalled = True
+
+        if self.policy == "burst":
+            missed = int(late // self.interval) - self.BURST
+            if missed <= 0:
+                return 0
+
+            self.ticks += missed
+            self.dropped += missed
+
+            return missed
+
+        if self.policy == "drop":
+            missed = int(late // self.interval)
+
+            self.ticks += missed
+            self.dropped += missed
+
+            time.sleep(max(0.0, self.deadline - time.perf_counter()))
+            return missed
+
+        if self.policy == "stretch":
+            self.start += late
+
+        return 0
+
+    def toDict(self) -> dict:
+        return {
+            "policy": self.policy,
+            "ticks": self.ticks,
+            "stalls": self.stalls,
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,285 @@
+import collections
+import concurrent.futures
+import logging
+import os
+import struct
+import threading
+from typing import Optional
+
+from ..config import Config
+from ..natives import opus
+from .streamCache import StreamCache
+
+log = logging.getLogger("discodo.utils.packetCache")
+
+MAGIC = b"DOPK"
+# magic, samples per frame and kbps of the encoded packets
+HEADER = struct.Struct("<4sHH")
+LENGTH = struct.Struct("<H")
+
+# the recorders encode and write the packets in order on this thread, not on the player
+Writer = concurrent.futures.ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="discodo-packet-writer"
+)
+
+
+class PacketReader:
+    """Reads the encoded opus packets of a file of :py:class:`PacketCache` in order.
+
+    :param str path: The path of the file"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.file = open(path, "rb")
+        self.position = 0  # the samples read
+        self.ended = False
+
+        try:
+            magic, self.samples, _ = HEADER.unpack(self.file.read(HEADER.size))
+        except struct.error:
+            magic = None
+
+        if magic != MAGIC or self.samples != Config.SAMPLES_PER_FRAME:
+            self.close()
+            raise ValueError(f"{path} is not a packet file of this frame length")
+
+    def __repr__(self) -> str:
+        return f"<PacketReader path='{self.path}' position={self.position}>"
+
+    def read(self) -> Optional[bytes]:
+        """Read the next packet, ``None`` at the end of the file.
+
+        :rtype: Optional[bytes]"""
+
+        if not self.file:
+            return None
+
+        Length = self.file.read(LENGTH.size)
+        Packet = self.file.read(LENGTH.unpack(Length)[0]) if len(Length) == 2 else b""
+
+        if not Packet:
+            self.ended = True
+            return None
+
+        self.position += self.samples
+        return Packet
+
+    def close(self) -> None:
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+class PacketRecorder:
+    """Encodes the pcm of a source to opus packets in a partial file of the cache, which is kept only when the source is played to the end.
+
+    The pcm is encoded and written by the writer thread, the recording is given up when more than ``BACKLOG`` seconds of it are waiting.
+
+    :param PacketCache Cache: The cache to store the file in
+    :param str key: The key of the packets"""
+
+    BACKLOG = 10.0
+
+    def __init__(self, Cache: "PacketCache", key: str) -> None:
+        self.Cache = Cache
+        self.key = key
+        self.path = Cache.partialPath(key)
+        self.size = 0
+        self.position = 0  # the samples encoded
+
+        self.encoder = opus.Encoder()
+        self.file = None
+        self._pending = bytearray()
+        self._scheduled = self._closed = False
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<PacketRecorder key='{self.key}' size={self.size}>"
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def write(self, Data: memoryview) -> None:
+        """Queue the pcm to the writer thread."""
+
+        with self._lock:
+            if self._closed:
+                return
+
+            self._pending += Data
+
+            overflowed = (
+                len(self._pending)
+                > self.BACKLOG * Config.SAMPLING_RATE * Config.SAMPLE_SIZE
+            )
+            schedule = not self._scheduled and not overflowed
+            self._scheduled = self._scheduled or schedule
+
+        if overflowed:
+            log.warning(
+                f"the packet cache of {self.key} is written too slowly, given up."
+            )
+            return self.close(complete=False)
+
+        if schedule:
+            Writer.submit(self.flush)
+
+    def flush(self) -> None:
+        """Encode the frames of the queued pcm, called by the writer thread."""
+
+        frameSize = Config.SAMPLES_PER_FRAME * Config.SAMPLE_SIZE
+
+        with self._lock:
+            self._scheduled = False
+
+            size = len(self._pending) - len(self._pending) % frameSize
+            Pcm = bytes(self._pending[:size])
+            del self._pending[:size]
+
+        try:
+            for index in range(0, size, frameSize):
+                self.encodeFrame(Pcm[index : index + frameSize])
+        except OSError as exc:
+            log.warning(f"cannot write the packet cache of {self.key}: {exc}")
+            return self.close(complete=False)
+
+        if self.size > self.Cache.limit:
+            self.close(complete=False)
+
+    def encodeFrame(self, Pcm: bytes) -> None:
+        if not self.file:
+            self.file = open(self.path, "wb")
+            self.file.write(
+                HEADER.pack(MAGIC, Config.SAMPLES_PER_FRAME, Config.BITRATE)
+            )
+
+        Packet = self.encoder.encode(Pcm)
+
+        self.file.write(LENGTH.pack(len(Packet)) + Packet)
+        self.size += LENGTH.size + len(Packet)
+        self.position += Config.SAMPLES_PER_FRAME
+
+    def close(self, complete: bool = True, duration: Optional[float] = None) -> None:
+        """Stop the recording, which is kept when it is complete and reaches the last second of the duration."""
+
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+
+            if not complete:
+                self._pending.clear()
+
+        Writer.submit(self.finish, complete, duration)
+
+    def finish(self, complete: bool, duration: Optional[float] = None) -> None:
+        """Encode the rest of the pcm and store the file, called by the writer thread after the queued frames."""
+
+        frameSize = Config.SAMPLES_PER_FRAME * Config.SAMPLE_SIZE
+
+        with self._lock:
+            Pcm = bytes(self._pending)
+            self._pending.clear()
+
+        try:
+            if complete:
+                for index in range(0, len(Pcm), frameSize):
+                    self.encodeFrame(
+                        Pcm[index : index + frameSize].ljust(frameSize, b"\x00")
+                    )
+            if self.file:
+                self.file.close()
+        except OSError:
+            complete = False
+
+        if duration is not None and self.position / Config.SAMPLING_RATE < duration - 1:
+            complete = False
+
+        self.Cache.store(self, complete and self.file is not None)
+
+
+class PacketCache(StreamCache):
+    """Keeps the opus packets of the tracks played often in ``Config.PACKET_CACHE`` directory, limited to ``Config.PACKET_CACHE_SIZE`` megabytes.
+
+    A track is encoded while it is played for the ``Config.PACKET_CACHE_PLAYS``-th time,
+    and the packets are sent as they are when it is played again without filter or volume,
+    so the track is neither downloaded, decoded nor encoded."""
+
+    EXTENSION = ".opk"
+    PLAYS = 100000  # the tracks to count the plays of, the least recently played are forgotten
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.plays = collections.OrderedDict()
+
+    @property
+    def directory(self) -> Optional[str]:
+        return Config.PACKET_CACHE
+
+    @property
+    def limit(self) -> int:
+        return Config.PACKET_CACHE_SIZE * 1024 * 1024
+
+    @staticmethod
+    def keyOf(key: str) -> str:
+        return (
+            f"{key}:{Config.BITRATE}:{Config.FRAME_LENGTH}:{Config.EXPECTED_PACKETLOSS}"
+        )
+
+    def play(self, key: str) -> int:
+        """Count a play of the track.
+
+        :returns: The times the track is played.
+        :rtype: int"""
+
+        if not self.enabled:
+            return 0
+
+        with self._lock:
+            plays = self.plays[key] = self.plays.pop(key, 0) + 1
+
+            while len(self.plays) > self.PLAYS:
+                self.plays.popitem(last=False)
+
+            return plays
+
+    def open(self, key: str) -> Optional[PacketReader]:
+        """Open the packets of the track, ``None`` when they are not cached.
+
+        :rtype: Optional[PacketReader]"""
+
+        path = self.get(self.keyOf(key))
+        if not path:
+            return None
+
+        try:
+            return PacketReader(path)
+        except (OSError, ValueError) as exc:
+            log.warning(f"cannot read the packet cache of {key}: {exc}")
+
+            return None
+
+    def record(self, key: str) -> Optional[PacketRecorder]:
+        """Start to encode the track when it is played enough, ``None`` when it is not.
+
+        :rtype: Optional[PacketRecorder]"""
+
+        if not self.enabled or self.plays.get(key, 0) < Config.PACKET_CACHE_PLAYS:
+            return None
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+
+            return PacketRecorder(self, self.keyOf(key))
+        except (OSError, ValueError) as exc:
+            log.warning(f"cannot create the packet cache of {key}: {exc}")
+
+            return None
+
+    def toDict(self) -> dict:
+        return {**super().toDict(), "tracks": len(self.plays)}
+
+
+Encoded = PacketCache()
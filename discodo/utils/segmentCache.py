@@ -0,0 +1,115 @@
+import collections
+import threading
+from typing import Optional, Tuple
+
+from ..config import Config
+
+
+class SegmentCache:
+    """Keeps the decoded pcm of the tracks in segments of ``LENGTH`` seconds, shared by the sources playing the same track.
+
+    The sources playing a track hold a reference to it, and when the segments are over ``Config.SEGMENT_CACHE`` megabytes,
+    the least recently used segments of the tracks no source is playing are evicted first."""
+
+    LENGTH = 5.0
+
+    def __init__(self) -> None:
+        self.Segments = collections.OrderedDict()
+        self.references = collections.Counter()
+        self.size = 0
+
+        self.hits = self.misses = self.evicted = 0
+
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.Segments)
+
+    def __repr__(self) -> str:
+        return f"<SegmentCache segments={len(self)} size={self.size} hitRate={self.hitRate}>"
+
+    @property
+    def enabled(self) -> bool:
+        return Config.SEGMENT_CACHE > 0
+
+    @property
+    def samples(self) -> int:
+        return int(self.LENGTH * Config.SAMPLING_RATE)
+
+    @property
+    def hitRate(self) -> Optional[float]:
+        lookups = self.hits + self.misses
+
+        return round(self.hits / lookups, 3) if lookups else None
+
+    def acquire(self, key: str) -> None:
+        with self._lock:
+            self.references[key] += 1
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self.references[key] -= 1
+
+            if self.references[key] <= 0:
+                del self.references[key]
+
+    def get(self, key: str, index: int) -> Optional[Tuple[bytes, bool, int]]:
+        """Get the pcm of the segment, whether it is the last one of the track
+        and the position minus the timestamp of the decoded audio.
+
+        :rtype: Optional[Tuple[bytes, bool, int]]"""
+
+        with self._lock:
+            Segment = self.Segments.get((key, index))
+
+            if Segment is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.Segments.move_to_end((key, index))
+
+            return Segment
+
+    def put(
+        self, key: str, index: int, Data: bytes, offset: int, final: bool = False
+    ) -> None:
+        if not self.enabled:
+            return
+
+        with self._lock:
+            Previous = self.Segments.pop((key, index), None)
+            if Previous:
+                self.size -= len(Previous[0])
+
+            self.Segments[(key, index)] = (Data, final, offset)
+            self.size += len(Data)
+
+            self.evict()
+
+    def evict(self) -> None:
+        limit = Config.SEGMENT_CACHE * 1024 * 1024
+
+        while self.size > limit and self.Segments:
+            Key = next(
+                (Key for Key in self.Segments if Key[0] not in self.references),
+                next(iter(self.Segments)),
+            )
+
+            Data, *_ = self.Segments.pop(Key)
+            self.size -= len(Data)
+            self.evicted += 1
+
+    def toDict(self) -> dict:
+        return {
+            "segments": len(self),
+            "playing": len(self.references),
+            "size": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": self.hitRate,
+            "evicted": self.evicted,
+        }
+
+
+Segments = SegmentCache()
@@ -0,0 +1,232 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Optional
+
+import av
+
+from ..config import Config
+
+log = logging.getLogger("discodo.utils.streamCache")
+
+
+class StreamRecorder:
+    """Copies the demuxed packets of a stream to a partial file of the cache, which is kept only when the stream is complete.
+
+    :param StreamCache Cache: The cache to store the file in
+    :param str key: The key of the stream
+    :param av.audio.stream.AudioStream Stream: The demuxed stream"""
+
+    def __init__(self, Cache: "StreamCache", key: str, Stream) -> None:
+        self.Cache = Cache
+        self.key = key
+        self.path = Cache.partialPath(key)
+        self.size = 0
+        self.position = 0.0  # the end of the written packets in seconds
+
+        self.Container = av.open(self.path, "w", format="matroska")
+        self.Stream = self.Container.add_stream(template=Stream)
+
+    def __repr__(self) -> str:
+        return f"<StreamRecorder key='{self.key}' size={self.size}>"
+
+    @property
+    def closed(self) -> bool:
+        return self.Container is None
+
+    def write(self, Packet: av.Packet) -> None:
+        if self.closed or Packet.dts is None:
+            return
+
+        # muxing takes the data of the packet, so a copy is muxed to decode the packet after
+        Copied = av.Packet(bytes(Packet))
+        Copied.pts, Copied.dts = Packet.pts, Packet.dts
+        Copied.duration = Packet.duration
+        Copied.time_base = Packet.time_base
+        Copied.stream = self.Stream
+
+        self.size += Packet.size
+        if Packet.pts is not None:
+            self.position = float(
+                (Packet.pts + (Packet.duration or 0)) * Packet.time_base
+            )
+
+        try:
+            self.Container.mux(Copied)
+        except (av.AVError, OSError) as exc:
+            log.warning(f"cannot write the stream cache of {self.key}: {exc}")
+
+            return self.close(complete=False)
+
+        if self.size > self.Cache.limit:
+            self.close(complete=False)
+
+    def close(self, complete: bool = True) -> None:
+        if self.closed:
+            return
+
+        Container, self.Container = self.Container, None
+
+        try:
+            Container.close()
+        except (av.AVError, OSError):
+            complete = False
+
+        self.Cache.store(self, complete)
+
+
+class StreamCache:
+    """Keeps the audio streams played before in ``Config.STREAM_CACHE`` directory, limited to ``Config.STREAM_CACHE_SIZE`` megabytes.
+
+    The streams are stored while they are played, and the least recently used ones are evicted over the limit.
+    A stream is written to a partial file first, which is renamed when the stream is loaded to the end,
+    so a stopped or seeked stream is never served."""
+
+    EXTENSION = ".mka"
+    PARTIAL = ".part"
+
+    # the partial files not written for this seconds are left by a stopped node
+    STALE = 3600.0
+
+    def __init__(self) -> None:
+        self.hits = self.misses = 0
+        self.stored = self.aborted = self.evicted = 0
+
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} path='{self.directory}' hits={self.hits} misses={self.misses}>"
+
+    @property
+    def directory(self) -> Optional[str]:
+        return Config.STREAM_CACHE
+
+    @property
+    def limit(self) -> int:
+        return Config.STREAM_CACHE_SIZE * 1024 * 1024
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory) and self.limit > 0
+
+    def pathOf(self, key: str) -> str:
+        return os.path.join(
+            self.directory,
+            hashlib.sha1(key.encode()).hexdigest() + self.EXTENSION,
+        )
+
+    def partialPath(self, key: str) -> str:
+        return f"{self.pathOf(key)}.{uuid.uuid4().hex[:8]}{self.PARTIAL}"
+
+    def get(self, key: str) -> Optional[str]:
+        """Get the path of the cached stream, marking it as recently used.
+
+        :rtype: Optional[str]"""
+
+        if not self.enabled:
+            return None
+
+        path = self.pathOf(key)
+
+        try:
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return path
+
+    def record(self, key: str, Stream) -> Optional[StreamRecorder]:
+        """Start to store the stream, ``None`` when the cache is disabled or the file cannot be created.
+
+        :rtype: Optional[StreamRecorder]"""
+
+        if not self.enabled:
+            return None
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+
+            return StreamRecorder(self, key, Stream)
+        except (av.AVError, OSError, ValueError) as exc:
+            log.warning(f"cannot create the stream cache of {key}: {exc}")
+
+            return None
+
+    def store(self, Recorder: StreamRecorder, complete: bool) -> None:
+        if not complete:
+            self.aborted += 1
+
+            try:
+                os.remove(Recorder.path)
+            except OSError:
+                pass
+
+            return
+
+        try:
+            os.replace(Recorder.path, self.pathOf(Recorder.key))
+        except OSError as exc:
+            log.warning(f"cannot store the stream cache of {Recorder.key}: {exc}")
+            self.aborted += 1
+
+            return
+
+        self.stored += 1
+        self.evict()
+
+    def files(self) -> list:
+        try:
+            with os.scandir(self.directory) as Entries:
+                return [
+                    (Entry.path, Entry.stat())
+                    for Entry in Entries
+                    if Entry.is_file()
+                    and Entry.name.endswith((self.EXTENSION, self.PARTIAL))
+                ]
+        except OSError:
+            return []
+
+    def evict(self) -> None:
+        """Remove the least recently used streams until the cache is under the limit."""
+
+        with self._lock:
+            Files = self.files()
+            size = sum(Stat.st_size for _, Stat in Files)
+
+            for path, Stat in sorted(Files, key=lambda File: File[1].st_mtime):
+                partial = path.endswith(self.PARTIAL)
+
+                if partial and time.time() - Stat.st_mtime < self.STALE:
+                    continue
+                if not partial and size <= self.limit:
+                    continue
+
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+
+                size -= Stat.st_size
+                if not partial:
+                    self.evicted += 1
+
+    def toDict(self) -> dict:
+        Files = self.files() if self.enabled else []
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stored": self.stored,
+            "aborted": self.aborted,
+            "evicted": self.evicted,
+            "files": sum(1 for path, _ in Files if path.endswith(self.EXTENSION)),
+            "size": sum(Stat.st_size for _, Stat in Files),
+        }
+
+
+Streams = StreamCache()
@@ -0,0 +1,136 @@
+import collections
+import time
+from typing import Optional
+
+from ..config import Config
+
+
+class RollingHistogram:
+    """Keeps the latest values and summarizes them. the unit is milli seconds.
+
+    :var int size: The number of values to keep"""
+
+    BUCKETS = (1, 2, 5, 10, 20, 40, 60, 100, 200)
+
+    def __init__(self, size: int = 1000) -> None:
+        self.values = collections.deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def add(self, seconds: float) -> None:
+        self.values.append(seconds * 1000)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        if not self.values:
+            return None
+
+        values = sorted(self.values)
+
+        return round(values[min(int(len(values) * percent / 100), len(values) - 1)], 3)
+
+    def toDict(self) -> dict:
+        values = list(self.values)
+
+        buckets = collections.OrderedDict((f"<={bucket}", 0) for bucket in self.BUCKETS)
+        buckets[f">{self.BUCKETS[-1]}"] = 0
+
+        for value in values:
+            for bucket in self.BUCKETS:
+                if value <= bucket:
+                    buckets[f"<={bucket}"] += 1
+                    break
+            else:
+                buckets[f">{self.BUCKETS[-1]}"] += 1
+
+        return {
+            "count": len(values),
+            "average": round(sum(values) / len(values), 3) if values else None,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": round(max(values), 3) if values else None,
+            "buckets": buckets,
+        }
+
+
+class PlayerTelemetry:
+    """Represents the pacing statistics of a player.
+
+    :var RollingHistogram lateness: How late each tick started after its deadline
+    :var RollingHistogram readTime: The time spent to read and mix pcm or opus packets
+    :var RollingHistogram encodeTime: The time spent to encode pcm to opus
+    :var RollingHistogram sendTime: The time spent to encrypt and send the packets
+    :var RollingHistogram transitionGap: The silence between the end of a source and the start of the next one
+    :var RollingHistogram starvation: How long the sources were starved until they recovered
+    :var RollingHistogram controlLatency: The time from a filter change until the audio filtered by it was read
+    :var int frames: The number of frames sent
+    :var int lateFrames: The number of frames sent later than ``PLAYER_LAG_THRESHOLD``
+    :var int suppressedFrames: The number of silent frames not sent after the opus silence frames
+    :var int droppedFrames: The number of frames not sent while playing, by starvation or ``drop`` pacing policy
+    :var int stalls: The number of times the pacing loop woke up more than a frame late
+    :var int underruns: The number of times the source was starved while playing"""
+
+    CHECK_INTERVAL = 50
+
+    def __init__(self) -> None:
+        self.lateness = RollingHistogram()
+        self.readTime = RollingHistogram()
+        self.encodeTime = RollingHistogram()
+        self.sendTime = RollingHistogram()
+        self.transitionGap = RollingHistogram(size=100)
+        self.starvation = RollingHistogram(size=100)
+        self.controlLatency = RollingHistogram(size=100)
+
+        self.frames = 0
+        self.lateFrames = 0
+        self.suppressedFrames = 0
+        self.droppedFrames = 0
+        self.stalls = 0
+        self.underruns = 0
+
+        self.lagging = False
+        self._ticks = 0
+
+    def tick(self, deadline: float) -> Optional[bool]:
+        """Record the lateness of the tick.
+
+        :param float deadline: The :py:func:`time.perf_counter` value the tick was due
+
+        :returns: ``True`` if the player has just started to lag, ``False`` if it has just recovered
+        :rtype: Optional[bool]"""
+
+        lateness = max(time.perf_counter() - deadline, 0.0)
+
+        self.lateness.add(lateness)
+        if lateness * 1000 > Config.PLAYER_LAG_THRESHOLD:
+            self.lateFrames += 1
+
+        self._ticks += 1
+        if self._ticks % self.CHECK_INTERVAL:
+            return None
+
+        lagging = self.lateness.percentile(95) > Config.PLAYER_LAG_THRESHOLD
+        if lagging == self.lagging:
+            return None
+
+        self.lagging = lagging
+        return lagging
+
+    def toDict(self) -> dict:
+        return {
+            "lagging": self.lagging,
+            "frames": self.frames,
+            "lateFrames": self.lateFrames,
+            "suppressedFrames": self.suppressedFrames,
+            "droppedFrames": self.droppedFrames,
+            "stalls": self.stalls,
+            "underruns": self.underruns,
+            "lateness": self.lateness.toDict(),
+            "readTime": self.readTime.toDict(),
+            "encodeTime": self.encodeTime.toDict(),
+            "sendTime": self.sendTime.toDict(),
+            "transitionGap": self.transitionGap.toDict(),
+            "starvation": self.starvation.toDict(),
+            "controlLatency": self.controlLatency.toDict(),
+        }
@@ -11,3 +11,18 @@ class withLock:
 
     def __exit__(self, *_):
         self.Lock.release()
+
+
+class CallbackEvent(threading.Event):
+    """An event which calls ``callback`` whenever it is set."""
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.callback = None
+
+    def set(self) -> None:
+        super().set()
+
+        if self.callback:
+            self.callback()
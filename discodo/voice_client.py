@@ -34,10 +34,12 @@ class DiscordVoiceClient(VoiceConnector):
         self.player = None
         self.paused = False
 
-        self.filter = {}
+        self._filter = {}
         self.autoplay = Config.DEFAULT_AUTOPLAY
         self._volume = Config.DEFAULT_VOLUME
         self._crossfade = Config.DEFAULT_CROSSFADE
+        self.gapless = Config.DEFAULT_GAPLESS
+        self.normalize = Config.DEFAULT_NORMALIZE
 
     def __del__(self):
         guild_id = self.guild_id if self.guild_id else None
@@ -121,6 +123,17 @@ class DiscordVoiceClient(VoiceConnector):
     def volume(self, value: float):
         self._volume = round(max(value, 0.0), 2)
 
+    @property
+    def filter(self) -> dict:
+        return self._filter
+
+    @filter.setter
+    def filter(self, value: dict):
+        self._filter = value
+
+        if self.player:
+            self.player.flush(rewind=True)
+
     @property
     def crossfade(self) -> float:
         return self._crossfade
@@ -185,6 +198,7 @@ class DiscordVoiceClient(VoiceConnector):
             del self.Queue[0 : (offset - 1)]
 
         self.player.current.skip()
+        self.player.flush()
 
     def pause(self):
         self.paused = True
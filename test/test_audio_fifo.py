@@ -0,0 +1,45 @@
+from discodo.natives.AudioFifo import AudioFifo
+
+
+def testWrapAndGrow() -> None:
+    Fifo = AudioFifo(capacity=400)
+
+    Fifo.write(bytes(range(200)))
+    assert Fifo.samples == 50
+    assert bytes(Fifo.read(30)) == bytes(range(120))
+    assert bytes(Fifo.read(5)) == bytes(range(120, 140))
+
+    Fifo.write(bytes(range(240)))
+    assert Fifo.capacity == 400
+    assert bytes(Fifo.read(75)) == bytes(range(140, 200)) + bytes(range(240))
+
+    Fifo.write(bytes(range(200)))
+    Fifo.write(bytes(range(240)))
+    assert Fifo.capacity == 800
+    assert bytes(Fifo.read(110)) == bytes(range(200)) + bytes(range(240))
+
+    Fifo.write(bytes(8))
+    assert Fifo.read(10) is None
+    assert bytes(Fifo.read(10, partial=True)) == bytes(8)
+    assert Fifo.read(0) is None
+
+
+def testSetLimit() -> None:
+    Fifo = AudioFifo(limit=5)
+    Fifo.write(bytes(range(200)) * 2)
+
+    Fifo.setLimit(1)
+    assert Fifo.capacity == AudioFifo.capacityOf(1)
+    assert bytes(Fifo.read(100)) == bytes(range(200)) * 2
+    assert Fifo.haveToFillBuffer.is_set()
+
+
+def testSkip() -> None:
+    Fifo = AudioFifo(capacity=400)
+    Fifo.write(bytes(range(200)))
+
+    Data = Fifo.read(10)
+    assert Fifo.skip(20) == 20
+    assert bytes(Data) == bytes(range(40))
+    assert bytes(Fifo.read(20)) == bytes(range(120, 200))
+    assert Fifo.skip(10) == 0
@@ -0,0 +1,97 @@
+from discodo.config import Config
+from discodo.utils.buffer import AdaptiveBuffer, Buffers
+
+
+def testAdapt() -> None:
+    Buffer = AdaptiveBuffer()
+    assert Buffer.target == Config.BUFFERLIMIT
+
+    Buffer.underrun()
+    assert Buffer.target == Config.BUFFERLIMIT * 2
+
+    Buffer.measure(1.0, 1.0)
+    assert Buffer.target == Config.BUFFERLIMIT * 3
+
+    Buffer.measure(5.0, 1.0)
+    assert Buffer.target == Config.BUFFERLIMIT * 3
+
+    for _ in range(100):
+        Buffer.measure(100.0, 1.0)
+    assert Buffer.target == Config.BUFFERLIMIT * 3
+
+    Buffer._underrunAt = None
+    for _ in range(100):
+        Buffer.measure(100.0, 1.0)
+    assert Buffer.target == Config.MIN_BUFFERLIMIT
+
+    Buffer.close()
+
+    assert AdaptiveBuffer(local=True).limit == Config.MIN_BUFFERLIMIT
+
+
+def testDecay() -> None:
+    Buffer = AdaptiveBuffer()
+
+    for _ in range(5):
+        Buffer.underrun()
+    assert Buffer.target == Config.MAX_BUFFERLIMIT
+
+    # loaded fast enough to keep up, but not to shrink toward the floor
+    for _ in range(100):
+        Buffer.measure(4.0, 1.0)
+    assert Buffer.target == Config.MAX_BUFFERLIMIT
+
+    Buffer._grownAt -= Buffer.STABLE + 1
+    for _ in range(100):
+        Buffer.measure(4.0, 1.0)
+    assert Buffer.target == Config.BUFFERLIMIT
+
+    Buffer.close()
+
+
+def testLive() -> None:
+    Buffer = AdaptiveBuffer(live=True)
+    assert Buffer.target == Config.BUFFERLIMIT
+
+    # a live stream is loaded in realtime, which is not a reason to grow
+    for _ in range(10):
+        Buffer.measure(1.0, 1.0)
+    assert Buffer.target == Config.BUFFERLIMIT
+
+    for _ in range(5):
+        Buffer.underrun()
+    assert Buffer.target == Config.MAX_LIVE_BUFFERLIMIT < Config.MAX_BUFFERLIMIT
+
+    Buffer._grownAt -= Buffer.STABLE + 1
+    for _ in range(100):
+        Buffer.measure(1.0, 1.0)
+    assert Buffer.target == Config.BUFFERLIMIT
+
+    Buffer.close()
+
+
+def testBudget() -> None:
+    Memory, Config.BUFFER_MEMORY = Config.BUFFER_MEMORY, None
+    total = Buffers.total
+
+    try:
+        Sources = [AdaptiveBuffer() for _ in range(4)]
+        assert Buffers.total == total + Config.BUFFERLIMIT * 4
+        assert Sources[0].limit == Config.BUFFERLIMIT
+
+        Config.BUFFER_MEMORY = int(
+            (Buffers.total / 2) * Buffers.bytesPerSecond / 1024 / 1024
+        )
+        assert Sources[0].limit < Config.BUFFERLIMIT * 0.6
+
+        # the bytes held besides the buffers are taken from the ceiling
+        Limit = Sources[0].limit
+        Buffers.hold(Config.BUFFER_MEMORY * 1024 * 1024 // 2)
+        assert Sources[0].limit < Limit
+        Buffers.hold(-(Config.BUFFER_MEMORY * 1024 * 1024 // 2))
+
+        for Source in Sources:
+            Source.close()
+        assert Buffers.total == total
+    finally:
+        Config.BUFFER_MEMORY = Memory
@@ -0,0 +1,78 @@
+import fractions
+
+import av
+import pytest
+
+from discodo.config import Config
+from discodo.source.PyAVSource import Loader, PyAVSource
+
+PACKET_SAMPLES = 960
+
+
+def makeSource(packets: int) -> PyAVSource:
+    Source = PyAVSource("compressed.opus")
+    Source.BufferLoader = Loader(Source)
+
+    def decodePacket(Packet: av.Packet) -> None:
+        # the decoder writes the silence of the packet, unless it is before a seek
+        if not Source.BufferLoader.skipped(float(Packet.pts * Packet.time_base)):
+            Source.AudioFifo.write(bytes(Packet.duration * Config.SAMPLE_SIZE))
+
+    Source.BufferLoader.decodePacket = decodePacket
+
+    for index in range(packets):
+        Packet = av.Packet(b"\x00")
+        Packet.pts = index * PACKET_SAMPLES
+        Packet.duration = PACKET_SAMPLES
+        Packet.time_base = fractions.Fraction(1, Config.SAMPLING_RATE)
+
+        Source.BufferLoader.queuePacket(Packet)
+
+    while Source.BufferLoader.decodeQueued():
+        pass
+
+    return Source
+
+
+@pytest.fixture
+def compressed():
+    Compressed = Config.COMPRESSED_BUFFER
+    Config.COMPRESSED_BUFFER = True
+
+    yield
+
+    Config.COMPRESSED_BUFFER = Compressed
+
+
+@pytest.mark.asyncio
+async def testDrain(compressed) -> None:
+    Source = makeSource(50)
+
+    assert Source._position == 1.0
+    assert Source.position == 0.0
+    assert Source.AudioFifo.samples == Config.PCM_WINDOW * Config.SAMPLES_PER_FRAME
+
+    Source.BufferLoader.exhausted = True
+    while Source.BufferLoader.decodeQueued():
+        if not Source.AudioFifo.haveToFillBuffer.is_set():
+            Source.AudioFifo.read()
+
+    assert not Source.PacketFifo.samples
+
+    while Source.AudioFifo.read(partial=True):
+        pass
+
+    assert Source.position == 1.0
+
+
+@pytest.mark.asyncio
+async def testSeekBuffered(compressed) -> None:
+    Source = makeSource(50)
+
+    assert Source.seekBuffered(0.5)
+
+    while Source.BufferLoader.decodeQueued():
+        pass
+
+    assert Source.AudioFifo.samples == Config.PCM_WINDOW * Config.SAMPLES_PER_FRAME
+    assert Source.position == 0.5
@@ -0,0 +1,102 @@
+import threading
+import time
+
+from discodo.decoder import DecoderPool
+from discodo.utils import RollingHistogram
+
+
+class FakeJob:
+    def __init__(self, steps: int) -> None:
+        self.steps = steps
+        self.full = False
+        self.done = threading.Event()
+
+        self.state = None
+        self.woken = False
+        self.blocking = False
+        self.threads = []
+        self.starving = False
+        self.decodeTime = RollingHistogram()
+
+    def needFill(self) -> bool:
+        return not self.full
+
+    def step(self) -> bool:
+        self.threads.append(threading.current_thread().name)
+
+        self.steps -= 1
+        if self.steps % 10 == 0:
+            self.full = True
+
+        return self.steps > 0
+
+    def finish(self) -> None:
+        self.done.set()
+
+    def toDict(self) -> dict:
+        return {"state": self.state}
+
+
+def waitForParking(Pool: DecoderPool, Jobs: list, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+
+    while Pool.queue or any(
+        Job.state in ("queued", "running", "blocking") for Job in Jobs
+    ):
+        assert time.monotonic() < deadline, "the jobs are not parked"
+        time.sleep(0.001)
+
+
+def testParkAndWake() -> None:
+    Pool = DecoderPool()
+    Jobs = [FakeJob(30) for _ in range(4)]
+
+    for Job in Jobs:
+        Pool.submit(Job)
+    waitForParking(Pool, Jobs)
+
+    assert all(Job.state == "parked" and Job.steps == 20 for Job in Jobs)
+
+    for _ in range(2):
+        for Job in Jobs:
+            Job.full = False
+            Pool.wake(Job)
+        waitForParking(Pool, Jobs)
+
+    assert all(Job.done.is_set() and Job.state == "done" for Job in Jobs)
+    assert not Pool.jobs
+
+
+def testBlockingJob() -> None:
+    Pool = DecoderPool()
+
+    Job = FakeJob(40)
+    Job.blocking = True
+    Pool.submit(Job)
+    waitForParking(Pool, [Job])
+
+    # the job waiting on the network does not take a thread of the pool
+    assert Job.state == "parked" and Job.steps == 30
+    assert set(Job.threads) == {"discodo-decoder-blocking"}
+
+    # the same thread is woken for every refill
+    Job.full = False
+    Pool.wake(Job)
+    waitForParking(Pool, [Job])
+
+    assert Job.state == "parked" and Job.steps == 20
+    assert len(Pool.blocking) == 1 and Pool.toDict()["blockingThreads"] == 1
+    assert (
+        sum(
+            Thread.name == "discodo-decoder-blocking"
+            for Thread in threading.enumerate()
+        )
+        == 1
+    )
+
+    Job.blocking = Job.full = False
+    Pool.wake(Job)
+    waitForParking(Pool, [Job])
+
+    assert Job.steps == 10 and not Pool.blocking
+    assert "discodo-decoder-blocking" not in Job.threads[20:]
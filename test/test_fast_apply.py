@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from discodo.config import Config
+from discodo.source.PyAVSource import Loader, PyAVSource
+
+
+@pytest.mark.asyncio
+async def testFilterChanges() -> None:
+    FastApply = Config.FAST_APPLY
+    Config.FAST_APPLY = True
+
+    Source = PyAVSource("fast_apply.opus")
+    Source.BufferLoader = Loader(Source)
+
+    Seeks = []
+    Source._seek = lambda offset, **kwargs: Seeks.append(offset)
+
+    try:
+        Source.AudioFifo.write(bytes(Config.SAMPLING_RATE * Config.SAMPLE_SIZE))
+        Source._position = 2.0
+
+        # a frame is encoded by the player, which is discarded on the change
+        Source.AudioFifo.read()
+        Source.played = True
+        Source._discarded = Config.SAMPLES_PER_FRAME
+
+        Source.filter = {"volume": "0.5"}
+        assert Source.position == 1.0
+        assert not Source.AudioFifo.samples and not Source.played
+
+        # changed again before the loader has decoded anything
+        Source.filter = {"volume": "0.25"}
+        assert Source.position == 1.0
+
+        await asyncio.sleep(0.1)
+
+        assert Seeks == [1.0]
+    finally:
+        Config.FAST_APPLY = FastApply
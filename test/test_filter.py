@@ -0,0 +1,95 @@
+import av
+import numpy
+import pytest
+
+from discodo.natives.AudioFilter import AudioFilter
+
+
+def testGraphCache(tmp_path) -> None:
+    path = str(tmp_path / "sine.wav")
+
+    Container = av.open(path, "w")
+    Stream = Container.add_stream("pcm_s16le", rate=48000)
+    Stream.layout = "stereo"
+    Samples = (numpy.sin(numpy.arange(48000) / 10) * 16384).astype(numpy.int16)
+    Frame = av.AudioFrame.from_ndarray(
+        numpy.repeat(Samples, 2).reshape(1, -1), format="s16", layout="stereo"
+    )
+    Frame.sample_rate = 48000
+    Container.mux(Stream.encode(Frame))
+    Container.mux(Stream.encode(None))
+    Container.close()
+
+    Container = av.open(path)
+    Filter = AudioFilter()
+    Filter.selectAudioStream = Container.streams.audio[0]
+
+    Filter.setFilters({"volume": "0.5"})
+    Graph = Filter.Graph
+
+    Filter.setFilters({"volume": "0.25"})
+    Filter.setFilters({"volume": "0.5"})
+    assert Filter.Graph is Graph
+
+    Filter.setFilters({"aecho": "0.8:0.9:40:0.3"})
+    assert Filter.Graph is not Graph
+    Echo = Filter.Graph
+
+    # the echo of the previous frames is not played again
+    Filter.setFilters({"aecho": "0.8:0.9:40:0.3"})
+    assert Filter.Graph is not Echo
+
+    Filter.setFilters({"volume": "0.5"})
+    assert Filter.Graph is Graph
+
+    for Frame in Container.decode(audio=0):
+        Filter.push(Frame)
+        Filtered = Filter.pull()
+        if Filtered:
+            # the volume filter converts the samples to float
+            assert abs(numpy.abs(Filtered.to_ndarray()).max() - 0.25) < 0.01
+            break
+
+    Container.close()
+
+
+class FakeContext:
+    def __init__(self, rejects: bool = False) -> None:
+        self.rejects = rejects
+        self.commands = []
+
+    def process_command(self, key: str, value: str) -> None:
+        if self.rejects:
+            raise ValueError("the option does not support commands")
+
+        self.commands.append((key, value))
+
+
+@pytest.mark.parametrize("rejects", [False, True])
+def testCommands(rejects: bool) -> None:
+    Filter = AudioFilter()
+    Filter.configured = True
+    Filter.Graph = Graph = object()
+
+    # the graph of a pyav which sends runtime commands
+    Filter._Filters = {"equalizer": "f=100:g=2", "atempo": "1.25", "abuffersink": None}
+    Filter._FilterChains = [
+        FakeContext(),
+        FakeContext(rejects),
+        FakeContext(),
+        FakeContext(),
+    ]
+
+    Filters = {"equalizer": "f=100:g=4", "atempo": "1.5", "abuffersink": None}
+    assert Filter.update(Filters) is not rejects
+
+    if rejects:
+        assert Filter._Filters != Filters
+        return
+
+    assert Filter.Graph is Graph and Filter._Filters == Filters
+    assert Filter._FilterChains[1].commands == [("g", "4")]
+    assert Filter._FilterChains[2].commands == [("tempo", "1.5")]
+
+    # the chain is changed, which needs a new graph
+    assert not Filter.update({"atempo": "1.5", "abuffersink": None})
@@ -0,0 +1,37 @@
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from discodo.utils.http import SessionPool
+
+
+@pytest.mark.asyncio
+async def testProbe() -> None:
+    Ranges = []
+
+    async def stream(request):
+        Ranges.append(request.headers.get("Range"))
+
+        return web.Response(status=206, body=b"\x00")
+
+    async def forbidden(request):
+        return web.Response(status=403)
+
+    App = web.Application()
+    App.router.add_get("/stream", stream)
+    App.router.add_get("/forbidden", forbidden)
+
+    Pool = SessionPool()
+
+    async with TestServer(App) as Server:
+        assert [
+            await Pool.probe(str(Server.make_url("/stream"))) for _ in range(3)
+        ] == [206] * 3
+        assert Ranges == ["bytes=0-0"]
+
+        assert [
+            await Pool.probe(str(Server.make_url("/forbidden"))) for _ in range(2)
+        ] == [403] * 2
+        assert Pool.toDict()["probes"] == 3 and Pool.toDict()["probeHits"] == 2
+
+    await Pool.close()
@@ -0,0 +1,100 @@
+import asyncio
+import io
+import os
+import time
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from discodo.config import Config
+from discodo.utils.buffer import Buffers
+from discodo.utils.httpStream import HTTPStream
+
+
+@pytest.mark.asyncio
+async def testRanges(tmp_path) -> None:
+    Data = os.urandom(HTTPStream.CHUNK * 3 + 1000)
+    (tmp_path / "stream").write_bytes(Data)
+
+    async def ranges(request):
+        return web.FileResponse(tmp_path / "stream")
+
+    async def ignoreRange(request):
+        return web.Response(body=Data)
+
+    async def stall(request):
+        if request.http_range.start:
+            await asyncio.sleep(5)
+
+        return web.FileResponse(tmp_path / "stream")
+
+    async def slow(request):
+        await asyncio.sleep(0.2)
+
+        return web.FileResponse(tmp_path / "stream")
+
+    App = web.Application()
+    App.router.add_get("/stream", ranges)
+    App.router.add_get("/plain", ignoreRange)
+    App.router.add_get("/stall", stall)
+    App.router.add_get("/slow", slow)
+
+    loop = asyncio.get_running_loop()
+    Prefetch = Config.HTTP_PREFETCH
+    Config.HTTP_PREFETCH = 2
+    Held = Buffers.held
+
+    def read(url):
+        Stream = HTTPStream(url, loop)
+        if not Stream.open():
+            return None
+
+        assert Buffers.held == Held + HTTPStream.CHUNK
+
+        Read = Stream.read(1000) + Stream.read()
+        Stream.seek(-500, io.SEEK_END)
+        Tail = Stream.read(1000)
+        Stream.close()
+
+        return Read, Tail, Stream.size
+
+    def wake(url):
+        Woken = []
+
+        Stream = HTTPStream(url, loop)
+        for _ in range(5):
+            assert not Stream.ready(lambda: Woken.append(True))
+
+        Stream.chunk(0).result(5)
+        time.sleep(0.1)
+        Stream.close()
+
+        return Woken
+
+    async with TestServer(App) as Server:
+        try:
+            Stream = await loop.run_in_executor(
+                None, read, str(Server.make_url("/stream"))
+            )
+            assert Stream == (Data, Data[-500:], len(Data))
+
+            Plain = await loop.run_in_executor(
+                None, read, str(Server.make_url("/plain"))
+            )
+            assert Plain is None
+
+            assert Buffers.held == Held
+
+            # the loader is woken once for the chunk, however often it polled
+            Woken = await loop.run_in_executor(
+                None, wake, str(Server.make_url("/slow"))
+            )
+            assert Woken == [True]
+
+            HTTPStream.TIMEOUT = 0.5
+            with pytest.raises(OSError):
+                await loop.run_in_executor(None, read, str(Server.make_url("/stall")))
+        finally:
+            Config.HTTP_PREFETCH = Prefetch
+            HTTPStream.TIMEOUT = 10.0
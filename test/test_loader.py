@@ -0,0 +1,39 @@
+import fractions
+import logging
+
+import av
+import numpy
+import pytest
+
+from discodo.source.PyAVSource import Loader, PyAVSource
+
+
+@pytest.mark.asyncio
+async def testRejectedFrame(caplog) -> None:
+    class Rejecting:
+        resets = 0
+
+        def resample(self, Frame: av.AudioFrame) -> None:
+            raise ValueError("Input frame pts 960 != expected 0; fix or set to None.")
+
+        def reset(self) -> None:
+            self.resets += 1
+
+    Source = PyAVSource("rejected.opus")
+    Source.BufferLoader = Loader(Source)
+    Source.BufferLoader.Resampler = Rejecting()
+
+    Frame = av.AudioFrame.from_ndarray(
+        numpy.zeros((1, 1920), dtype=numpy.int16), format="s16", layout="stereo"
+    )
+    Frame.sample_rate = 44100
+    Frame.pts = 44100
+    Frame.time_base = fractions.Fraction(1, 44100)
+
+    with caplog.at_level(logging.WARNING, logger="discodo.source.PyAVSource"):
+        Source.BufferLoader.writeFrame(Frame)
+
+    assert not Source.AudioFifo.samples
+    assert Source.BufferLoader.Resampler.resets == 1
+    assert Source.BufferLoader.toDict()["rejectedFrames"] == 1
+    assert "s16 stereo 44100Hz at 1.0s of rejected.opus" in caplog.text
@@ -0,0 +1,61 @@
+import asyncio
+import os
+
+import numpy
+import pytest
+
+from discodo.config import Config
+from discodo.natives.LoudnessMeter import LoudnessMeter
+from discodo.utils.loudness import LoudnessCache
+
+
+def sine(frequency: float, amplitude: float, seconds: float = 3.0) -> bytes:
+    Time = numpy.arange(int(48000 * seconds)) / 48000
+    Samples = (numpy.sin(2 * numpy.pi * frequency * Time) * amplitude * 32767).astype(
+        numpy.int16
+    )
+
+    return numpy.repeat(Samples, 2).tobytes()
+
+
+def testIntegratedLoudness() -> None:
+    Meter = LoudnessMeter()
+
+    Data = sine(997, 0.5)
+    for index in range(0, len(Data), 11520):
+        Meter.write(Data[index : index + 11520])
+
+    assert abs(Meter.integrated - -6.02) < 0.1
+
+
+def testSilenceIsGated() -> None:
+    Meter = LoudnessMeter()
+    Meter.write(bytes(48000 * 4))
+
+    assert Meter.integrated is None
+
+
+@pytest.mark.asyncio
+async def testLoudnessCache(tmp_path) -> None:
+    Path = Config.LOUDNESS_CACHE
+    Config.LOUDNESS_CACHE = str(tmp_path / "loudness.json")
+
+    Cache = LoudnessCache()
+    Cache.LIMIT = 3
+    Cache.FLUSH_DELAY = 0.05
+
+    try:
+        loop = asyncio.get_running_loop()
+        for index in range(5):
+            Cache.set(str(index), -10.0 - index, loop=loop)
+
+        # the changes are batched, not saved on the caller
+        assert Cache.dirty == 5
+        assert not os.path.isfile(Config.LOUDNESS_CACHE)
+
+        await asyncio.sleep(0.2)
+
+        assert not Cache.dirty
+        assert LoudnessCache().values == {"2": -12.0, "3": -13.0, "4": -14.0}
+    finally:
+        Config.LOUDNESS_CACHE = Path
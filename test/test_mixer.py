@@ -0,0 +1,62 @@
+import numpy
+
+from discodo.natives.AudioMixer import AudioMixer, equalPower, rms
+
+
+def toBytes(*samples) -> bytes:
+    return numpy.array(samples, dtype=numpy.int16).tobytes()
+
+
+def toSamples(data: bytes) -> list:
+    return numpy.frombuffer(data, dtype=numpy.int16).tolist()
+
+
+def testPassthrough() -> None:
+    Mixer = AudioMixer(samples=2, channels=2)
+    Data = toBytes(1, 2, 3, 4)
+
+    assert Mixer.mix([(Data, 1.0, 1.0)]) == Data
+
+
+def testGainAndClip() -> None:
+    Mixer = AudioMixer(samples=2, channels=2)
+
+    assert toSamples(Mixer.mix([(toBytes(100, -100, 200, -200), 0.5, 0.5)])) == [
+        50,
+        -50,
+        100,
+        -100,
+    ]
+    assert toSamples(
+        Mixer.mix([(toBytes(30000, -30000, 0, 0), 1.0, 1.0)], master=(2.0, 2.0))
+    ) == [32767, -32768, 0, 0]
+
+
+def testRamp() -> None:
+    Mixer = AudioMixer(samples=4, channels=1)
+
+    assert toSamples(Mixer.mix([(toBytes(100, 100, 100, 100), 0.0, 1.0)])) == [
+        25,
+        50,
+        75,
+        100,
+    ]
+
+
+def testCrossfade() -> None:
+    Mixer = AudioMixer(samples=1, channels=2)
+
+    assert toSamples(
+        Mixer.mix([(toBytes(1000, 1000), 0.5, 0.5), (toBytes(-200, 400), 1.0, 1.0)])
+    ) == [300, 900]
+
+    assert equalPower(0.0) == (1.0, 0.0)
+    assert equalPower(1.0) == (0.0, 1.0)
+
+    fadeOut, fadeIn = equalPower(0.5)
+    assert round(fadeOut ** 2 + fadeIn ** 2, 6) == 1.0
+
+
+def testRms() -> None:
+    assert rms(bytes(16)) == 0.0
+    assert rms(toBytes(3, -3, 3, -3)) == 3.0
@@ -0,0 +1,45 @@
+import time
+
+import pytest
+
+from discodo.utils import Pacer
+
+
+def testPacerDeadline() -> None:
+    pacer = Pacer(interval=0.01, policy="burst")
+
+    for _ in range(5):
+        assert pacer.wait() == 0
+
+    assert pacer.deadline == pytest.approx(pacer.start + 0.05)
+    assert time.perf_counter() >= pacer.start + 0.04
+    assert pacer.stalls == 0
+
+
+def testPacerPolicies() -> None:
+    burst = Pacer(interval=0.01, policy="burst")
+    time.sleep(0.05)
+    assert burst.wait() == 0
+    assert burst.stalls == 1
+    assert burst.deadline < time.perf_counter()
+
+    # catching up too many ticks is dropped
+    time.sleep(0.1)
+    assert burst.wait() >= 10 - Pacer.BURST - 1
+    assert burst.deadline < time.perf_counter()
+    assert burst.deadline >= time.perf_counter() - 0.01 * (Pacer.BURST + 1)
+
+    drop = Pacer(interval=0.01, policy="drop")
+    time.sleep(0.05)
+    assert drop.wait() >= 3
+    assert drop.stalls == 1
+    assert drop.deadline <= time.perf_counter() + 0.01
+
+    stretch = Pacer(interval=0.01, policy="stretch")
+    time.sleep(0.05)
+    assert stretch.wait() == 0
+    assert stretch.stalls == 1
+    assert stretch.deadline == pytest.approx(time.perf_counter(), abs=0.005)
+
+    with pytest.raises(ValueError):
+        Pacer(policy="unknown")
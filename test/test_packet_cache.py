@@ -0,0 +1,84 @@
+import pytest
+
+from discodo.config import Config
+from discodo.natives import opus
+from discodo.utils.packetCache import HEADER, LENGTH, MAGIC, PacketCache, Writer
+
+
+def testReplay(tmp_path) -> None:
+    Path = Config.PACKET_CACHE
+    Config.PACKET_CACHE = str(tmp_path)
+
+    try:
+        Cache = PacketCache()
+        assert Cache.open("track") is None
+
+        Packets = [b"\xfc\x01", b"\xfc\x02\x03", b"\xfc\x04"]
+        with open(Cache.pathOf(Cache.keyOf("track")), "wb") as fp:
+            fp.write(HEADER.pack(MAGIC, Config.SAMPLES_PER_FRAME, Config.BITRATE))
+            for Packet in Packets:
+                fp.write(LENGTH.pack(len(Packet)) + Packet)
+
+        Reader = Cache.open("track")
+        assert [Reader.read() for _ in Packets] == Packets
+        assert Reader.position == len(Packets) * Config.SAMPLES_PER_FRAME
+        assert Reader.read() is None and Reader.ended
+        Reader.close()
+
+        with open(Cache.pathOf(Cache.keyOf("broken")), "wb") as fp:
+            fp.write(b"broken")
+        assert Cache.open("broken") is None
+        assert Cache.toDict()["hits"] == 2
+    finally:
+        Config.PACKET_CACHE = Path
+
+
+def testPromote(tmp_path) -> None:
+    Path, Plays = Config.PACKET_CACHE, Config.PACKET_CACHE_PLAYS
+    Config.PACKET_CACHE, Config.PACKET_CACHE_PLAYS = str(tmp_path), 3
+
+    try:
+        Cache = PacketCache()
+
+        assert [Cache.play("track") for _ in range(2)] == [1, 2]
+        assert Cache.record("track") is None
+        assert Cache.record("other") is None
+
+        # the least recently played tracks are forgotten
+        Cache.PLAYS = 2
+        Cache.play("other")
+        Cache.play("another")
+        assert list(Cache.plays) == ["other", "another"]
+
+        Config.PACKET_CACHE = None
+        assert Cache.play("track") == 0
+    finally:
+        Config.PACKET_CACHE, Config.PACKET_CACHE_PLAYS = Path, Plays
+
+
+@pytest.mark.skipif(
+    not opus.isLoaded() and not opus.loadDefaultOpus(), reason="libopus is not loaded"
+)
+def testRecord(tmp_path) -> None:
+    Path, Plays = Config.PACKET_CACHE, Config.PACKET_CACHE_PLAYS
+    Config.PACKET_CACHE, Config.PACKET_CACHE_PLAYS = str(tmp_path), 1
+
+    try:
+        Cache = PacketCache()
+        Pcm = bytes(10 * Config.SAMPLES_PER_FRAME * Config.SAMPLE_SIZE)
+
+        for key, duration in (("track", 0.6), ("longer", 1.8)):
+            Cache.play(key)
+            Recorder = Cache.record(key)
+
+            for index in range(0, len(Pcm), 1000):
+                Recorder.write(memoryview(Pcm)[index : index + 1000])
+            Recorder.close(duration=duration)
+            Writer.submit(lambda: None).result()
+
+            assert Recorder.position == 10 * Config.SAMPLES_PER_FRAME
+
+        # the recording shorter than the duration is not kept
+        assert Cache.open("track") and not Cache.open("longer")
+    finally:
+        Config.PACKET_CACHE, Config.PACKET_CACHE_PLAYS = Path, Plays
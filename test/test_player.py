@@ -0,0 +1,105 @@
+import threading
+
+from discodo.config import Config
+from discodo.natives.opus import SILENCE_FRAME
+from discodo.player import Player
+from discodo.source import AudioSource
+
+
+class FakeFifo:
+    def __init__(self) -> None:
+        self.samples = 0
+
+
+class FakeSource(AudioSource):
+    def __init__(self) -> None:
+        self.AudioData = None
+        self.BufferLoader = None
+        self.Replay = None
+        self.AudioFifo = FakeFifo()
+        self.PacketFifo = FakeFifo()
+        self._loading = threading.Lock()
+        self._filter = {}
+
+    def __del__(self) -> None:
+        pass
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.volume = 1.0
+        self.gapless = True
+        self.filter = {}
+        self.Queue = []
+        self.speakState = False
+        self.paused = False
+
+
+def testGaplessHandoff() -> None:
+    Client = FakeClient()
+    Next = FakeSource()
+    Client.Queue.append(Next)
+
+    player = Player(Client)
+    player._next = Next
+
+    # the next source is starting
+    assert not player.isHandoffReady()
+
+    Next.BufferLoader = object()
+    Next._loading.acquire()
+    Next.AudioFifo.samples = Config.SAMPLES_PER_FRAME
+    Next.PacketFifo.samples = (Config.GAPLESS_FRAMES - 2) * Config.SAMPLES_PER_FRAME
+    assert not player.isHandoffReady()
+
+    Next.AudioFifo.samples += Config.SAMPLES_PER_FRAME
+    assert player.isHandoffReady()
+
+    # a short source is handed off with all of it loaded
+    Next.AudioFifo.samples = Next.PacketFifo.samples = 0
+    Next._loading.release()
+    assert player.isHandoffReady()
+
+    Next._loading.acquire()
+    Client.gapless = False
+    assert player.isHandoffReady()
+
+
+def testSilenceFrames() -> None:
+    player = Player(FakeClient())
+
+    Frames = [player.silence(suppressed) for suppressed in range(1, 5)]
+
+    # every frame advances the timestamp by the frame, five opus silence frames are sent
+    assert all(
+        sum(samples for _, samples in Frame) == Config.SAMPLES_PER_FRAME
+        for Frame in Frames
+    )
+    assert [Data for Frame in Frames for Data, _ in Frame].count(SILENCE_FRAME) == 5
+    assert Frames[-1] == [(None, Config.SAMPLES_PER_FRAME)]
+
+
+def testFlushWhileEncoding() -> None:
+    player = Player(FakeClient())
+    Frames = [[(b"stale", Config.SAMPLES_PER_FRAME)]] + [
+        [(b"fresh", Config.SAMPLES_PER_FRAME)]
+    ] * Config.ENCODE_AHEAD
+    Flushes = []
+
+    def readFrame():
+        if len(Frames) == Config.ENCODE_AHEAD + 1:
+            # the event loop flushes while the frame is encoded
+            Flush = threading.Thread(target=player.flush)
+            Flush.start()
+            Flush.join(1.0)
+            Flushes.append(not Flush.is_alive())
+
+        return Frames.pop(0)
+
+    player.readFrame = readFrame
+    player.produce()
+
+    assert Flushes == [True]
+    assert [Frame[0][0] for Frame in player.FrameRing] == [b"fresh"] * (
+        Config.ENCODE_AHEAD
+    )
@@ -0,0 +1,27 @@
+from discodo.config import Config
+from discodo.source.ProcessLoader import DecoderProcessPool
+
+
+def testRestart() -> None:
+    Processes = Config.DECODER_PROCESSES
+    Config.DECODER_PROCESSES = 1
+
+    Pool = DecoderProcessPool()
+
+    try:
+        Process = Pool.submit(object())
+        assert Process.alive
+
+        Process.process.kill()
+        Process.process.join(5)
+        assert not Process.alive
+
+        Pool.restart(Process)
+
+        assert Pool.restarts == 1
+        assert Pool.processes[0] is not Process and Pool.processes[0].alive
+    finally:
+        Config.DECODER_PROCESSES = Processes
+
+        for Process in Pool.processes:
+            Process.close()
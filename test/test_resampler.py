@@ -0,0 +1,44 @@
+import av
+import numpy
+
+from discodo.natives import AudioResampler
+
+
+def makeFrame(format: str, rate: int) -> av.AudioFrame:
+    Frame = av.AudioFrame.from_ndarray(
+        numpy.zeros((2, 960), dtype=numpy.float32 if format == "fltp" else numpy.int16),
+        format=format,
+        layout="stereo",
+    )
+    Frame.sample_rate = rate
+
+    return Frame
+
+
+def testReset() -> None:
+    Resampler = AudioResampler()
+
+    Opus = Resampler.resamplerOf(makeFrame("fltp", 48000))
+    assert Resampler.resamplerOf(makeFrame("fltp", 48000)) is Opus
+
+    Resampler.Resampler = Resampler.resamplerOf(makeFrame("s16p", 44100))
+    Resampler.reset()
+
+    assert list(Resampler.Resamplers) == [("fltp", "stereo", 48000)]
+    assert Resampler.Resampler is None
+    assert Resampler.resamplerOf(makeFrame("fltp", 48000)) is Opus
+
+
+def testRebuild() -> None:
+    class Rejecting:
+        def resample(self, Frame: av.AudioFrame) -> None:
+            raise ValueError("Input frame pts 960 != expected 0; fix or set to None.")
+
+    Resampler = AudioResampler()
+    Frame = makeFrame("s16p", 44100)
+
+    Resampler.Resamplers[Resampler.keyOf(Frame)] = Rejecting()
+    assert Resampler.resample(Frame)
+
+    assert not isinstance(Resampler.Resamplers[Resampler.keyOf(Frame)], Rejecting)
+    assert Resampler.Resampler is Resampler.Resamplers[Resampler.keyOf(Frame)]
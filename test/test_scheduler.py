@@ -0,0 +1,136 @@
+import threading
+import time
+
+from discodo.config import Config
+from discodo.scheduler import MixerThread, PlayerScheduler
+from discodo.utils import Pacer, PlayerTelemetry
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.connectedThreadEvent = threading.Event()
+        self.connectedThreadEvent.set()
+
+
+class FakePlayer:
+    def __init__(self, fail: bool = False) -> None:
+        self.client = FakeClient()
+        self.telemetry = PlayerTelemetry()
+        self._end = threading.Event()
+        self.fail = fail
+
+        self.loops = 0
+        self.sent = []
+        self.cleaned = False
+
+    def sendFrame(self, deadline: float = None) -> None:
+        self.sent.append(deadline)
+
+    def produce(self) -> None:
+        if self.fail:
+            raise RuntimeError("the player is broken")
+
+    def dropFrames(self, count: int) -> None:
+        pass
+
+    def cleanup(self) -> None:
+        self.cleaned = True
+
+
+def testPacing() -> None:
+    Mixer = MixerThread(0)
+    Mixer.pacer = Pacer(interval=0.01, policy="burst")
+
+    Player = FakePlayer()
+    Mixer.add(Player)
+    Mixer.start()
+
+    try:
+        deadline = time.monotonic() + 5.0
+        while Mixer.ticks < 20:
+            assert time.monotonic() < deadline, "the mixer is not ticking"
+            time.sleep(0.001)
+    finally:
+        Mixer.stop()
+        Mixer.join(1.0)
+
+    assert not Mixer.is_alive()
+
+    # the frames are sent on the deadlines of the ticks, which do not drift
+    assert len(Player.sent) == Mixer.ticks
+    assert all(
+        abs(After - Before - 0.01) < 1e-6
+        for Before, After in zip(Player.sent, Player.sent[1:])
+    )
+
+
+def testFailingPlayer() -> None:
+    Mixer = MixerThread(0)
+
+    Broken, Player = FakePlayer(fail=True), FakePlayer()
+    Mixer.add(Broken)
+    Mixer.add(Player)
+
+    for _ in range(3):
+        Mixer.tick(time.perf_counter())
+
+    # only the broken player is detached, the others keep playing on the mixer
+    assert Broken.cleaned and Mixer.players == [Player]
+    assert len(Broken.sent) == 1 and len(Player.sent) == 3
+
+
+def testAddRemove() -> None:
+    Threads = Config.MIXER_THREADS
+    Config.MIXER_THREADS = 2
+
+    try:
+        Scheduler = PlayerScheduler()
+        Mixers = [MixerThread(index, scheduler=Scheduler) for index in range(2)]
+        Scheduler.mixers = Mixers  # not started, ticked by the test
+
+        Players = [FakePlayer() for _ in range(4)]
+        for Player in Players:
+            Scheduler.register(Player)
+
+        assert [len(Mixer) for Mixer in Mixers] == [2, 2]
+
+        for Player in Mixers[1].players[:]:
+            Player._end.set()
+        Mixers[1].tick(time.perf_counter())
+
+        assert len(Mixers[1]) == 0
+        assert all(Player.cleaned for Player in Players if Player._end.is_set())
+
+        # the mixer with more than one player over the others gives one away
+        Scheduler.register(FakePlayer())
+        Mixers[0].add(FakePlayer())
+        assert [len(Mixer) for Mixer in Mixers] == [3, 1]
+        assert Scheduler.rebalance(Mixers[0])
+        assert [len(Mixer) for Mixer in Mixers] == [2, 2]
+        assert not Scheduler.rebalance(Mixers[0])
+    finally:
+        Config.MIXER_THREADS = Threads
+
+
+def testSlowPlayer() -> None:
+    Scheduler = PlayerScheduler()
+    Mixers = [MixerThread(index, scheduler=Scheduler) for index in range(2)]
+    Scheduler.mixers = Mixers
+
+    # the measured seconds to tick the players
+    Slow, Fast = FakePlayer(), FakePlayer()
+    Mixers[0].add(Slow, cost=0.02)
+    Mixers[0].add(Fast, cost=0.002)
+    Mixers[0].add(FakePlayer(), cost=0.002)
+    Mixers[1].add(FakePlayer(), cost=0.002)
+
+    Mixers[0].measure(Slow, 0.03)
+    assert Mixers[0].costOf(Slow) == 0.021
+
+    # the slow player is moved, so it does not stall the fast one
+    assert Scheduler.rebalance(Mixers[0], overran=True)
+    assert Slow in Mixers[1].players and Fast in Mixers[0].players
+    assert Mixers[1].costOf(Slow) == 0.021
+
+    # it is not moved back, the other mixer has more players to stall
+    assert not Scheduler.rebalance(Mixers[1], overran=True)
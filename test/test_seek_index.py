@@ -0,0 +1,83 @@
+from fractions import Fraction
+
+from discodo.config import Config
+from discodo.source.SeekIndex import SeekIndex
+from discodo.utils.buffer import Buffers
+
+
+class FakePacket:
+    time_base = Fraction(1, 1000)
+    size = 100
+
+    def __init__(self, pts: int, is_keyframe: bool) -> None:
+        self.pts = pts
+        self.is_keyframe = is_keyframe
+
+
+def testSeek() -> None:
+    Index = SeekIndex()
+    Packets = [FakePacket(pts, pts % 1000 == 0) for pts in range(0, 5000, 20)]
+    for Packet in Packets:
+        Index.add(Packet)
+
+    assert Index.start == 0.0 and Index.end == 4.98
+    assert not Index.seek(6.0)
+
+    assert Index.seek(2.5)
+    assert Index.next() is Packets[100]
+
+    assert Index.seek(3.05)
+    assert Index.next() is Packets[100]
+
+    assert Index.seek(3.1)
+    assert Index.next() is Packets[150]
+
+    while Index.next() is not None:
+        pass
+    assert not Index.replaying
+
+    Index.clear()
+    assert not Index.seek(2.5)
+
+
+def testTrim() -> None:
+    History, Config.SEEK_HISTORY = Config.SEEK_HISTORY, 10.0
+    held = Buffers.held
+
+    try:
+        Index = SeekIndex()
+        for pts in range(0, 20000, 20):
+            Index.add(FakePacket(pts, True))
+
+        assert Index.start == 9.98 and Index.end == 19.98
+        assert Index.size == len(Index) * FakePacket.size
+        assert Buffers.held == held + Index.size
+
+        # the packets to replay are not trimmed
+        Index.seek(12.0)
+        Index.add(FakePacket(25000, True))
+        assert Index.start == 11.92
+        assert Index.next().pts == 11920
+
+        # a trimmed cursor stops replaying
+        Index.cursor = Index.first - 1
+        assert Index.next() is None and not Index.replaying
+
+        Index.clear()
+        assert Index.size == 0 and Buffers.held == held
+    finally:
+        Config.SEEK_HISTORY = History
+
+
+def testSeekBackward() -> None:
+    Index = SeekIndex()
+
+    # the buffer of 5 seconds is demuxed ahead of the played position
+    for pts in range(0, 15000, 20):
+        Index.add(FakePacket(pts, True), played=max(pts / 1000 - 5.0, 0.0))
+
+    assert Index.start == 4.98 and Index.end == 14.98
+
+    # seeking back from the played position does not need I/O
+    assert Index.seek(6.0)
+    assert Index.next().pts == 5920
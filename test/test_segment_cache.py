@@ -0,0 +1,26 @@
+from discodo.config import Config
+from discodo.utils.segmentCache import SegmentCache
+
+
+def testEvict() -> None:
+    Size, Config.SEGMENT_CACHE = Config.SEGMENT_CACHE, 1
+
+    try:
+        Cache = SegmentCache()
+        Cache.acquire("playing")
+
+        Cache.put("playing", 0, bytes(400 * 1024), 0)
+        Cache.put("ended", 0, bytes(400 * 1024), 0)
+        assert Cache.get("playing", 0)[1:] == (False, 0)
+
+        Cache.put("playing", 1, bytes(400 * 1024), -312, final=True)
+        assert Cache.get("ended", 0) is None
+        assert Cache.get("playing", 1)[1:] == (True, -312)
+        assert Cache.size == 800 * 1024 and Cache.evicted == 1
+
+        Cache.release("playing")
+        Cache.put("ended", 0, bytes(400 * 1024), 0)
+        assert Cache.get("playing", 0) is None
+        assert Cache.hitRate == 0.5
+    finally:
+        Config.SEGMENT_CACHE = Size
@@ -0,0 +1,32 @@
+import pytest
+
+from discodo.natives.SharedRing import SharedRing
+
+pytest.importorskip("multiprocessing.shared_memory")
+
+
+def testWrapAndReset() -> None:
+    Reader = SharedRing(size=400)
+    Writer = SharedRing(name=Reader.name)
+
+    try:
+        Writer.write(bytes(range(200)))
+        assert Reader.samples == Writer.samples == 50
+        assert bytes(Reader.read(30)) == bytes(range(120))
+
+        assert bytes(Reader.read(5)) == bytes(range(120, 140))
+        Writer.write(bytes(range(240)))
+        assert bytes(Reader.read(75)) == bytes(range(140, 200)) + bytes(range(240))
+        assert Reader.read(10, partial=True) is None
+
+        Writer.write(bytes(8))
+        Writer.reset()
+        Writer.write(b"\x01" * 8)
+        assert Reader.samples == 2
+        assert bytes(Reader.read(2)) == b"\x01" * 8
+
+        Writer.position, Writer.eof = 3.5, True
+        assert Reader.position == 3.5 and Reader.eof
+    finally:
+        Writer.close()
+        Reader.close()
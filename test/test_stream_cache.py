@@ -0,0 +1,35 @@
+import os
+import time
+
+from discodo.config import Config
+from discodo.utils.streamCache import StreamCache
+
+
+def testEvict(tmp_path) -> None:
+    Path, Size = Config.STREAM_CACHE, Config.STREAM_CACHE_SIZE
+    Config.STREAM_CACHE, Config.STREAM_CACHE_SIZE = str(tmp_path), 1
+
+    try:
+        Cache = StreamCache()
+        assert Cache.get("first") is None
+
+        for index, key in enumerate(["first", "second", "third"]):
+            with open(Cache.pathOf(key), "wb") as fp:
+                fp.write(bytes(400 * 1024))
+            os.utime(Cache.pathOf(key), (time.time() - 100 + index,) * 2)
+
+        Partial, Stale = Cache.partialPath("fourth"), Cache.partialPath("fifth")
+        for path in (Partial, Stale):
+            open(path, "wb").close()
+        os.utime(Stale, (0, 0))
+
+        assert Cache.get("first")
+        Cache.evict()
+
+        assert Cache.get("first") and Cache.get("third")
+        assert not Cache.get("second")
+        assert os.path.isfile(Partial) and not os.path.isfile(Stale)
+        assert Cache.toDict()["evicted"] == 1
+        assert Cache.toDict()["files"] == 2
+    finally:
+        Config.STREAM_CACHE, Config.STREAM_CACHE_SIZE = Path, Size
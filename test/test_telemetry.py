@@ -0,0 +1,19 @@
+from discodo.utils import RollingHistogram
+
+
+def testRollingHistogram() -> None:
+    Histogram = RollingHistogram(size=4)
+
+    for seconds in [0.001, 0.003, 0.015, 0.5, 0.004]:
+        Histogram.add(seconds)
+
+    assert len(Histogram) == 4
+    assert Histogram.percentile(50) == 15.0
+
+    Summary = Histogram.toDict()
+
+    assert Summary["count"] == 4
+    assert Summary["max"] == 500.0
+    assert Summary["buckets"]["<=5"] == 2
+    assert Summary["buckets"]["<=20"] == 1
+    assert Summary["buckets"][">200"] == 1